@@ -0,0 +1,271 @@
+# api/management/commands/graph_benchmark.py
+"""
+일정 생성 그래프 / start·start2 엔드포인트 처리량 벤치마크
+
+Gemini / Tavily / MySQL 대신 api/services/fakes.py 의 대역(지연 시간 설정 가능)을 써서
+같은 조건으로 반복 측정할 수 있게 합니다. 결과는 JSON 으로 저장해 실행끼리 비교합니다.
+
+    python manage.py graph_benchmark                                   # get_result, 동시 8, 요청 64
+    python manage.py graph_benchmark --target graph-async --concurrency 32 --requests 256
+    python manage.py graph_benchmark --target start2 --graph-mode planned --llm-latency-ms 1200
+    python manage.py graph_benchmark --compare benchmarks/graph-20250801-120000.json
+
+target
+- graph:       teamdb_langgraph_v5.get_result 를 스레드 풀에서 호출
+- graph-async: aget_result 를 이벤트 루프 하나에서 동시에 실행
+- start:       POST start (세션 메타데이터 LLM 호출 + 저장)
+- start2:      POST start2 (그래프 + 봇 메시지 저장)
+  start/start2 는 테스트 DB 를 새로 만들어 실행합니다. (SQLite 테스트 DB 는 동시 쓰기에서 잠금 오류가 날 수 있음)
+
+일정 결과 캐시와 웹 검색 캐시는 기본으로 끄고 측정합니다. (--with-caches 로 켬)
+출력: 처리량(req/s), 지연 p50/p95/p99/max, 오류 수, 최대 RSS
+"""
+import asyncio
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from api.services.graph_metrics import percentile
+
+TARGETS = ("graph", "graph-async", "start", "start2")
+THEMES = (
+    '종합 예술,문화 공간 체험', '역사 이야기 길 따라가기', '도심 속 안식처 속 힐링', 'K-컬처 메이킹 체험',
+    '도시 속 힐링 숲, 산 둘레길', '미디어 예술 축제,페스티벌', '맛의 향연 투어(맛집 투어)',
+)
+
+
+def request_parameters(index: int, days: int = 2) -> dict:
+    """index 번째 요청의 session_parameters (구/테마를 돌아가며 바꿔 같은 후보만 조회하지 않게 함)"""
+    from api.services.fakes import SEOUL_DISTRICTS
+    return {
+        "city": "서울",
+        "district": SEOUL_DISTRICTS[index % len(SEOUL_DISTRICTS)],
+        "theme": THEMES[index % len(THEMES)],
+        "startDate": "2025-08-01",
+        "endDate": f"2025-08-{days:02d}",
+        "companions": "친구",
+        "groupSize": 2,
+        "mealSchedule": ["아침", "점심", "저녁"],
+    }
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS(MB). resource 모듈이 없는 플랫폼(Windows)은 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)   # macOS 는 bytes, Linux 는 KB
+
+
+def summarize(latencies_ms, errors, wall_s) -> dict:
+    completed = len(latencies_ms)
+    return {
+        "completed": completed,
+        "errors": errors,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(completed / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies_ms) / completed, 1) if completed else 0.0,
+            "p50": round(percentile(latencies_ms, 50), 1),
+            "p95": round(percentile(latencies_ms, 95), 1),
+            "p99": round(percentile(latencies_ms, 99), 1),
+            "max": round(max(latencies_ms), 1) if completed else 0.0,
+        },
+    }
+
+
+def _run_threads(call, total: int, concurrency: int):
+    latencies, errors, lock = [], [], threading.Lock()
+
+    def one(index):
+        started = time.perf_counter()
+        try:
+            call(index)
+        except Exception as exc:
+            with lock:
+                errors.append(f"{type(exc).__name__}: {exc}")
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _run_async(acall, total: int, concurrency: int):
+    latencies, errors = [], []
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(index):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await acall(index)
+                except Exception as exc:
+                    errors.append(f"{type(exc).__name__}: {exc}")
+                    return
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "대역(fake) LLM/검색/DB 로 일정 생성 그래프와 start/start2 의 처리량·지연·메모리를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=TARGETS, default='graph')
+        parser.add_argument('--requests', type=int, default=64, help='측정 요청 수 (기본 64)')
+        parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수 (기본 8)')
+        parser.add_argument('--warmup', type=int, default=2, help='측정 전에 버리는 요청 수')
+        parser.add_argument('--graph-mode', choices=('two_pass', 'single_pass', 'planned'), default=None,
+                            help='그래프 모드 (기본 TEAMDB_GRAPH_MODE)')
+        parser.add_argument('--days', type=int, default=2, help='여행 일수')
+        parser.add_argument('--llm-latency-ms', type=float, default=800)
+        parser.add_argument('--llm-jitter-ms', type=float, default=200)
+        parser.add_argument('--search-latency-ms', type=float, default=300)
+        parser.add_argument('--search-jitter-ms', type=float, default=100)
+        parser.add_argument('--rows-per-district', type=int, default=30, help='합성 카탈로그 구별 행 수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--with-caches', action='store_true', help='일정 결과/웹 검색 캐시를 켠 채로 측정')
+        parser.add_argument('--output', help='결과 JSON 경로 (기본 benchmarks/<target>-<시각>.json)')
+        parser.add_argument('--compare', help='이전 결과 JSON 과 처리량/p95 비교')
+
+    def handle(self, *args, **options):
+        from api.services import fakes, teamdb_langgraph_v5 as graph
+
+        total, concurrency = options['requests'], max(1, options['concurrency'])
+        if total < 1:
+            raise CommandError("--requests 는 1 이상이어야 합니다.")
+
+        caches = {} if options['with_caches'] else {"ITINERARY_CACHE_ENABLED": False, "WEB_SEARCH_CACHE_ALIAS": ""}
+        previous_mode, previous_app = graph.GRAPH_MODE, graph._app
+        if options['graph_mode']:
+            graph.GRAPH_MODE, graph._app = options['graph_mode'], None          # 다음 get_app() 에서 이 모드로 컴파일
+
+        db = fakes.seeded_catalog_db(rows_per_district=options['rows_per_district'], seed=options['seed'])
+        try:
+            with override_settings(**caches), fakes.fake_backends(
+                    llm_latency_ms=options['llm_latency_ms'], llm_jitter_ms=options['llm_jitter_ms'],
+                    search_latency_ms=options['search_latency_ms'], search_jitter_ms=options['search_jitter_ms'],
+                    db=db, seed=options['seed']):
+                latencies, errors, wall_s = self._measure(options['target'], total, concurrency, options)
+        finally:
+            graph.GRAPH_MODE, graph._app = previous_mode, previous_app
+
+        result = {
+            "target": options['target'],
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "config": {
+                "requests": total, "concurrency": concurrency, "warmup": options['warmup'],
+                "graph_mode": options['graph_mode'] or graph.GRAPH_MODE,
+                "query_mode": graph.QUERY_MODE, "web_enrichment": graph.WEB_ENRICHMENT, "days": options['days'],
+                "llm_latency_ms": options['llm_latency_ms'], "llm_jitter_ms": options['llm_jitter_ms'],
+                "search_latency_ms": options['search_latency_ms'], "search_jitter_ms": options['search_jitter_ms'],
+                "rows_per_district": options['rows_per_district'], "with_caches": options['with_caches'],
+            },
+            "python": platform.python_version(),
+            **summarize(latencies, len(errors), wall_s),
+            "peak_rss_mb": peak_rss_mb(),
+            "error_samples": sorted(set(errors))[:5],
+        }
+        self._report(result, options)
+
+    # ── 측정 ────────────────────────────────────────────────
+    def _measure(self, target, total, concurrency, options):
+        days = options['days']
+        if target in ("graph", "graph-async"):
+            from api.services import teamdb_langgraph_v5 as graph
+            graph.warm_up()
+            call = lambda i: graph.get_result(request_parameters(i, days))
+            for i in range(options['warmup']):
+                call(i)
+            if target == "graph":
+                return _run_threads(call, total, concurrency)
+            return _run_async(lambda i: graph.aget_result(request_parameters(i, days)), total, concurrency)
+        return self._measure_endpoint(target, total, concurrency, options)
+
+    def _measure_endpoint(self, target, total, concurrency, options):
+        from django.test import Client
+        from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+            teardown_test_environment
+        from api.models import ChatSession, User
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = User.objects.create_user(email='bench@example.com', password='bench', username='bench')
+            count = total + options['warmup']
+            sessions = []
+            if target == "start2":
+                sessions = [ChatSession.objects.create(user=user, title='bench', parameters=request_parameters(i))
+                            for i in range(count)]
+            local = threading.local()
+
+            def call(index):
+                client = getattr(local, 'client', None) or Client()
+                local.client = client
+                params = request_parameters(index, options['days'])
+                if target == "start":
+                    url = f"/api/v1/users/{user.pk}/chat-sessions/start/"
+                else:
+                    url = f"/api/v1/users/{user.pk}/chat-sessions/start2/{sessions[index].pk}/"
+                response = client.post(url, data=json.dumps({"session_parameters": params}),
+                                       content_type='application/json')
+                if response.status_code >= 400:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+
+            for i in range(options['warmup']):
+                call(total + i)
+            return _run_threads(call, total, concurrency)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    # ── 출력 ────────────────────────────────────────────────
+    def _report(self, result, options):
+        output = Path(options['output'] or Path("benchmarks") /
+                      f"{result['target']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+
+        latency = result['latency_ms']
+        self.stdout.write(
+            f"{result['target']}: {result['completed']} ok / {result['errors']} err in {result['wall_s']}s  "
+            f"{result['throughput_rps']} req/s  p50 {latency['p50']:.0f}ms  p95 {latency['p95']:.0f}ms  "
+            f"p99 {latency['p99']:.0f}ms  peak RSS {result['peak_rss_mb']}MB"
+        )
+        for sample in result['error_samples']:
+            self.stderr.write(f"  error: {sample}")
+        self.stdout.write(f"saved: {output}")
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+
+            def change(now, before):
+                return f"{(now - before) / before * 100:+.1f}%" if before else "n/a"
+
+            self.stdout.write(
+                f"vs {os.path.basename(options['compare'])}: "
+                f"throughput {change(result['throughput_rps'], baseline['throughput_rps'])}, "
+                f"p95 {change(latency['p95'], baseline['latency_ms']['p95'])}"
+            )
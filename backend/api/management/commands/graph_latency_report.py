@@ -0,0 +1,103 @@
+# api/management/commands/graph_latency_report.py
+"""
+일정 생성 그래프 노드별 지연 시간/토큰 리포트
+
+ChatInteraction.response["metrics"] 에 저장된 턴별 계측 값(GraphMetrics.as_dict)을 모아
+노드별 p50/p95 실행 시간과 평균 토큰 수, 캐시 히트 수를 출력합니다.
+
+    python manage.py graph_latency_report                  # 최근 24시간
+    python manage.py graph_latency_report --hours 168      # 최근 7일
+    python manage.py graph_latency_report --node fetch_restaurant
+    python manage.py graph_latency_report --json           # 모니터링 수집용 JSON
+"""
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import ChatInteraction
+from api.services.graph_metrics import percentile
+
+
+def _node_rows(samples, only_node=None) -> dict:
+    """노드 → {count, p50_ms, p95_ms, avg_input_tokens, avg_output_tokens, retries, errors, cache}"""
+    per_node = {}
+    for metrics in samples:
+        for node, values in (metrics.get("nodes") or {}).items():
+            if only_node and node != only_node:
+                continue
+            entry = per_node.setdefault(node, {"ms": [], "input_tokens": 0, "output_tokens": 0,
+                                               "retries": 0, "errors": 0, "cache": {}})
+            entry["ms"].append(values.get("ms", 0.0))
+            for key in ("input_tokens", "output_tokens", "retries", "errors"):
+                entry[key] += values.get(key, 0) or 0
+            for cache, outcomes in (values.get("cache") or {}).items():
+                merged = entry["cache"].setdefault(cache, {})
+                for outcome, count in outcomes.items():
+                    merged[outcome] = merged.get(outcome, 0) + count
+
+    rows = {}
+    for node, entry in sorted(per_node.items()):
+        count = len(entry["ms"])
+        rows[node] = {
+            "count": count,
+            "p50_ms": percentile(entry["ms"], 50),
+            "p95_ms": percentile(entry["ms"], 95),
+            "avg_input_tokens": round(entry["input_tokens"] / count, 1),
+            "avg_output_tokens": round(entry["output_tokens"] / count, 1),
+            "retries": entry["retries"],
+            "errors": entry["errors"],
+            "cache": entry["cache"],
+        }
+    return rows
+
+
+def build_report(samples, only_node=None) -> dict:
+    totals = [m["total_ms"] for m in samples if m.get("total_ms") is not None]
+    return {
+        "turns": len(samples),
+        "total_p50_ms": percentile(totals, 50),
+        "total_p95_ms": percentile(totals, 95),
+        "nodes": _node_rows(samples, only_node),
+    }
+
+
+class Command(BaseCommand):
+    help = "ChatInteraction 에 저장된 계측 값으로 그래프 노드별 p50/p95 지연 시간과 토큰 수를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='집계 구간 (기본 24시간)')
+        parser.add_argument('--node', help='이 노드만 출력')
+        parser.add_argument('--json', action='store_true', help='JSON 한 줄로 출력')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        responses = (
+            ChatInteraction.objects
+            .filter(created_at__gte=since)
+            .values_list('response', flat=True)
+        )
+        samples = [r["metrics"] for r in responses if isinstance(r, dict) and r.get("metrics")]
+        report = build_report(samples, options['node'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+            return
+
+        self.stdout.write(
+            f"turns: {report['turns']}  total p50: {report['total_p50_ms']:.0f}ms  "
+            f"p95: {report['total_p95_ms']:.0f}ms"
+        )
+        self.stdout.write(f"{'node':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'in tok':>9}{'out tok':>9}"
+                          f"{'retry':>7}{'err':>5}  cache")
+        for node, row in report['nodes'].items():
+            cache = ", ".join(
+                f"{name} " + "/".join(f"{outcome}={count}" for outcome, count in sorted(outcomes.items()))
+                for name, outcomes in sorted(row['cache'].items())
+            )
+            self.stdout.write(
+                f"{node:<28}{row['count']:>6}{row['p50_ms']:>10.0f}{row['p95_ms']:>10.0f}"
+                f"{row['avg_input_tokens']:>9.0f}{row['avg_output_tokens']:>9.0f}"
+                f"{row['retries']:>7}{row['errors']:>5}  {cache}"
+            )
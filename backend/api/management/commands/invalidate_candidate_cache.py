@@ -0,0 +1,32 @@
+# api/management/commands/invalidate_candidate_cache.py
+"""
+후보 조회 캐시 무효화 커맨드
+
+    python manage.py invalidate_candidate_cache
+
+CSV 로 api_tourinfo / api_restaurant / api_accommodation 을 다시 적재한 뒤 실행합니다.
+세대 캐시(CANDIDATE_CACHE_GENERATION_ALIAS, 기본 "catalog")의 세대 토큰을 바꾸므로
+실행 중인 모든 워커가 다음 조회부터 새 데이터를 조회하게 됩니다.
+후보가 바뀌면 이전 일정 결과도 맞지 않으므로 일정 결과 캐시(itinerary_cache)도 함께 무효화합니다.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.services import itinerary_cache
+from api.services.candidate_cache import invalidate_candidate_cache
+
+
+class Command(BaseCommand):
+    help = "카탈로그 재적재 후 후보 조회(fetch_db_*) 캐시를 무효화합니다."
+
+    def handle(self, *args, **options):
+        invalidate_candidate_cache()
+        itinerary_cache.invalidate()
+        alias = settings.CANDIDATE_CACHE_GENERATION_ALIAS or settings.CANDIDATE_CACHE_ALIAS
+        if alias:
+            self.stdout.write(f"candidate cache invalidated (generation alias: {alias})")
+        else:
+            self.stdout.write(
+                "candidate cache invalidated in this process only - set CANDIDATE_CACHE_GENERATION_ALIAS "
+                "to invalidate running workers"
+            )
@@ -0,0 +1,38 @@
+# api/management/commands/itinerary_cache_stats.py
+"""
+일정 결과 캐시 히트/미스 통계
+
+    python manage.py itinerary_cache_stats          # 현재 카운터 출력
+    python manage.py itinerary_cache_stats --reset  # 출력 후 카운터 초기화
+    python manage.py itinerary_cache_stats --json   # 모니터링 수집용 JSON
+
+hit_rate 와 stores 를 보고 ITINERARY_CACHE_TTL / MAX_ENTRIES 를 조정합니다.
+파일 기반 캐시(기본 설정)에서는 카운터 증가가 원자적이지 않아 동시 요청이 많으면 실제보다 작게 나옵니다
+(approximate: true). 비율(hit_rate) 추세를 보는 용도로만 쓰세요.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.services import itinerary_cache
+
+
+class Command(BaseCommand):
+    help = "일정 결과 캐시의 hits/misses/bypasses/stores 카운터를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력 후 카운터 초기화')
+        parser.add_argument('--json', action='store_true', help='JSON 한 줄로 출력')
+
+    def handle(self, *args, **options):
+        stats = itinerary_cache.stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats))
+        else:
+            approximate = stats.pop('approximate')
+            for name, value in stats.items():
+                self.stdout.write(f"{name:>9}: {value}")
+            if approximate:
+                self.stdout.write("(근사치 - 현재 캐시 백엔드의 incr 가 원자적이지 않아 동시 요청 시 일부 증가분이 빠질 수 있음)")
+        if options['reset']:
+            itinerary_cache.reset_stats()
@@ -0,0 +1,484 @@
+# api/management/commands/load_test.py
+"""
+채팅 세션 API 부하 테스트 (가상 사용자 램프 + 시나리오 혼합)
+
+실제 사용자 흐름을 가상 사용자(VU)가 반복합니다.
+
+    회원가입(POST users/) → 로그인(POST login/) → start/ → start2/<session>/
+    → send-messages/ × --messages → feedbacks/ (POST, GET)
+
+    python manage.py load_test                                             # 10s 램프업 → 30s 8명 → 10s 램프다운
+    python manage.py load_test --stages 30s:4,1m:16,30s:0 --mix full=2,itinerary=1
+    python manage.py load_test --distinct-params 20                         # 조건 20개만 돌려 결과 캐시 히트 유도
+    python manage.py load_test --compare benchmarks/load-20250801-120000.json
+    python manage.py load_test --base-url http://127.0.0.1:8000            # 이미 떠 있는 서버(gunicorn/uvicorn)
+
+--stages: "지속시간:목표 VU" 목록. 각 구간 동안 직전 목표에서 다음 목표로 VU 수를 선형으로 늘리거나 줄임
+          (구간이 끝나 VU 가 줄면 진행 중인 반복은 끝까지 마치고 빠짐)
+--mix:    시나리오별 가중치. full(위 흐름 전체) / itinerary(start·start2 까지) / chat(start 후 메시지만)
+
+기본(in-process)은 테스트 DB 를 새로 만들고 fakes.py 의 대역 LLM/검색/카탈로그로 뷰를 직접 호출합니다.
+SQLite 는 스레드끼리 같은 DB 를 쓰도록 임시 파일 DB 로 만듭니다. (동시 쓰기가 많으면 잠금 오류가 섞일 수 있음)
+--base-url 로 실제 서버를 칠 때는 서버를 대역과 쿼리 수 헤더를 켜고 띄웁니다.
+
+    TEAMDB_FAKE_BACKENDS=1 QUERY_COUNT_HEADERS=True gunicorn backend.wsgi -w 4
+
+이 경우 send-messages 는 인증(request.user)이 필요한데 전역 인증 클래스가 없어 403 으로 집계됩니다.
+
+출력: 엔드포인트별 요청 수/오류율/p50·p95·p99/지연 히스토그램/DB 쿼리 수(X-DB-Queries 헤더),
+      전체 반복 수·처리량·최대 VU·최대 RSS. 결과는 JSON 으로 저장해 --compare 로 비교
+"""
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from api.services.graph_metrics import percentile
+from .graph_benchmark import peak_rss_mb, request_parameters
+
+SCENARIOS = {
+    "full": ("register", "login", "start", "start2", "send-messages", "feedbacks-post", "feedbacks-get"),
+    "itinerary": ("register", "login", "start", "start2"),
+    "chat": ("register", "login", "start", "send-messages"),
+}
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_MIDDLEWARE = 'api.middleware.QueryCountMiddleware'
+
+
+# ── 설정 파싱 / 집계 ─────────────────────────────────────────
+def parse_duration(text: str) -> float:
+    """'30s', '2m', '500ms', '45' → 초"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)(ms|s|m)?", text.strip())
+    if not match:
+        raise ValueError(f"잘못된 시간: {text!r}")
+    value, unit = float(match.group(1)), match.group(2) or "s"
+    return value / 1000 if unit == "ms" else value * 60 if unit == "m" else value
+
+
+def parse_stages(text: str) -> list:
+    """'10s:2,30s:8,10s:0' → [(10.0, 2), (30.0, 8), (10.0, 0)]"""
+    stages = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        duration, _, target = part.partition(":")
+        if not target.strip().isdigit():
+            raise ValueError(f"잘못된 stage: {part!r} (예: 30s:8)")
+        stages.append((parse_duration(duration), int(target)))
+    if not stages:
+        raise ValueError("stage 가 비어 있습니다.")
+    return stages
+
+
+def parse_mix(text: str) -> dict:
+    """'full=2,itinerary=1' → {'full': 2.0, 'itinerary': 1.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"알 수 없는 시나리오: {name!r} ({', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("시나리오 가중치 합이 0 입니다.")
+    return mix
+
+
+def target_vus(stages, elapsed: float):
+    """elapsed 초 시점의 목표 VU 수. 모든 stage 가 끝났으면 None"""
+    previous = 0
+    for duration, target in stages:
+        if elapsed < duration:
+            return round(previous + (target - previous) * (elapsed / duration if duration else 1))
+        elapsed -= duration
+        previous = target
+    return None
+
+
+def histogram(latencies_ms) -> dict:
+    """{'<=50': n, '<=100': n, ..., '>10000': n} (구간별 개수, 누적 아님)"""
+    buckets = {f"<={bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    buckets[f">{LATENCY_BUCKETS_MS[-1]}"] = 0
+    for value in latencies_ms:
+        bound = next((b for b in LATENCY_BUCKETS_MS if value <= b), None)
+        buckets[f"<={bound}" if bound is not None else f">{LATENCY_BUCKETS_MS[-1]}"] += 1
+    return buckets
+
+
+class EndpointStats:
+    """엔드포인트별 지연/상태 코드/DB 쿼리 수 집계 (VU 스레드에서 동시에 record)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, endpoint, elapsed_ms, status, db_queries=None, db_ms=None, error=None):
+        with self._lock:
+            entry = self._data.setdefault(endpoint, {"latencies": [], "errors": 0, "statuses": {},
+                                                     "db_queries": [], "db_ms": [], "error_samples": set()})
+            entry["latencies"].append(elapsed_ms)
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+            if error is not None:
+                entry["errors"] += 1
+                if len(entry["error_samples"]) < 5:
+                    entry["error_samples"].add(error)
+            if db_queries is not None:
+                entry["db_queries"].append(db_queries)
+            if db_ms is not None:
+                entry["db_ms"].append(db_ms)
+
+    def summary(self) -> dict:
+        result = {}
+        with self._lock:
+            for endpoint, entry in self._data.items():
+                latencies, queries, db_ms = entry["latencies"], entry["db_queries"], entry["db_ms"]
+                result[endpoint] = {
+                    "count": len(latencies),
+                    "errors": entry["errors"],
+                    "error_rate": round(entry["errors"] / len(latencies), 4) if latencies else 0.0,
+                    "statuses": entry["statuses"],
+                    "latency_ms": {
+                        "p50": round(percentile(latencies, 50), 1),
+                        "p95": round(percentile(latencies, 95), 1),
+                        "p99": round(percentile(latencies, 99), 1),
+                        "max": round(max(latencies), 1) if latencies else 0.0,
+                    },
+                    "histogram_ms": histogram(latencies),
+                    "db_queries": {
+                        "avg": round(sum(queries) / len(queries), 1) if queries else None,
+                        "max": max(queries) if queries else None,
+                    },
+                    "db_ms_avg": round(sum(db_ms) / len(db_ms), 1) if db_ms else None,
+                    "error_samples": sorted(entry["error_samples"]),
+                }
+        return result
+
+
+# ── 전송 ────────────────────────────────────────────────────
+class _InProcessClient:
+    """DRF APIClient. 로그인 후 force_authenticate 로 send-messages 의 request.user 검사를 통과"""
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+
+    def request(self, method, path, body=None):
+        handler = getattr(self.client, method.lower())
+        response = handler(path, data=body, format='json') if body is not None else handler(path)
+        try:
+            data = json.loads(response.content or b"null")
+        except ValueError:
+            data = None
+        return response.status_code, data, response.headers
+
+    def authenticate(self, user_id):
+        from api.models import User
+        self.client.force_authenticate(user=User.objects.get(pk=user_id))
+
+
+class _HttpClient:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, raw, headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as exc:
+            status, raw, headers = exc.code, exc.read(), exc.headers
+        try:
+            payload = json.loads(raw or b"null")
+        except ValueError:
+            payload = None
+        return status, payload, headers
+
+    def authenticate(self, user_id):
+        pass                                                     # 서버에 인증 클래스가 없음 (모듈 docstring 참고)
+
+
+# ── 가상 사용자 ──────────────────────────────────────────────
+class _VirtualUser:
+    def __init__(self, runner, index):
+        self.runner = runner
+        self.index = index
+        self.random = random.Random(runner.seed * 100003 + index)
+        self.client = runner.make_client()
+
+    def _call(self, endpoint, method, path, body=None, expect=(200, 201)):
+        started = time.perf_counter()
+        try:
+            status, data, headers = self.client.request(method, path, body)
+        except Exception as exc:
+            self.runner.stats.record(endpoint, (time.perf_counter() - started) * 1000, "exception",
+                                     error=f"{type(exc).__name__}: {exc}")
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        queries, db_ms = headers.get("X-DB-Queries"), headers.get("X-DB-Time-Ms")
+        error = None if status in expect else f"HTTP {status}: {str(data)[:200]}"
+        self.runner.stats.record(endpoint, elapsed_ms, status, int(queries) if queries else None,
+                                 float(db_ms) if db_ms else None, error)
+        return data if error is None else None
+
+    def iteration(self, scenario):
+        runner = self.runner
+        number = next(runner.iterations)
+        params = request_parameters(self.random.randrange(runner.distinct_params) if runner.distinct_params
+                                    else number, runner.days)
+        email, password = f"load-{runner.tag}-{number}@example.com", "Load-test-pass-1!"
+
+        for step in SCENARIOS[scenario]:
+            if step == "register":
+                ok = self._call(step, "POST", "/api/v1/users/",
+                                {"email": email, "username": f"load{number}", "password": password})
+            elif step == "login":
+                ok = self._call(step, "POST", "/api/v1/login/", {"email": email, "password": password})
+                if ok:
+                    user_id = ok["id"]
+                    self.client.authenticate(user_id)
+            elif step == "start":
+                ok = self._call(step, "POST", f"/api/v1/users/{user_id}/chat-sessions/start/",
+                                {"session_parameters": params}, expect=(201,))
+                if ok:
+                    session_id = ok["session"]["chat_session_id"]
+            elif step == "start2":
+                ok = self._call(step, "POST", f"/api/v1/users/{user_id}/chat-sessions/start2/{session_id}/",
+                                {"session_parameters": params}, expect=(201,))
+            elif step == "send-messages":
+                for turn in range(runner.messages):
+                    ok = self._call(step, "POST",
+                                    f"/api/v1/users/{user_id}/chat-sessions/{session_id}/send-messages/",
+                                    {"message": f"{params['district']} 근처 다른 곳도 추천해 주세요 ({turn + 1})"})
+                    if not ok:
+                        break
+                    self._think()
+            elif step == "feedbacks-post":
+                ok = self._call(step, "POST", f"/api/v1/users/{user_id}/chat-sessions/{session_id}/feedbacks/",
+                                {"is_liked": self.random.random() < 0.8}, expect=(201,))
+            else:
+                ok = self._call(step, "GET", f"/api/v1/users/{user_id}/chat-sessions/{session_id}/feedbacks/")
+            if ok is None:
+                return False                                     # 앞 단계가 실패하면 이번 반복은 중단
+            self._think()
+        return True
+
+    def _think(self):
+        if self.runner.think_ms:
+            time.sleep(self.random.uniform(0.5, 1.5) * self.runner.think_ms / 1000)
+
+    def run(self):
+        runner = self.runner
+        scenarios, weights = zip(*runner.mix.items())
+        while not runner.stopped.is_set() and self.index < runner.active_vus:
+            scenario = self.random.choices(scenarios, weights)[0]
+            try:
+                ok = self.iteration(scenario)
+            except Exception as exc:                             # 응답 형식이 달라도 VU 는 계속
+                runner.stats.record("iteration", 0.0, "exception", error=f"{type(exc).__name__}: {exc}")
+                ok = False
+            runner.count_iteration(scenario, ok)
+
+
+class _Runner:
+    def __init__(self, stages, mix, options, make_client):
+        self.stages, self.mix, self.make_client = stages, mix, make_client
+        self.seed, self.days, self.messages = options['seed'], options['days'], options['messages']
+        self.think_ms, self.distinct_params = options['think_ms'], options['distinct_params']
+        self.tag = f"{int(time.time())}-{os.getpid()}"               # 서버 DB 를 재사용해도 이메일이 겹치지 않게
+        self.stats = EndpointStats()
+        self.iterations = count()
+        self.stopped = threading.Event()
+        self.active_vus = 0
+        self.peak_vus = 0
+        self.scenario_counts = {}
+        self._lock = threading.Lock()
+
+    def count_iteration(self, scenario, ok):
+        with self._lock:
+            done, failed = self.scenario_counts.get(scenario, (0, 0))
+            self.scenario_counts[scenario] = (done + 1, failed + (not ok))
+
+    def run(self, on_tick=None):
+        threads = {}
+        started = time.perf_counter()
+        next_tick = started
+        try:
+            while True:
+                elapsed = time.perf_counter() - started
+                target = target_vus(self.stages, elapsed)
+                if target is None:
+                    break
+                self.active_vus = target
+                self.peak_vus = max(self.peak_vus, target)
+                for index in range(target):
+                    if index not in threads or not threads[index].is_alive():
+                        thread = threading.Thread(target=_VirtualUser(self, index).run, daemon=True)
+                        threads[index] = thread
+                        thread.start()
+                if on_tick and time.perf_counter() >= next_tick:
+                    on_tick(elapsed, target)
+                    next_tick += 5
+                time.sleep(0.1)
+        finally:
+            self.active_vus = 0
+            self.stopped.set()
+            for thread in threads.values():
+                thread.join()                                    # 진행 중인 반복은 끝까지
+        return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "가상 사용자 램프/시나리오 혼합으로 채팅 세션 API 흐름의 엔드포인트별 지연·오류율·DB 쿼리 수를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stages', default='10s:2,30s:8,10s:0', help='"지속시간:목표 VU" 목록 (기본 10s:2,30s:8,10s:0)')
+        parser.add_argument('--mix', default='full=1', help='시나리오 가중치 (full / itinerary / chat, 예: full=2,chat=1)')
+        parser.add_argument('--messages', type=int, default=2, help='반복마다 보낼 send-messages 수 (기본 2)')
+        parser.add_argument('--think-ms', type=float, default=0, help='단계 사이 대기(ms, ±50%% 무작위)')
+        parser.add_argument('--days', type=int, default=2, help='여행 일수')
+        parser.add_argument('--distinct-params', type=int, default=0,
+                            help='여행 조건 가짓수. 0 이면 반복마다 다른 조건(결과 캐시 미스), 작을수록 캐시 히트가 늘어남')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--base-url', help='실제 서버 주소. 없으면 in-process (테스트 DB + 대역)')
+        parser.add_argument('--timeout', type=float, default=120, help='--base-url 요청 타임아웃(초)')
+        parser.add_argument('--llm-latency-ms', type=float, default=800)
+        parser.add_argument('--llm-jitter-ms', type=float, default=200)
+        parser.add_argument('--search-latency-ms', type=float, default=300)
+        parser.add_argument('--search-jitter-ms', type=float, default=100)
+        parser.add_argument('--no-caches', action='store_true', help='in-process 에서 일정 결과/웹 검색 캐시를 끔')
+        parser.add_argument('--output', help='결과 JSON 경로 (기본 benchmarks/load-<시각>.json)')
+        parser.add_argument('--compare', help='이전 결과 JSON 과 엔드포인트별 p95/오류율 비교')
+
+    def handle(self, *args, **options):
+        try:
+            stages, mix = parse_stages(options['stages']), parse_mix(options['mix'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['base_url']:
+            if any("send-messages" in SCENARIOS[name] for name in mix):
+                self.stderr.write("주의: --base-url 에서는 send-messages 가 인증 없이 403 으로 집계됩니다.")
+            runner = _Runner(stages, mix, options, lambda: _HttpClient(options['base_url'], options['timeout']))
+            wall_s = runner.run(self._progress(runner))
+        else:
+            runner, wall_s = self._run_in_process(stages, mix, options)
+
+        endpoints = runner.stats.summary()
+        iterations = sum(done for done, _ in runner.scenario_counts.values())
+        result = {
+            "target": options['base_url'] or "in-process",
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "config": {
+                "stages": options['stages'], "mix": mix, "messages": options['messages'],
+                "think_ms": options['think_ms'], "days": options['days'],
+                "distinct_params": options['distinct_params'], "seed": options['seed'],
+                **({} if options['base_url'] else {
+                    "llm_latency_ms": options['llm_latency_ms'], "llm_jitter_ms": options['llm_jitter_ms'],
+                    "search_latency_ms": options['search_latency_ms'],
+                    "search_jitter_ms": options['search_jitter_ms'], "caches": not options['no_caches'],
+                }),
+            },
+            "wall_s": round(wall_s, 3),
+            "peak_vus": runner.peak_vus,
+            "iterations": iterations,
+            "failed_iterations": sum(failed for _, failed in runner.scenario_counts.values()),
+            "scenarios": {name: {"iterations": done, "failed": failed}
+                          for name, (done, failed) in runner.scenario_counts.items()},
+            "requests": sum(e["count"] for e in endpoints.values()),
+            "throughput_rps": round(sum(e["count"] for e in endpoints.values()) / wall_s, 2) if wall_s else 0.0,
+            "peak_rss_mb": None if options['base_url'] else peak_rss_mb(),
+            "endpoints": endpoints,
+        }
+        self._report(result, options)
+
+    def _progress(self, runner):
+        def tick(elapsed, target):
+            done = sum(d for d, _ in runner.scenario_counts.values())
+            self.stdout.write(f"  {elapsed:5.0f}s  VU {target:>3}  반복 {done}")
+        return tick
+
+    def _run_in_process(self, stages, mix, options):
+        from django.db import connections
+        from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+            teardown_test_environment
+        from api.services import fakes
+
+        overrides = {"ALLOWED_HOSTS": ["*"]}
+        if QUERY_COUNT_MIDDLEWARE not in settings.MIDDLEWARE:
+            overrides["MIDDLEWARE"] = [*settings.MIDDLEWARE, QUERY_COUNT_MIDDLEWARE]
+        if options['no_caches']:
+            overrides.update(ITINERARY_CACHE_ENABLED=False, WEB_SEARCH_CACHE_ALIAS="")
+
+        temp_dir = None
+        for alias in connections:
+            connection = connections[alias]
+            if connection.vendor == "sqlite":                    # 메모리 DB 대신 파일 → VU 스레드끼리 같은 DB
+                temp_dir = temp_dir or tempfile.mkdtemp(prefix="load-test-")
+                connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(temp_dir, f"{alias}.sqlite3")
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(**overrides), fakes.fake_backends(
+                    llm_latency_ms=options['llm_latency_ms'], llm_jitter_ms=options['llm_jitter_ms'],
+                    search_latency_ms=options['search_latency_ms'], search_jitter_ms=options['search_jitter_ms'],
+                    seed=options['seed']):
+                runner = _Runner(stages, mix, options, _InProcessClient)
+                return runner, runner.run(self._progress(runner))
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    # ── 출력 ────────────────────────────────────────────────
+    def _report(self, result, options):
+        output = Path(options['output'] or Path("benchmarks") / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+
+        self.stdout.write(
+            f"{result['target']}: 반복 {result['iterations']} (실패 {result['failed_iterations']}), "
+            f"요청 {result['requests']} in {result['wall_s']}s  {result['throughput_rps']} req/s  "
+            f"최대 VU {result['peak_vus']}  peak RSS {result['peak_rss_mb']}MB"
+        )
+        self.stdout.write(f"{'endpoint':<16}{'count':>7}{'err%':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'db q':>7}{'db ms':>8}")
+        for endpoint, stats in result['endpoints'].items():
+            latency, queries = stats['latency_ms'], stats['db_queries']
+            self.stdout.write(
+                f"{endpoint:<16}{stats['count']:>7}{stats['error_rate'] * 100:>6.1f}%"
+                f"{latency['p50']:>8.0f}{latency['p95']:>8.0f}{latency['p99']:>8.0f}"
+                f"{queries['avg'] if queries['avg'] is not None else '-':>7}"
+                f"{stats['db_ms_avg'] if stats['db_ms_avg'] is not None else '-':>8}"
+            )
+            for sample in stats['error_samples']:
+                self.stderr.write(f"  {endpoint} error: {sample}")
+        self.stdout.write(f"saved: {output}")
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+
+            def change(now, before):
+                return f"{(now - before) / before * 100:+.1f}%" if before else "n/a"
+
+            self.stdout.write(f"vs {os.path.basename(options['compare'])}: "
+                              f"throughput {change(result['throughput_rps'], baseline['throughput_rps'])}")
+            for endpoint, stats in result['endpoints'].items():
+                before = baseline.get('endpoints', {}).get(endpoint)
+                if before:
+                    self.stdout.write(
+                        f"  {endpoint:<16} p95 {change(stats['latency_ms']['p95'], before['latency_ms']['p95'])}, "
+                        f"error rate {before['error_rate'] * 100:.1f}% → {stats['error_rate'] * 100:.1f}%"
+                    )
@@ -0,0 +1,160 @@
+# api/management/commands/pregenerate_itineraries.py
+"""
+자주 요청되는 여행 조건의 일정을 미리 생성해 결과 캐시(itinerary_cache)에 채워 두는 커맨드
+
+구 25개 × 테마 7개 × 일수/식사 조합은 많지 않고 요청은 몇몇 조합에 몰립니다.
+저장된 ChatSession.parameters 를 캐시 키(itinerary_cache.normalize_parameters) 기준으로 묶어
+많이 요청된 조합부터, 또는 JSON 파일에 적은 조합을 그래프로 생성해 둡니다.
+그러면 start2 요청 대부분이 캐시 히트로 바로 응답합니다.
+
+    python manage.py pregenerate_itineraries --top 50                   # 최근 30일 인기 조합 50개
+    python manage.py pregenerate_itineraries --days 7 --top 20 --dry-run
+    python manage.py pregenerate_itineraries --params-file combos.json   # [{session_parameters}, ...]
+    python manage.py pregenerate_itineraries --workers 4 --rate 30 --ttl 86400
+
+- 이미 캐시에 있는 조합은 건너뜀 (--force 면 다시 생성)
+- --workers 개 스레드로 동시에 생성하되 --rate(분당 그래프 실행 수)로 LLM 호출 속도 제한
+- 조합마다 진행 상황을 출력하고, 실패한 조합이 있으면 마지막에 목록을 보여주고 실패 코드로 종료
+- 야간 cron 으로 돌린다면 --ttl 을 실행 주기보다 길게 줌 (기본은 ITINERARY_CACHE_TTL)
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import ChatSession
+from api.services import itinerary_cache
+
+
+class RateLimiter:
+    """분당 per_minute 번까지 acquire() 통과 (여러 스레드가 간격을 나눠 씀). 0 이면 제한 없음"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _valid(session_parameters) -> bool:
+    from api.services.teamdb_langgraph_v5 import THEME_TO_CATEGORY_TWO
+    return (isinstance(session_parameters, dict)
+            and bool(session_parameters.get("district"))
+            and session_parameters.get("theme") in THEME_TO_CATEGORY_TWO
+            and bool(itinerary_cache.trip_dates(session_parameters)))
+
+
+def top_combinations(parameter_list, limit=None) -> list:
+    """
+    파라미터 목록 → 캐시 키가 같은 것끼리 묶어 요청 수가 많은 순서로 [(요청 수, 대표 파라미터), ...]
+    대표 파라미터는 그 묶음에서 마지막(가장 최근) 요청. 그래프 입력으로 쓸 수 없는 값은 제외
+    """
+    groups = {}
+    for session_parameters in parameter_list:
+        if not _valid(session_parameters):
+            continue
+        key = json.dumps(itinerary_cache.normalize_parameters(session_parameters), ensure_ascii=False, sort_keys=True)
+        count, _ = groups.get(key, (0, None))
+        groups[key] = (count + 1, session_parameters)
+    ranked = sorted(groups.values(), key=lambda item: item[0], reverse=True)   # 안정 정렬 → 동점이면 먼저 나온 조합
+    return ranked[:limit] if limit else ranked
+
+
+def _label(session_parameters) -> str:
+    normalized = itinerary_cache.normalize_parameters(session_parameters)
+    weekdays = "".join("월화수목금토일"[day] for day in normalized['weekdays'])
+    return (f"{normalized['district']} / {normalized['theme']} / {normalized['trip_days']}일 "
+            f"{weekdays} / {','.join(normalized['meals']) or '식사 없음'}")
+
+
+class Command(BaseCommand):
+    help = "인기 여행 조건의 일정을 미리 생성해 일정 결과 캐시에 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--params-file', help='session_parameters 목록(JSON 배열) 파일. 주면 DB 집계 대신 사용')
+        parser.add_argument('--days', type=float, default=30, help='집계할 최근 세션 기간(일, 기본 30)')
+        parser.add_argument('--top', type=int, default=50, help='생성할 조합 수 (기본 50)')
+        parser.add_argument('--workers', type=int, default=4, help='동시 생성 스레드 수 (기본 4)')
+        parser.add_argument('--rate', type=float, default=30, help='분당 최대 그래프 실행 수 (0 이면 제한 없음)')
+        parser.add_argument('--ttl', type=int, default=None, help='캐시 유지 시간(초). 기본 ITINERARY_CACHE_TTL')
+        parser.add_argument('--force', action='store_true', help='이미 캐시에 있어도 다시 생성')
+        parser.add_argument('--dry-run', action='store_true', help='생성하지 않고 대상 조합만 출력')
+
+    def _parameter_list(self, options) -> list:
+        if options['params_file']:
+            with open(options['params_file'], encoding='utf-8') as f:
+                data = json.load(f)
+            # {"session_parameters": {...}} 형태(요청 본문 그대로)도 허용
+            return [item.get('session_parameters', item) if isinstance(item, dict) else item for item in data]
+        since = timezone.now() - timedelta(days=options['days'])
+        return list(
+            ChatSession.objects
+            .filter(created_at__gte=since)
+            .order_by('created_at')
+            .values_list('parameters', flat=True)
+        )
+
+    def handle(self, *args, **options):
+        combinations = top_combinations(self._parameter_list(options), options['top'])
+        if not combinations:
+            self.stdout.write("생성할 조합이 없습니다.")
+            return
+
+        targets = []
+        for count, session_parameters in combinations:
+            cached = not options['force'] and itinerary_cache.contains(session_parameters)
+            if options['dry_run'] or options['verbosity'] > 1:
+                self.stdout.write(f"{count:>5}  {'cached ' if cached else 'pending'}  {_label(session_parameters)}")
+            if not cached:
+                targets.append(session_parameters)
+        skipped = len(combinations) - len(targets)
+        self.stdout.write(f"조합 {len(combinations)}개 중 캐시됨 {skipped}개, 생성 대상 {len(targets)}개")
+        if options['dry_run'] or not targets:
+            return
+
+        from api.services.teamdb_langgraph_v5 import get_result, warm_up
+        warm_up()                                        # 스레드들이 동시에 그래프/클라이언트를 만들지 않도록
+        limiter = RateLimiter(options['rate'])
+
+        def generate(session_parameters):
+            limiter.acquire()
+            started = time.monotonic()
+            answer, places = get_result(session_parameters)
+            itinerary_cache.store(session_parameters, answer, places, timeout=options['ttl'])
+            return time.monotonic() - started
+
+        failures = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {pool.submit(generate, p): p for p in targets}
+            for done, future in enumerate(as_completed(futures), start=1):
+                label = _label(futures[future])
+                try:
+                    elapsed = future.result()
+                except Exception as exc:
+                    failures.append((label, f"{type(exc).__name__}: {exc}"))
+                    self.stderr.write(f"[{done}/{len(targets)}] 실패  {label}  {type(exc).__name__}: {exc}")
+                else:
+                    self.stdout.write(f"[{done}/{len(targets)}] 완료  {label}  {elapsed:.1f}s")
+
+        self.stdout.write(
+            f"생성 {len(targets) - len(failures)}개, 실패 {len(failures)}개, 건너뜀 {skipped}개 "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+        if failures:
+            for label, error in failures:
+                self.stderr.write(f"  {label}: {error}")
+            raise CommandError(f"{len(failures)}개 조합 생성 실패")
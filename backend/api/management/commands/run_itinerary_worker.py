@@ -0,0 +1,106 @@
+# api/management/commands/run_itinerary_worker.py
+"""
+일정 생성 작업 큐(ItineraryJob)를 처리하는 워커 (api/services/itinerary_jobs.py)
+
+    python manage.py run_itinerary_worker                       # 스레드 ITINERARY_JOB_WORKER_CONCURRENCY 개
+    python manage.py run_itinerary_worker --concurrency 4 --poll 1
+    python manage.py run_itinerary_worker --once                # 지금 꺼낼 수 있는 작업만 처리하고 종료 (cron/테스트)
+    python manage.py run_itinerary_worker --max-jobs 100        # 100개 처리하면 종료 (메모리 누수 대비 재시작)
+
+- 빈 스레드 수만큼 claim() 으로 작업을 꺼내 실행, 꺼낼 작업이 없으면 --poll 초 대기
+- 주기적으로 requeue_stale() 로 임대가 만료된(워커가 죽은) 작업을 다시 큐에 넣음
+- 여러 프로세스/서버에서 동시에 띄워도 같은 작업을 두 번 꺼내지 않음. 전체 동시 실행은 ITINERARY_JOB_MAX_RUNNING
+- Ctrl+C(SIGINT) 면 새 작업을 꺼내지 않고 실행 중인 작업이 끝나길 기다린 뒤 종료
+"""
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from api.services import itinerary_jobs
+
+
+def _run(job, worker_id):
+    close_old_connections()                          # 스레드마다 오래된/끊긴 연결을 버리고 새로 엶
+    try:
+        return itinerary_jobs.execute(job, worker_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "일정 생성 작업 큐(ItineraryJob)를 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='동시에 실행할 작업 수 (기본 ITINERARY_JOB_WORKER_CONCURRENCY)')
+        parser.add_argument('--poll', type=float, default=None,
+                            help='꺼낼 작업이 없을 때 대기(초, 기본 ITINERARY_JOB_POLL_SECONDS)')
+        parser.add_argument('--max-jobs', type=int, default=0, help='이만큼 처리하면 종료 (0 이면 계속)')
+        parser.add_argument('--once', action='store_true', help='지금 꺼낼 수 있는 작업만 처리하고 종료')
+        parser.add_argument('--worker-id', default=None, help='locked_by 에 남길 이름 (기본 호스트:pid)')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'] or getattr(settings, 'ITINERARY_JOB_WORKER_CONCURRENCY', 2))
+        poll = options['poll'] if options['poll'] is not None else getattr(settings, 'ITINERARY_JOB_POLL_SECONDS', 2)
+        worker_id = options['worker_id'] or f"{socket.gethostname()}:{os.getpid()}"
+        max_jobs = options['max_jobs']
+        lease = getattr(settings, 'ITINERARY_JOB_LEASE_SECONDS', itinerary_jobs.DEFAULT_LEASE_SECONDS)
+
+        from api.services.teamdb_langgraph_v5 import warm_up
+        warm_up()                                        # 스레드들이 동시에 그래프/클라이언트를 만들지 않도록
+        self.stdout.write(f"worker {worker_id} 시작 (concurrency={concurrency}, poll={poll}s)")
+
+        running = {}
+        processed = 0
+        next_sweep = 0.0
+        counts = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= next_sweep:
+                        itinerary_jobs.requeue_stale()
+                        next_sweep = now + max(poll, lease / 10)
+
+                    free = concurrency - len(running)
+                    if max_jobs:
+                        free = min(free, max_jobs - processed - len(running))
+                    try:
+                        jobs = itinerary_jobs.claim(worker_id, free) if free > 0 else []
+                    except DatabaseError as exc:                 # 잠금 대기 시간 초과/연결 끊김 → 다음 주기에 다시
+                        self.stderr.write(f"claim 실패: {type(exc).__name__}: {exc}")
+                        close_old_connections()
+                        jobs = []
+                    for job in jobs:
+                        running[pool.submit(_run, job, worker_id)] = job
+
+                    if not running:
+                        if options['once'] or (max_jobs and processed >= max_jobs):
+                            break
+                        time.sleep(poll)
+                        continue
+
+                    # 작업이 끝나거나 poll 초가 지나면 다시 꺼내 봄 (빈 슬롯이 있으면 새 작업)
+                    done, _ = wait(running, timeout=poll if free > len(jobs) else None, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        processed += 1
+                        try:
+                            result = future.result()
+                        except Exception as exc:                 # execute() 가 처리하지 못한 오류 (DB 연결 등)
+                            result = 'error'
+                            self.stderr.write(f"job {job.job_id} 오류: {type(exc).__name__}: {exc}")
+                        counts[result] = counts.get(result, 0) + 1
+                        self.stdout.write(f"job {job.job_id} (시도 {job.attempts}/{job.max_attempts}) → {result}")
+            except KeyboardInterrupt:
+                self.stdout.write(f"종료 요청 - 실행 중인 작업 {len(running)}개를 기다립니다.")
+                wait(running)
+                processed += len(running)
+
+        summary = ", ".join(f"{key} {value}" for key, value in sorted(counts.items())) or "없음"
+        self.stdout.write(f"worker {worker_id} 종료 - 처리 {processed}개 ({summary})")
@@ -0,0 +1,91 @@
+# api/management/commands/startup_benchmark.py
+"""
+Django 콜드 스타트(import) 비용 측정 커맨드
+
+    python manage.py startup_benchmark --runs 5 --max-ms 800
+
+새 파이썬 프로세스에서 django.setup() + 대상 모듈 import 시간을 반복 측정하고,
+-X importtime 결과로 가장 느린 import 를 보여줍니다.
+--max-ms 를 넘으면 실패 코드로 종료하므로 CI 에서 기동 시간 회귀를 잡을 수 있습니다.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Django 기동 + 모듈 import 시간을 새 프로세스에서 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='측정 반복 횟수')
+        parser.add_argument('--module', default='api.urls', help='django.setup() 후 import 할 모듈')
+        parser.add_argument('--top', type=int, default=10, help='가장 느린 import 몇 개를 보여줄지')
+        parser.add_argument('--max-ms', type=float, default=None, help='중앙값이 이 값을 넘으면 실패')
+
+    def handle(self, *args, **options):
+        runs = max(1, options['runs'])
+        module = options['module']
+        code = (
+            "import django; django.setup(); "
+            f"import importlib; importlib.import_module({module!r})"
+        )
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+        timings = []
+        importtime_lines = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', code],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if proc.returncode != 0:
+                raise CommandError(f"import 실패:\n{proc.stderr[-2000:]}")
+            timings.append(elapsed_ms)
+            importtime_lines = proc.stderr.splitlines()
+
+        median_ms = statistics.median(timings)
+        self.stdout.write(
+            f"{module}: runs={runs} min={min(timings):.0f}ms "
+            f"median={median_ms:.0f}ms max={max(timings):.0f}ms"
+        )
+
+        # 마지막 실행의 -X importtime 결과에서 누적 시간이 큰 최상위 패키지 출력
+        slowest = self._slowest_imports(importtime_lines, options['top'])
+        if slowest:
+            self.stdout.write("slowest imports (cumulative):")
+            for cumulative_us, name in slowest:
+                self.stdout.write(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+        if options['max_ms'] is not None and median_ms > options['max_ms']:
+            raise CommandError(
+                f"기동 시간 {median_ms:.0f}ms 가 기준 {options['max_ms']:.0f}ms 를 초과했습니다."
+            )
+
+    @staticmethod
+    def _slowest_imports(lines, top):
+        entries = []
+        for line in lines:
+            # 형식: "import time:   self [us] | cumulative | imported package"
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            parts = line[len('import time:'):].split('|')
+            if len(parts) != 3:
+                continue
+            try:
+                cumulative = int(parts[1].strip())
+            except ValueError:
+                continue
+            name = parts[2].rstrip()
+            if name.startswith(' ') and not name.startswith('  '):
+                # 들여쓰기 1칸 = 최상위 import
+                entries.append((cumulative, name.strip()))
+        entries.sort(reverse=True)
+        return entries[:top]
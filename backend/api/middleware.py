@@ -0,0 +1,44 @@
+# api/middleware.py
+"""
+요청마다 실행된 DB 쿼리 수/시간을 응답 헤더로 알려 주는 미들웨어
+
+    X-DB-Queries: 12
+    X-DB-Time-Ms: 3.4
+
+DEBUG 와 관계없이 connection.execute_wrapper 로 세기 때문에 운영과 같은 설정에서도 쓸 수 있습니다.
+settings.QUERY_COUNT_HEADERS=True 일 때만 MIDDLEWARE 에 추가됩니다. (load_test 커맨드가 엔드포인트별로 집계)
+스트리밍 응답(SSE)은 본문을 보내는 동안 실행되는 쿼리가 빠지므로 헤더 값이 실제보다 작습니다.
+"""
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class QueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        response["X-DB-Queries"] = str(counter.count)
+        response["X-DB-Time-Ms"] = f"{counter.seconds * 1000:.1f}"
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_graphcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItineraryRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('parameters', models.JSONField()),
+                ('status', models.CharField(choices=[('running', 'running'), ('failed', 'failed'), ('succeeded', 'succeeded'), ('abandoned', 'abandoned')], default='running', max_length=16)),
+                ('thread_id', models.CharField(max_length=100)),
+                ('checkpoint_id', models.CharField(blank=True, max_length=64)),
+                ('failed_node', models.CharField(blank=True, max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('chatsession', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itinerary_runs', to='api.chatsession')),
+            ],
+        ),
+    ]
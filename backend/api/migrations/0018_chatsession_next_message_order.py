@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+def renumber_messages(apps, schema_editor):
+    """
+    세션마다 메시지를 (order, created_at, id) 순으로 0 부터 다시 번호를 매기고 next_message_order 를 채움
+    (같은 order 가 여러 개인 기존 데이터 - start2 재요청, 동시 send-messages - 를 0019 의 유니크 제약 전에 정리)
+    """
+    ChatSession = apps.get_model('api', 'ChatSession')
+    ChatMessage = apps.get_model('api', 'ChatMessage')
+    db = schema_editor.connection.alias
+    for session_id in ChatSession.objects.using(db).values_list('id', flat=True).iterator():
+        messages = list(ChatMessage.objects.using(db).filter(chatsession_id=session_id)
+                        .order_by('order', 'created_at', 'id').only('id', 'order'))
+        changed = []
+        for position, message in enumerate(messages):
+            if message.order != position:
+                message.order = position
+                changed.append(message)
+        if changed:
+            ChatMessage.objects.using(db).bulk_update(changed, ['order'], batch_size=500)
+        ChatSession.objects.using(db).filter(id=session_id).update(next_message_order=len(messages))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_itineraryrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='next_message_order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(renumber_messages, migrations.RunPython.noop),
+    ]
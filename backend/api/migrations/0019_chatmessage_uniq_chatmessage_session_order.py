@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_chatsession_next_message_order'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='chatmessage',
+            constraint=models.UniqueConstraint(fields=('chatsession', 'order'), name='uniq_chatmessage_session_order'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_chatmessage_uniq_chatmessage_session_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatcomponent',
+            index=models.Index(fields=['chatmessage', 'component_type', 'order'], name='api_chatcom_chatmes_7d86dc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['user', '-created_at'], name='api_chatses_user_id_eb64a5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourinfo',
+            index=models.Index(fields=['category_two', 'category_one', 'content_type_id'], name='api_tourinf_categor_96305f_idx'),
+        ),
+    ]
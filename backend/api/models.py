@@ -3,6 +3,7 @@ from django.db import models                       # Django ORM 기본 임포트
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.contrib.auth import get_user_model  # What: 프로젝트 설정의 User 모델을 참조하기 위해 임포트
 from django.db.models import JSONField                        # Django 3.1+ 내장 JSONField
+import uuid
 
 
 class UserManager(BaseUserManager):
@@ -54,8 +55,14 @@ class ChatSession(models.Model):
     title       = models.CharField(max_length=200)
     info        = models.TextField(null=True, blank=True)
     parameters  = models.JSONField(default=dict, blank=True)  # JSONField 이름 단축
+    # 다음 ChatMessage.order. chat_turns.reserve_orders 로만 증가 (메시지 수를 세지 않고 O(1), 동시 요청끼리 겹치지 않음)
+    next_message_order = models.PositiveIntegerField(default=0)
     created_at  = models.DateTimeField(auto_now_add=True)
     updated_at  = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # 사용자별 세션 목록 (ChatSessionViewSet: user_id = ? ORDER BY created_at DESC)
+        indexes = [models.Index(fields=['user', '-created_at'])]
     
     def __str__(self):
         return f"{self.id} – {self.title}"
@@ -90,6 +97,9 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['order']  # 기본 정렬 옵션
+        constraints = [
+            models.UniqueConstraint(fields=['chatsession', 'order'], name='uniq_chatmessage_session_order'),
+        ]
 
 class ChatComponent(models.Model):
     chatmessage     = models.ForeignKey(
@@ -101,6 +111,10 @@ class ChatComponent(models.Model):
     payload     = models.JSONField(default=dict)
     order       = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        # 메시지의 유형별 컴포넌트 (chatmessage_id = ? AND component_type = ? ORDER BY order)
+        indexes = [models.Index(fields=['chatmessage', 'component_type', 'order'])]
+
 class ChatInteraction(models.Model):
     chatmessage     = models.OneToOneField(
         ChatMessage,
@@ -129,6 +143,84 @@ class MessageEmbedding(models.Model):
     vector      = models.JSONField()  # 이름 간결화
     created_at  = models.DateTimeField(auto_now_add=True)
 
+class GraphCheckpoint(models.Model):
+    """
+    일정 생성 그래프(LangGraph)의 세션별 마지막 체크포인트
+    서버가 재시작되거나 메모리 체크포인터에서 밀려난 세션도 다음 턴에서 상태를 이어가기 위함
+    (GRAPH_CHECKPOINT_DB_STORE=True 일 때만 사용, api/services/checkpointing.py)
+    """
+    thread_id        = models.CharField(max_length=100, unique=True)   # "session-<ChatSession.id>"
+    checkpoint_type  = models.CharField(max_length=32)                 # serde.dumps_typed 의 타입 태그
+    checkpoint       = models.BinaryField()                            # channel_values 포함 전체 체크포인트
+    metadata_type    = models.CharField(max_length=32)
+    metadata         = models.BinaryField()
+    updated_at       = models.DateTimeField(auto_now=True)
+
+
+class ItineraryRun(models.Model):
+    """
+    start2 일정 생성 한 번(run)의 상태
+    실패하면 실패 직전 그래프 체크포인트와 실패한 노드를 기록해 두고, 클라이언트가 같은 run_id 로
+    다시 요청하면 처음부터가 아니라 그 체크포인트에서 실패한 노드부터 이어서 실행합니다.
+    (api/services/itinerary_runs.py)
+    """
+    run_id          = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)  # 클라이언트에 돌려주는 id
+    chatsession     = models.ForeignKey(
+        ChatSession,
+        on_delete=models.CASCADE,
+        related_name='itinerary_runs'
+    )
+    parameters      = models.JSONField()                                  # 요청의 session_parameters
+    status          = models.CharField(
+        max_length=16,
+        choices=[('running','running'),('failed','failed'),('succeeded','succeeded'),('abandoned','abandoned')],
+        default='running'
+    )
+    thread_id       = models.CharField(max_length=100)                    # 체크포인트 thread_id
+    checkpoint_id   = models.CharField(max_length=64, blank=True)         # 실패 직전 체크포인트 (재개 지점)
+    failed_node     = models.CharField(max_length=100, blank=True)
+    error           = models.TextField(blank=True)
+    attempts        = models.PositiveSmallIntegerField(default=1)         # 최초 실행 + 재개 횟수
+    created_at      = models.DateTimeField(auto_now_add=True)
+    updated_at      = models.DateTimeField(auto_now=True)
+
+
+class ItineraryJob(models.Model):
+    """
+    start2 일정 생성 작업 큐의 작업 하나 (DB 큐 - 브로커 없이 서버 한 대에서 동작)
+    POST 는 작업을 넣고 202 로 바로 응답하고, 워커(manage.py run_itinerary_worker)가 꺼내 실행합니다.
+    클라이언트는 상태 조회 또는 SSE 로 결과를 받습니다. (api/services/itinerary_jobs.py)
+    """
+    job_id          = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)  # 클라이언트에 돌려주는 id
+    chatsession     = models.ForeignKey(
+        ChatSession,
+        on_delete=models.CASCADE,
+        related_name='itinerary_jobs'
+    )
+    parameters      = models.JSONField()                                  # 요청의 session_parameters
+    fresh           = models.BooleanField(default=False)                  # 일정 결과 캐시를 건너뛸지
+    status          = models.CharField(
+        max_length=16,
+        choices=[('queued','queued'),('running','running'),('succeeded','succeeded'),('failed','failed')],
+        default='queued'
+    )
+    attempts        = models.PositiveSmallIntegerField(default=0)         # 실행 횟수 (재시도 포함)
+    max_attempts    = models.PositiveSmallIntegerField(default=3)
+    available_at    = models.DateTimeField()                              # 이 시각 이후에 꺼냄 (재시도 백오프)
+    locked_by       = models.CharField(max_length=100, blank=True)        # 실행 중인 워커
+    locked_at       = models.DateTimeField(null=True, blank=True)         # 임대 시작 - 오래되면 워커가 죽은 것으로 보고 다시 큐에
+    run_id          = models.CharField(max_length=36, blank=True)         # 실패한 ItineraryRun - 재시도 때 체크포인트에서 재개
+    result          = models.JSONField(null=True, blank=True)             # start2 와 같은 응답 본문
+    error           = models.TextField(blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    started_at      = models.DateTimeField(null=True, blank=True)         # 마지막 실행 시작
+    finished_at     = models.DateTimeField(null=True, blank=True)
+    updated_at      = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # 워커가 꺼낼 작업 (status = 'queued' AND available_at <= now ORDER BY available_at)
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
 
 '''======채팅의 고도화를 분리하기위한 DB 재구성======
 class ChatSession(models.Model):  # What: 대화 세션(챗방) 단위 데이터 모델
@@ -344,6 +436,11 @@ class TourInfo(models.Model):
     category_three      = models.CharField(max_length=50, null=True, verbose_name="Category 3")
     content_id          = models.IntegerField(null=False, verbose_name="Content ID")
 
+    class Meta:
+        # 후보 조회(teamdb_query_builder.build_tourinfo_query)의 등호 조건.
+        # address LIKE '%구%' 는 앞이 와일드카드라 인덱스를 쓸 수 없으므로 카테고리로 먼저 좁힌 뒤 address 를 검사
+        indexes = [models.Index(fields=['category_two', 'category_one', 'content_type_id'])]
+
     def __str__(self):
         return self.title
 
@@ -0,0 +1,27 @@
+# api/pagination.py
+"""
+채팅 기록 목록의 커서(keyset) 페이지네이션
+
+OFFSET 페이지는 뒤 페이지로 갈수록 앞의 행을 모두 읽고 버리므로, 세션 수백 개/긴 대화에서는 페이지마다 비용이 커집니다.
+커서 페이지는 마지막으로 본 정렬 키 다음부터 읽어(WHERE key > ? ORDER BY key LIMIT n) 페이지 위치와 관계없이 비용이 같습니다.
+(정렬 키 인덱스: ChatSession (user, -created_at), ChatMessage (chatsession, order) 유니크 제약)
+
+응답: {"next": 다음 페이지 URL 또는 null, "previous": ..., "results": [...]}
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class SessionCursorPagination(CursorPagination):
+    """세션 목록: 최신순. created_at 이 같은 세션끼리는 id 로 순서를 고정 (커서 안에 동률 개수만큼 건너뜀)"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class MessageCursorPagination(CursorPagination):
+    """메시지 목록: order 순 (세션 안에서 유일)"""
+    ordering = 'order'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -76,9 +76,9 @@ class ChatSessionSerializer(serializers.ModelSerializer):
     chat_session_id = serializers.IntegerField(
         source='id', read_only=True
     )
-    # 세션 소유자 User의 id를 'user_id'로 노출, 읽기 전용
+    # 세션 소유자 User의 id를 'user_id'로 노출, 읽기 전용 (FK 컬럼 값 그대로 - user.id 는 User 를 다시 조회함)
     user_id = serializers.IntegerField(
-        source='user.id', read_only=True
+        read_only=True
     )
     # 모델의 title 필드를 그대로 노출
     title = serializers.CharField()
@@ -131,9 +131,9 @@ class ChatMessageSerializer(serializers.ModelSerializer):
     message_time      = serializers.DateTimeField(
         source='created_at', read_only=True
     )
-    # 모델의 FK chatsession.id를 'chat_session_id'로 노출, 읽기 전용
+    # 모델의 FK chatsession.id를 'chat_session_id'로 노출, 읽기 전용 (FK 컬럼 값 - 메시지마다 세션을 조회하지 않음)
     chat_session_id   = serializers.IntegerField(
-        source='chatsession.id', read_only=True
+        source='chatsession_id', read_only=True
     )
 
     class Meta:
@@ -159,6 +159,39 @@ from .models import (                                                     # 사
     MessageEmbedding,
 )
 
+class ChatComponentItemSerializer(serializers.ModelSerializer):
+    """메시지 목록에 포함하는 컴포넌트 (?include=components)"""
+    class Meta:
+        model = ChatComponent
+        fields = ['component_type', 'payload', 'order']
+
+
+class ChatInteractionItemSerializer(serializers.ModelSerializer):
+    """메시지 목록에 포함하는 LLM 호출 기록 (?include=interaction)"""
+    class Meta:
+        model = ChatInteraction
+        fields = ['request', 'response', 'created_at']
+
+
+class ChatMessageHistorySerializer(ChatMessageSerializer):
+    """
+    메시지 목록용. context['include'] 에 있는 관계만 포함합니다.
+    뷰셋이 components 는 prefetch_related, interaction 은 select_related 로 미리 읽어 두므로 메시지마다 조회하지 않음
+    """
+    components = ChatComponentItemSerializer(many=True, read_only=True)
+    interaction = ChatInteractionItemSerializer(read_only=True, allow_null=True)   # 없으면 null
+
+    class Meta(ChatMessageSerializer.Meta):
+        fields = ChatMessageSerializer.Meta.fields + ['components', 'interaction']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        include = self.context.get('include', ())
+        for name in ('components', 'interaction'):
+            if name not in include:
+                self.fields.pop(name)
+
+
 class ChatComponentSerializer(serializers.ModelSerializer):                # ChatComponent 모델용 Serializer 정의
     class Meta:                                                          # 내부 설정 모음
         model = ChatComponent                                            # 어떤 모델을 직렬화할지 지정
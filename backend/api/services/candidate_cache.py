@@ -0,0 +1,165 @@
+# api/services/candidate_cache.py
+"""
+구/테마별 후보 조회 결과(fetch_db_*) 캐시
+
+카탈로그 테이블(api_tourinfo / api_restaurant / api_accommodation)은 CSV 적재 때만 바뀌므로
+같은 (table, district, category_two, top_k) 조회 결과를 재사용합니다.
+
+- 1차(in-process): 프로세스 메모리의 LRU + TTL. 강남구/마포구 같은 인기 구는 여기서 바로 응답
+- 2차(shared, 선택): Django cache 별칭(settings.CANDIDATE_CACHE_ALIAS). 여러 워커가 결과를 공유
+
+무효화는 세대(generation) 토큰으로 합니다. invalidate() 가 새 토큰을 저장하면 이전 세대 키는 더 이상
+조회되지 않습니다.
+- 토큰은 프로세스 간에 공유되는 캐시 별칭(settings.CANDIDATE_CACHE_GENERATION_ALIAS, 기본 "catalog")에 두고
+  조회마다 읽어 1차 키에도 넣으므로, 2차 캐시가 없어도 다른 워커의 1차 캐시가 무효화 직후부터
+  이전 행을 돌려주지 않습니다. (manage.py invalidate_candidate_cache 도 같은 별칭에 씀)
+- 토큰은 무작위 문자열이라 세대 키가 지워져도 예전 세대 값으로 돌아가지 않습니다.
+- 세대 별칭도 2차 캐시도 없으면 프로세스 안의 토큰만 사용 (무효화는 그 프로세스에만 적용)
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+GENERATION_KEY = "candidates:generation"
+
+DEFAULT_LOCAL_TTL   = 300          # 1차 캐시 유지 시간(초)
+DEFAULT_SHARED_TTL  = 60 * 60 * 24 # 2차 캐시 유지 시간(초)
+DEFAULT_MAX_ENTRIES = 256          # 1차 캐시 최대 항목 수 (구 25개 × 테마/테이블 조합)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _new_generation() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _record(outcome: str):
+    # 그래프 실행 중이면 현재 노드의 계측(GraphMetrics)에 캐시 결과를 남김
+    from .graph_metrics import record_cache
+    record_cache("candidate", outcome)
+
+
+class CandidateCache:
+    """(table, district, category_two, top_k) → 조회 결과 문자열 캐시"""
+
+    def __init__(self, local_ttl=None, shared_ttl=None, max_entries=None, shared_alias=None, generation_alias=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # key → (만료 시각, 값)
+        self._local_ttl = local_ttl
+        self._shared_ttl = shared_ttl
+        self._max_entries = max_entries
+        self._shared_alias = shared_alias
+        self._generation_alias = generation_alias
+        self._generation = _new_generation()  # 세대를 공유할 별칭이 없을 때 쓰는 프로세스 내 토큰
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    # 설정값은 호출 시점에 읽어서 테스트의 override_settings 도 반영되게 함
+    @property
+    def local_ttl(self):
+        return self._local_ttl if self._local_ttl is not None else _setting("CANDIDATE_CACHE_LOCAL_TTL", DEFAULT_LOCAL_TTL)
+
+    @property
+    def shared_ttl(self):
+        return self._shared_ttl if self._shared_ttl is not None else _setting("CANDIDATE_CACHE_SHARED_TTL", DEFAULT_SHARED_TTL)
+
+    @property
+    def max_entries(self):
+        return self._max_entries if self._max_entries is not None else _setting("CANDIDATE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+
+    def _shared(self):
+        alias = self._shared_alias or _setting("CANDIDATE_CACHE_ALIAS", None)
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    def _generation_cache(self):
+        alias = (self._generation_alias or _setting("CANDIDATE_CACHE_GENERATION_ALIAS", None)
+                 or self._shared_alias or _setting("CANDIDATE_CACHE_ALIAS", None))
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    def _current_generation(self) -> str:
+        cache = self._generation_cache()
+        if cache is None:
+            return self._generation
+        generation = cache.get(GENERATION_KEY)
+        if generation is None:                       # 처음이거나 키가 지워짐 → 새 토큰 (add 라 동시에 만들어도 하나만 남음)
+            cache.add(GENERATION_KEY, _new_generation(), timeout=None)
+            generation = cache.get(GENERATION_KEY)
+        return generation
+
+    @staticmethod
+    def make_key(table, district, category_two, top_k, generation) -> str:
+        return f"candidates:{generation}:{table}:{district}:{category_two or ''}:{int(top_k)}"
+
+    def get_or_fetch(self, table, district, category_two, top_k, fetch):
+        """캐시에 있으면 돌려주고, 없으면 fetch() 결과를 두 계층에 저장한 뒤 돌려줍니다."""
+        shared = self._shared()
+        key = self.make_key(table, district, category_two, top_k, self._current_generation())
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["local_hits"] += 1
+                _record("local_hit")
+                return entry[1]
+
+        value = shared.get(key) if shared is not None else None
+        if value is not None:
+            self._store_local(key, value, now)
+            with self._lock:
+                self.stats["shared_hits"] += 1
+            _record("shared_hit")
+            return value
+
+        value = fetch()
+        with self._lock:
+            self.stats["misses"] += 1
+        _record("miss")
+        # 빈 결과("" 또는 "[]")도 저장 - 후보가 없는 구/테마 조합을 매번 다시 스캔하지 않도록
+        if shared is not None:
+            shared.set(key, value, timeout=self.shared_ttl)
+        self._store_local(key, value, now)
+        return value
+
+    def _store_local(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.local_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """카탈로그 재적재 후 호출. 모든 세대의 후보 캐시를 무효화합니다."""
+        cache = self._generation_cache()
+        with self._lock:
+            self._entries.clear()
+            self._generation = _new_generation()
+        if cache is not None:
+            cache.set(GENERATION_KEY, _new_generation(), timeout=None)
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "local_entries": len(self._entries)}
+
+
+candidate_cache = CandidateCache()
+
+
+def invalidate_candidate_cache():
+    """CSV 로더 등 카탈로그를 다시 적재하는 코드에서 호출합니다."""
+    candidate_cache.invalidate()
@@ -0,0 +1,185 @@
+# api/services/candidate_encoding.py
+"""
+후보 행(fetch_db_*)을 프롬프트에 넣을 압축 표 형식으로 변환
+
+QuerySQLDatabaseTool 은 SELECT * 결과를 파이썬 튜플 문자열로 만들어
+식당 한 행마다 요일별 영업시간/브레이크/라스트오더 21개 컬럼까지 프롬프트에 들어갑니다.
+여기서는
+- 프롬프트(select_place_prompt / answer_prompt)가 실제로 쓰는 컬럼만 남기고
+- 영업시간은 여행 기간에 해당하는 요일만 한 칸으로 합치고
+- 짧은 별칭 헤더 + '|' 구분 행으로 출력합니다.
+
+    # 컬럼: name=store_name, cat=category, addr=address, r=rating, ...
+    name|cat|addr|r|vr|br|x|y|hours
+    오복수산|일식|서울 강남구 ...|4.6|812|355|127.02951|37.49812|토 11:00-21:00 (브레이크 15:00-17:00, LO 20:30) / 일 휴무
+
+count_tokens() 로 변환 전후 토큰 수를 비교할 수 있습니다. (tiktoken 이 설치되어 있으면 사용, 없으면 근사치)
+"""
+import math
+import re
+
+# 테이블별 (별칭, 원본 컬럼) - 프롬프트의 [store_name], [rating] 등 자리표시자가 쓰는 컬럼만
+COLUMNS = {
+    "api_tourinfo": [
+        ("name", "title"),
+        ("type", "content_type_id"),
+        ("c1", "category_one"),
+        ("c2", "category_two"),
+        ("c3", "category_three"),
+        ("addr", "address"),
+        ("x", "map_x"),
+        ("y", "map_y"),
+    ],
+    "api_restaurant": [
+        ("name", "store_name"),
+        ("cat", "category"),
+        ("addr", "address"),
+        ("r", "rating"),
+        ("vr", "visitor_review_count"),
+        ("br", "blog_review_count"),
+        ("x", "map_x"),
+        ("y", "map_y"),
+    ],
+    "api_accommodation": [
+        ("name", "store_name"),
+        ("grade", "grade"),
+        ("addr", "address"),
+        ("r", "rating"),
+        ("vr", "visitor_review_count"),
+        ("br", "blog_review_count"),
+        ("site", "reservation_site"),
+        ("x", "map_x"),
+        ("y", "map_y"),
+    ],
+}
+
+# 영업시간 컬럼이 있는 테이블
+HOURS_TABLES = {"api_restaurant"}
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+WEEKDAY_LABELS = ("월", "화", "수", "목", "금", "토", "일")
+
+COORD_DIGITS = 5                 # 소수점 5자리 ≈ 1m, 지도 표시에 충분
+MAX_VALUE_LENGTH = 120           # 긴 설명/주소 자르기
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:g}"                           # 4.60 → 4.6, 5.0 → 5
+    text = " ".join(str(value).split()).replace("|", "/")
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH - 1] + "…"
+
+
+def _coord(value) -> str:
+    if value is None or value == "":
+        return ""
+    try:
+        return f"{round(float(value), COORD_DIGITS):.{COORD_DIGITS}f}".rstrip("0").rstrip(".")
+    except (TypeError, ValueError):
+        return _clean(value)
+
+
+def _day_hours(row: dict, weekday: str) -> str:
+    biz = row.get(f"{weekday}_biz_hours")
+    if not biz:
+        return "정보없음"
+    extras = []
+    if row.get(f"{weekday}_break_time"):
+        extras.append(f"브레이크 {row[f'{weekday}_break_time']}")
+    if row.get(f"{weekday}_last_order"):
+        extras.append(f"LO {row[f'{weekday}_last_order']}")
+    return _clean(biz) + (f" ({', '.join(extras)})" if extras else "")
+
+
+def collapse_hours(row: dict, weekdays) -> str:
+    """
+    여행 요일(0=월 … 6=일)의 영업시간을 한 칸으로 합침.
+    모든 요일이 같으면 한 번만, 다르면 '토 ... / 일 ...' 형태. weekdays 가 비어 있으면 전체 요일
+    """
+    weekdays = sorted(set(weekdays)) or list(range(7))
+    per_day = [(WEEKDAY_LABELS[i], _day_hours(row, WEEKDAYS[i])) for i in weekdays]
+    if len({hours for _, hours in per_day}) == 1:
+        return per_day[0][1]
+    return " / ".join(f"{label} {hours}" for label, hours in per_day)
+
+
+def encode_candidates(table: str, rows, weekdays=()) -> str:
+    """후보 행(dict 목록) → 별칭 헤더 + 압축 표 문자열. 행이 없으면 빈 문자열(기존과 동일)"""
+    if not rows:
+        return ""
+    columns = [(alias, column) for alias, column in COLUMNS.get(table, []) if column in rows[0]]
+    if not columns:                                   # 알 수 없는 테이블/컬럼: 모든 컬럼 사용
+        columns = [(column, column) for column in rows[0].keys()]
+    with_hours = table in HOURS_TABLES and any(f"{day}_biz_hours" in rows[0] for day in WEEKDAYS)
+
+    legend = ", ".join(f"{alias}={column}" for alias, column in columns if alias != column)
+    header = [alias for alias, _ in columns] + (["hours"] if with_hours else [])
+    lines = []
+    if legend:
+        lines.append(f"# 컬럼: {legend}" + (", hours=여행 요일 영업시간" if with_hours else ""))
+    lines.append("|".join(header))
+    for row in rows:
+        values = [
+            _coord(row.get(column)) if column in ("map_x", "map_y") else _clean(row.get(column))
+            for _, column in columns
+        ]
+        if with_hours:
+            values.append(collapse_hours(row, weekdays))
+        lines.append("|".join(values))
+    return "\n".join(lines)
+
+
+def raw_encoding(rows) -> str:
+    """QuerySQLDatabaseTool 과 같은 방식의 문자열 (비교용)"""
+    if not rows:
+        return ""
+    return str([tuple(row.values()) for row in rows])
+
+
+_encoder = None
+
+def _tiktoken_encoder():
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:                             # 미설치/인코딩 파일 다운로드 실패
+            _encoder = False
+    return _encoder
+
+
+_WORD_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+def count_tokens(text: str) -> int:
+    """
+    토큰 수 추정. tiktoken(cl100k) 이 있으면 그 값을, 없으면
+    영문 단어 ≈ 1.3, 숫자 3자리 ≈ 1, 한글/기호 1자 ≈ 1 토큰으로 근사합니다. (변환 전후 비교 용도)
+    """
+    if not text:
+        return 0
+    encoder = _tiktoken_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    total = 0.0
+    for piece in _WORD_RE.findall(text):
+        if piece.isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif piece.isascii() and piece.isalpha():
+            total += 1.3
+        else:
+            total += 1
+    return int(math.ceil(total))
+
+
+def token_report(table: str, rows, weekdays=()) -> dict:
+    """{"rows", "raw_tokens", "compact_tokens", "ratio"}"""
+    raw = count_tokens(raw_encoding(rows))
+    compact = count_tokens(encode_candidates(table, rows, weekdays))
+    return {
+        "rows": len(rows or []),
+        "raw_tokens": raw,
+        "compact_tokens": compact,
+        "ratio": round(compact / raw, 3) if raw else 0.0,
+    }
@@ -0,0 +1,76 @@
+# api/services/chat_turns.py
+"""
+봇 턴(ChatMessage + ChatInteraction + ChatComponent) 저장
+
+예전에는 컴포넌트(장소/델타)마다 create() 를 하고, 응답을 만들려고 방금 넣은 컴포넌트를 다시 조회했습니다.
+(5일 일정이면 장소 20개 안팎 → INSERT 20여 번 + SELECT)
+여기서는 한 트랜잭션에서
+- 봇 메시지 INSERT 1번 (MySQL 은 bulk_create 로 pk 를 돌려받지 못하므로 save)
+- ChatInteraction INSERT 1번
+- ChatComponent bulk_create 1번
+으로 저장하고, 응답은 메모리에 있는 값으로 만듭니다. 컴포넌트 수와 관계없이 문장 수가 같습니다.
+
+    message, components = save_assistant_turn(session, answer, components=place_components(places),
+                                              interaction=(request_data, response_data))
+
+메시지 order 는 ChatSession.next_message_order 에서 reserve_orders 로 예약합니다.
+세션 행을 잠그고 카운터만 올리므로 대화 길이와 관계없이 쿼리 2번이고, 동시에 보낸 메시지끼리 겹치지 않습니다.
+((chatsession, order) 유니크 제약)
+"""
+from django.db import transaction
+from django.db.models import F
+
+from api.models import ChatComponent, ChatInteraction, ChatMessage, ChatSession
+
+# send-messages 델타 중 ChatComponent 로 남기는 유형 (text 는 본문/interaction, end 는 버림)
+COMPONENT_DELTA_TYPES = ('map_marker', 'form', 'image_carousel', 'button')
+
+
+def place_components(places) -> list:
+    """start2 장소 목록 → [(component_type, payload, order), ...]"""
+    return [('place', place, idx) for idx, place in enumerate(places)]
+
+
+def delta_components(deltas) -> list:
+    """send-messages 델타 → UI 컴포넌트. order 는 델타 목록에서의 위치"""
+    return [(delta['type'], delta.get('payload', {}), idx)
+            for idx, delta in enumerate(deltas) if delta.get('type') in COMPONENT_DELTA_TYPES]
+
+
+def delta_interaction(deltas):
+    """첫 번째 text 델타 → ChatInteraction 의 (request, response). 없으면 None"""
+    text_delta = next((d for d in deltas if d.get('type') == 'text'), None)
+    return ({}, text_delta.get('payload', {})) if text_delta else None
+
+
+def reserve_orders(session_id, count=1) -> int:
+    """
+    세션의 다음 메시지 order 를 count 개 예약하고 첫 번째 값을 돌려줌
+    호출한 트랜잭션이 끝날 때까지 세션 행이 잠기므로 메시지 INSERT 와 같은 트랜잭션에서 부르면 order 순서 = 커밋 순서
+    """
+    with transaction.atomic():
+        first = (ChatSession.objects.select_for_update()
+                 .values_list('next_message_order', flat=True).get(pk=session_id))
+        ChatSession.objects.filter(pk=session_id).update(next_message_order=F('next_message_order') + count)
+    return first
+
+
+def save_assistant_turn(session, content, components=(), interaction=None, order=None):
+    """
+    봇 메시지와 그 interaction/컴포넌트를 한 트랜잭션으로 저장
+    components: [(component_type, payload, order), ...]
+    interaction: (request, response) 또는 None
+    order: 미리 예약한 메시지 order. None 이면 여기서 reserve_orders 로 예약
+    Returns: (봇 ChatMessage, 저장한 ChatComponent 목록) - 다시 조회하지 않은 메모리 객체
+    """
+    with transaction.atomic():
+        if order is None:
+            order = reserve_orders(session.pk)
+        message = ChatMessage.objects.create(chatsession=session, order=order, sender='assistant', content=content)
+        if interaction is not None:
+            ChatInteraction.objects.create(chatmessage=message, request=interaction[0], response=interaction[1])
+        rows = [ChatComponent(chatmessage=message, component_type=component_type, payload=payload, order=idx)
+                for component_type, payload, idx in components]
+        if rows:
+            ChatComponent.objects.bulk_create(rows)
+    return message, rows
@@ -0,0 +1,192 @@
+# api/services/checkpointing.py
+"""
+일정 생성 그래프용 체크포인터
+
+MemorySaver 는 thread_id 별 체크포인트를 프로세스가 끝날 때까지 계속 쌓습니다.
+BoundedMemorySaver 는 같은 저장 구조를 쓰되 thread(= 채팅 세션) 단위로 정리합니다.
+
+- LRU:   GRAPH_CHECKPOINT_MAX_THREADS 개를 넘으면 가장 오래 안 쓴 세션부터 삭제
+- TTL:   GRAPH_CHECKPOINT_TTL 초 동안 접근이 없던 세션 삭제
+- 메모리: 직렬화된 체크포인트/쓰기/채널 값 크기 합이 GRAPH_CHECKPOINT_MAX_BYTES 를 넘으면 LRU 삭제
+- DB 저장(선택): GRAPH_CHECKPOINT_DB_STORE=True 면 세션별 마지막 체크포인트를 GraphCheckpoint 에 저장하고,
+  메모리에 없는 세션을 조회할 때 DB 에서 복원 → 재시작/삭제 후에도 다음 턴이 이전 상태를 이어감
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_THREADS = 500
+DEFAULT_TTL         = 60 * 60            # 1시간
+DEFAULT_MAX_BYTES   = 64 * 1024 * 1024   # 64MB
+
+
+def session_thread_id(session_id) -> str:
+    """ChatSession.id → 체크포인트 thread_id"""
+    return f"session-{session_id}"
+
+
+def _typed_size(typed) -> int:
+    # serde.dumps_typed 결과: (타입 태그, bytes)
+    return len(typed[1]) if typed and typed[1] else 0
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """thread 수/유휴 시간/메모리 상한이 있는 InMemorySaver"""
+
+    def __init__(self, *, max_threads=None, ttl=None, max_bytes=None, db_store=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads if max_threads is not None else getattr(
+            settings, "GRAPH_CHECKPOINT_MAX_THREADS", DEFAULT_MAX_THREADS)
+        self.ttl = ttl if ttl is not None else getattr(settings, "GRAPH_CHECKPOINT_TTL", DEFAULT_TTL)
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, "GRAPH_CHECKPOINT_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.db_store = db_store if db_store is not None else getattr(settings, "GRAPH_CHECKPOINT_DB_STORE", False)
+        self._lock = threading.RLock()
+        self._threads = OrderedDict()    # thread_id → 마지막 접근 시각 (오래된 순)
+        self._thread_bytes = {}          # thread_id → 직렬화 크기 합
+        self.total_bytes = 0
+        self.evictions = 0
+
+    # ── 조회 ────────────────────────────────────────────────
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire(time.monotonic())
+            if self.db_store and thread_id not in self._threads and not config["configurable"].get("checkpoint_id"):
+                self._restore_from_db(thread_id)
+            result = super().get_tuple(config)
+            if thread_id in self._threads:
+                self._touch(thread_id)
+            elif not self.storage.get(thread_id):
+                # 부모 클래스의 defaultdict 가 빈 항목을 만들었다면 정리
+                self.storage.pop(thread_id, None)
+            return result
+
+    # ── 저장 ────────────────────────────────────────────────
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            added = sum(
+                _typed_size(self.blobs.get((thread_id, checkpoint_ns, k, v)))
+                for k, v in new_versions.items()
+            )
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added += _typed_size(saved[0]) + _typed_size(saved[1])
+            self._account(thread_id, added)
+            self._evict(keep=thread_id)
+        if self.db_store and checkpoint_ns == "":
+            self._save_to_db(thread_id, checkpoint, metadata)
+        return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""),
+                     config["configurable"]["checkpoint_id"])
+        with self._lock:
+            before = self._writes_size(outer_key)
+            super().put_writes(config, writes, task_id, task_path)
+            self._account(thread_id, self._writes_size(outer_key) - before)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._threads.pop(thread_id, None)
+            self.total_bytes -= self._thread_bytes.pop(thread_id, 0)
+
+    # 비동기 버전: DB 저장을 쓰면 ORM 호출이 있으므로 스레드로 넘김
+    async def aget_tuple(self, config):
+        if self.db_store:
+            from asgiref.sync import sync_to_async
+            return await sync_to_async(self.get_tuple)(config)
+        return self.get_tuple(config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        if self.db_store:
+            from asgiref.sync import sync_to_async
+            return await sync_to_async(self.put)(config, checkpoint, metadata, new_versions)
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    # ── 정리 ────────────────────────────────────────────────
+    def _writes_size(self, outer_key) -> int:
+        inner = self.writes.get(outer_key) or {}
+        return sum(len(value[2][1] or b"") for value in inner.values())
+
+    def _touch(self, thread_id):
+        self._threads[thread_id] = time.monotonic()
+        self._threads.move_to_end(thread_id)
+
+    def _account(self, thread_id, added):
+        self._touch(thread_id)
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + added
+        self.total_bytes += added
+
+    def _expire(self, now):
+        while self._threads:
+            thread_id, last_access = next(iter(self._threads.items()))
+            if now - last_access < self.ttl:
+                break
+            self._drop(thread_id)
+
+    def _evict(self, keep):
+        self._expire(time.monotonic())
+        # 방금 쓴 세션(keep)은 남김 - 한 세션이 상한보다 커도 실행 중인 그래프는 계속 진행
+        while len(self._threads) > 1 and (
+            len(self._threads) > self.max_threads or self.total_bytes > self.max_bytes
+        ):
+            thread_id = next(iter(self._threads))
+            if thread_id == keep:
+                break
+            self._drop(thread_id)
+
+    def _drop(self, thread_id):
+        self.delete_thread(thread_id)
+        self.evictions += 1
+        logger.debug("evicted graph checkpoint thread %s", thread_id)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"threads": len(self._threads), "bytes": self.total_bytes, "evictions": self.evictions}
+
+    # ── DB 저장 ─────────────────────────────────────────────
+    def _save_to_db(self, thread_id, checkpoint, metadata):
+        from ..models import GraphCheckpoint
+
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(metadata)
+        try:
+            GraphCheckpoint.objects.update_or_create(
+                thread_id=thread_id,
+                defaults={
+                    "checkpoint_type": checkpoint_type,
+                    "checkpoint":      checkpoint_bytes,
+                    "metadata_type":   metadata_type,
+                    "metadata":        metadata_bytes,
+                },
+            )
+        except Exception:
+            # DB 저장 실패가 일정 생성 자체를 막지는 않음 (메모리 체크포인트는 유지)
+            logger.exception("failed to persist graph checkpoint %s", thread_id)
+
+    def _restore_from_db(self, thread_id):
+        from ..models import GraphCheckpoint
+
+        row = GraphCheckpoint.objects.filter(thread_id=thread_id).first()
+        if row is None:
+            return
+        checkpoint = self.serde.loads_typed((row.checkpoint_type, bytes(row.checkpoint)))
+        metadata = self.serde.loads_typed((row.metadata_type, bytes(row.metadata)))
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        # 부모 클래스 put 으로 메모리에 다시 올림 (DB 재저장은 하지 않음)
+        super().put(config, checkpoint, metadata, dict(checkpoint["channel_versions"]))
+        saved = self.storage[thread_id][""][checkpoint["id"]]
+        restored = sum(_typed_size(blob) for key, blob in self.blobs.items() if key[0] == thread_id)
+        self._account(thread_id, restored + _typed_size(saved[0]) + _typed_size(saved[1]))
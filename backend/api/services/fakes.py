@@ -0,0 +1,385 @@
+# api/services/fakes.py
+"""
+Gemini / Tavily / MySQL 없이 일정 생성 그래프를 돌리기 위한 로컬 대역(fake)
+
+- FakeGenerativeAI / FakeChatGoogleGenerativeAI: 프롬프트 종류를 보고 정해진 형식의 응답을 돌려주는 LLM.
+  지연(latency_ms ± jitter_ms)을 흉내 내고, 스트리밍은 chunk_chars 글자씩 나눠 보냄
+- FakeTavilySearch: TavilySearch 와 같은 {"results": [...]} 를 돌려주는 검색 도구
+- seeded_catalog_db(): api_tourinfo / api_restaurant / api_accommodation 과 같은 컬럼의
+  합성 행을 채운 SQLite SQLDatabase (teamdb_query_builder 의 SQL 을 그대로 실행)
+
+fake_backends() 안에서는(또는 install() 후에는) 그래프(teamdb_langgraph_v5)와 llm_registry 가 이 대역을 사용합니다.
+서버 전체를 대역으로 띄우려면 TEAMDB_FAKE_BACKENDS=1 (backend/wsgi.py, asgi.py → install_from_env)
+
+    with fake_backends(llm_latency_ms=800, llm_jitter_ms=200, search_latency_ms=300):
+        teamdb_langgraph_v5.get_result(session_parameters)
+
+python manage.py graph_benchmark 가 이것으로 처리량/지연 회귀를 측정합니다.
+"""
+import asyncio
+import json
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel, BaseLLM
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import (ChatGeneration, ChatGenerationChunk, ChatResult, Generation,
+                                    GenerationChunk, LLMResult)
+from pydantic import PrivateAttr
+
+SEOUL_DISTRICTS = (
+    "강남구", "강동구", "강북구", "강서구", "관악구", "광진구", "구로구", "금천구", "노원구",
+    "도봉구", "동대문구", "동작구", "마포구", "서대문구", "서초구", "성동구", "성북구", "송파구",
+    "양천구", "영등포구", "용산구", "은평구", "종로구", "중구", "중랑구",
+)
+
+# 합성 카탈로그 이름: "강남구 식당 03" - 응답기가 프롬프트 안의 후보 이름을 이 형식으로 찾아 씀
+KIND_LABELS = {"restaurant": "식당", "tourinfo": "관광지", "accommodation": "숙소"}
+_NAME_PATTERN = re.compile(r"[가-힣]+구 (식당|관광지|숙소) \d{2}")
+
+
+# ── 응답기 ────────────────────────────────────────────────────
+def _candidate_names(prompt: str) -> dict:
+    """프롬프트에 나온 합성 후보 이름 → {"식당": [...], "관광지": [...], "숙소": [...]} (등장 순서, 중복 제거)"""
+    names = {label: [] for label in KIND_LABELS.values()}
+    for match in _NAME_PATTERN.finditer(prompt):
+        if match.group(0) not in names[match.group(1)]:
+            names[match.group(1)].append(match.group(0))
+    return names
+
+
+def _pick_places(prompt: str) -> list:
+    names = _candidate_names(prompt)
+    places = names["식당"][:3] + names["관광지"][:2] + names["숙소"][:1]
+    return places or ["장소 01"]
+
+
+def _prose_plan(prompt: str) -> str:
+    # itinerary_prose_prompt: 틀을 그대로 옮기고 '추천 이유' 줄만 채움
+    body = prompt.split("장소와 순서는 아래 틀로 이미 정해져 있습니다.", 1)[1].split("**작성 규칙:**", 1)[0]
+    body = body.strip().replace("- **추천 이유**: ", "- **추천 이유**: 평점과 리뷰 수가 높아 일정에 넣었어요.")
+    return "# OnGill\n\n## 1. 즐거운 여행을 위한 OnGill의 Summary\n테마에 맞춘 일정이에요.\n\n---\n\n## 2. 일정 세부 정보\n\n" + body
+
+
+def canned_response(prompt: str) -> str:
+    """이 저장소의 프롬프트 종류별로 그래프가 파싱할 수 있는 응답을 만듭니다."""
+    if "'title' and 'info'" in prompt:                                 # ss_LLMService 세션 메타데이터
+        return json.dumps({"title": "테스트 여행", "info": "친구랑 가볍게 다녀올 일정이야.\n\n추천 코스를 알려줘."},
+                          ensure_ascii=False)
+    if "장소와 순서는 아래 틀로 이미 정해져 있습니다." in prompt:          # planned: 설명 문장 작성
+        return _prose_plan(prompt)
+    if "list 형식으로 작성하세요" in prompt:                             # two_pass: 장소 선택
+        return repr(_pick_places(prompt))
+    if '"places"' in prompt:                                          # answer_prompt (two_pass/single_pass)
+        places = _pick_places(prompt)
+        answer = "# OnGill\n\n## 2. 일정 세부 정보\n" + "\n".join(f"#### {name}\n- **추천 이유**: 테스트" for name in places)
+        return json.dumps({"answer": answer, "places": [{"name": name} for name in places]}, ensure_ascii=False)
+    return "SELECT 1"                                                 # llm 모드 SQL 작성 등
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 2)                                     # 한국어 기준 대략 2글자당 1토큰
+
+
+class _FakeTiming:
+    """latency_ms ± jitter_ms 지연과 응답 생성 (두 fake 모델이 공유)"""
+
+    def _delay(self) -> float:
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _respond(self, prompt: str) -> str:
+        return (self.responder or canned_response)(prompt)
+
+    def _chunks(self, text: str):
+        size = max(1, self.chunk_chars)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def _usage(self, prompt: str, text: str) -> dict:
+        input_tokens, output_tokens = _tokens(prompt), _tokens(text)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+
+class FakeGenerativeAI(_FakeTiming, BaseLLM):
+    """GoogleGenerativeAI 대역 (teamdb_langgraph_v5 의 _get_llm)"""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    chunk_chars: int = 40
+    responder: Optional[Callable[[str], str]] = None
+    seed: Optional[int] = None
+    _rng: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-google-generative-ai"
+
+    def _generation(self, prompt: str) -> Generation:
+        text = self._respond(prompt)
+        return Generation(text=text, generation_info={"usage_metadata": self._usage(prompt, text)})
+
+    def _generate(self, prompts, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        generations = []
+        for prompt in prompts:
+            time.sleep(self._delay())
+            generations.append([self._generation(prompt)])
+        return LLMResult(generations=generations)
+
+    async def _agenerate(self, prompts, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs):
+        generations = []
+        for prompt in prompts:
+            await asyncio.sleep(self._delay())
+            generations.append([self._generation(prompt)])
+        return LLMResult(generations=generations)
+
+    def _stream(self, prompt, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        time.sleep(self._delay())
+        for piece in self._chunks(self._respond(prompt)):
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, prompt, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs):
+        await asyncio.sleep(self._delay())
+        for piece in self._chunks(self._respond(prompt)):
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+def _message_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class FakeChatGoogleGenerativeAI(_FakeTiming, BaseChatModel):
+    """ChatGoogleGenerativeAI 대역 (ss_LLMService, single_pass 의 _get_structured_llm)"""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    chunk_chars: int = 40
+    responder: Optional[Callable[[str], str]] = None
+    seed: Optional[int] = None
+    _rng: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-google-generative-ai"
+
+    def _result(self, messages) -> ChatResult:
+        prompt = _message_text(messages)
+        text = self._respond(prompt)
+        message = AIMessage(content=text, usage_metadata=self._usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        time.sleep(self._delay())
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs):
+        await asyncio.sleep(self._delay())
+        return self._result(messages)
+
+    def _stream(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        time.sleep(self._delay())
+        for piece in self._chunks(self._respond(_message_text(messages))):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs):
+        await asyncio.sleep(self._delay())
+        for piece in self._chunks(self._respond(_message_text(messages))):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+class FakeTavilySearch:
+    """TavilySearch 대역 - invoke/ainvoke({"query": ...}) → {"query", "results": [{"title", "url", "content"}]}"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, max_results: int = 3, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_results = max_results
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _results(self, query: str) -> dict:
+        with self._lock:
+            self.calls += 1
+        return {"query": query, "results": [
+            {"title": f"{query} 후기 {i + 1}", "url": f"https://example.com/{i + 1}",
+             "content": f"{query} 방문 후기 {i + 1}"}
+            for i in range(self.max_results)
+        ]}
+
+    def invoke(self, tool_input):
+        time.sleep(self._delay())
+        return self._results(tool_input["query"])
+
+    async def ainvoke(self, tool_input):
+        await asyncio.sleep(self._delay())
+        return self._results(tool_input["query"])
+
+
+# ── 합성 카탈로그 DB ─────────────────────────────────────────
+def _columns(model) -> list:
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _catalog_rows(district: str, index: int, rng: random.Random):
+    from .teamdb_langgraph_v5 import THEME_TO_CATEGORY_TWO
+    category_twos = sorted(set(THEME_TO_CATEGORY_TWO.values()))
+    district_offset = SEOUL_DISTRICTS.index(district) if district in SEOUL_DISTRICTS else 0
+    # 구마다 조금씩 다른 위치, 구 안에서는 약 2km 반경에 흩어 놓음
+    base_x, base_y = 126.90 + district_offset * 0.008, 37.48 + (district_offset % 5) * 0.02
+
+    def point():
+        return round(base_x + rng.uniform(-0.02, 0.02), 6), round(base_y + rng.uniform(-0.015, 0.015), 6)
+
+    address = f"서울특별시 {district} 테스트로 {index + 1}"
+    hours = "10:00-22:00"
+    x, y = point()
+    tourinfo = {
+        "title": f"{district} 관광지 {index:02d}", "content_type_id": "관광지", "address": address,
+        "lDongRegnCd": "11", "lDongSignguCd": str(district_offset), "map_x": x, "map_y": y,
+        "category_one": "인문(문화/예술/역사)", "category_two": category_twos[index % len(category_twos)],
+        "category_three": "테스트", "content_id": index,
+    }
+    x, y = point()
+    restaurant = {
+        "store_name": f"{district} 식당 {index:02d}", "category": "한식", "address": address,
+        "rating": round(rng.uniform(3.5, 5.0), 1), "visitor_review_count": rng.randint(0, 300),
+        "blog_review_count": rng.randint(0, 120), "map_x": x, "map_y": y,
+        **{f"{day}_biz_hours": hours for day in ("monday", "tuesday", "wednesday", "thursday",
+                                                 "friday", "saturday", "sunday")},
+    }
+    x, y = point()
+    accommodation = {
+        "store_name": f"{district} 숙소 {index:02d}", "grade": "4성", "address": address,
+        "rating": round(rng.uniform(3.5, 5.0), 1), "visitor_review_count": rng.randint(0, 300),
+        "blog_review_count": rng.randint(0, 120), "reservation_site": "https://example.com/booking",
+        "map_x": x, "map_y": y,
+    }
+    return tourinfo, restaurant, accommodation
+
+
+def seeded_catalog_db(path: Optional[str] = None, districts=SEOUL_DISTRICTS, rows_per_district: int = 30,
+                      seed: int = 0):
+    """
+    api_tourinfo / api_restaurant / api_accommodation 을 Django 모델과 같은 컬럼으로 만들고
+    구마다 rows_per_district 개씩 합성 행을 채운 SQLite 파일 → SQLDatabase
+    """
+    from langchain_community.utilities import SQLDatabase
+    from api.models import Accommodation, Restaurant, TourInfo
+
+    path = path or tempfile.NamedTemporaryFile(prefix="catalog-", suffix=".sqlite3", delete=False).name
+    rng = random.Random(seed)
+    tables = (("api_tourinfo", TourInfo), ("api_restaurant", Restaurant), ("api_accommodation", Accommodation))
+    with sqlite3.connect(path) as connection:
+        for table, model in tables:
+            columns = _columns(model)
+            connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+        for district in districts:
+            for index in range(rows_per_district):
+                for (table, model), row in zip(tables, _catalog_rows(district, index, rng)):
+                    columns = [c for c in _columns(model) if c in row]
+                    connection.execute(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        [row[c] for c in columns])
+    return SQLDatabase.from_uri(f"sqlite:///{path}")
+
+
+# ── 설치 ──────────────────────────────────────────────────────
+def install(llm_latency_ms: float = 0.0, llm_jitter_ms: float = 0.0, search_latency_ms: float = 0.0,
+            search_jitter_ms: float = 0.0, db=None, responder=None, seed: int = 0):
+    """
+    그래프의 LLM/구조화 LLM/DB/웹 검색과 llm_registry 의 클라이언트 생성을 대역으로 바꿉니다.
+    db 를 주지 않으면 seeded_catalog_db() 로 새로 만듭니다.
+    Returns: (대역 dict, 원래대로 되돌리는 함수)
+    """
+    from . import llm_registry, teamdb_langgraph_v5 as graph
+
+    timing = {"latency_ms": llm_latency_ms, "jitter_ms": llm_jitter_ms, "responder": responder, "seed": seed}
+    backends = {
+        "llm": FakeGenerativeAI(**timing),
+        "chat": FakeChatGoogleGenerativeAI(**timing),
+        "search": FakeTavilySearch(search_latency_ms, search_jitter_ms, seed=seed),
+        "db": db if db is not None else seeded_catalog_db(seed=seed),
+    }
+
+    def factory(kind, model_name, options):
+        return backends["chat"] if kind == "chat" else backends["llm"]
+
+    previous = graph.set_backends(llm=backends["llm"], structured_llm=backends["chat"], db=backends["db"])
+    previous_search = graph._search_tool
+    graph.set_search_tool(backends["search"])
+    previous_factory = llm_registry.set_factory(factory)
+    llm_registry.clear()
+
+    def restore():
+        llm_registry.set_factory(previous_factory)
+        llm_registry.clear()
+        graph.set_search_tool(previous_search)
+        graph.set_backends(**previous)
+
+    return backends, restore
+
+
+def install_from_env():
+    """
+    TEAMDB_FAKE_BACKENDS=1 로 띄운 서버(wsgi/asgi)에서 호출. 지연 시간은 환경변수로 지정
+    (FAKE_LLM_LATENCY_MS, FAKE_LLM_JITTER_MS, FAKE_SEARCH_LATENCY_MS, FAKE_SEARCH_JITTER_MS, FAKE_CATALOG_DB)
+    FAKE_CATALOG_DB 에 경로를 주면 워커끼리 같은 합성 카탈로그 파일을 씀
+    """
+    import os
+
+    def number(name, default):
+        return float(os.environ.get(name, default))
+
+    path = os.environ.get("FAKE_CATALOG_DB")
+    db = None
+    if path:
+        from langchain_community.utilities import SQLDatabase
+        db = SQLDatabase.from_uri(f"sqlite:///{path}") if os.path.exists(path) else seeded_catalog_db(path)
+    return install(llm_latency_ms=number("FAKE_LLM_LATENCY_MS", 800), llm_jitter_ms=number("FAKE_LLM_JITTER_MS", 200),
+                   search_latency_ms=number("FAKE_SEARCH_LATENCY_MS", 300),
+                   search_jitter_ms=number("FAKE_SEARCH_JITTER_MS", 100), db=db)
+
+
+@contextmanager
+def fake_backends(**config):
+    """with 블록 동안만 install(**config) 을 적용하고 나갈 때 원래 객체로 되돌림"""
+    backends, restore = install(**config)
+    try:
+        yield backends
+    finally:
+        restore()
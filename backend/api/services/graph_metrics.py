@@ -0,0 +1,209 @@
+# api/services/graph_metrics.py
+"""
+일정 생성 그래프 계측
+
+GraphMetrics 하나가 한 번의 실행(한 턴)을 기록합니다.
+- 노드별 실행 시간(ms): LangGraph 노드 run 의 on_chain_start/end 콜백
+- 노드별 LLM 호출 수, 입력/출력 토큰: on_llm_end 의 usage_metadata
+- 노드별 재시도 수: 같은 노드 태스크가 다시 시작된 횟수 (RetryPolicy 는 on_retry 콜백을 보내지 않음)
+- 노드별 캐시 히트/미스: candidate_cache, web_search 가 record_cache() 로 알림
+
+make_config(..., metrics=...) 가 콜백 핸들러와 configurable["metrics"] 를 넣어 주고,
+결과(as_dict)는 봇 메시지의 ChatInteraction.response["metrics"] 에 저장됩니다.
+집계는 python manage.py graph_latency_report 로 봅니다.
+"""
+import threading
+import time
+
+
+
+def _empty_node() -> dict:
+    return {"ms": 0.0, "calls": 0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0,
+            "retries": 0, "errors": 0, "cache": {}}
+
+
+class GraphMetrics:
+    """한 턴의 노드별 계측 값"""
+
+    def __init__(self, **extra):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.total_ms = None
+        self.nodes = {}
+        self.extra = dict(extra)          # graph_mode, itinerary_cache 등 실행 단위 정보
+
+    @property
+    def handler(self):
+        """그래프 config["callbacks"] 에 넣을 콜백 핸들러 (GraphMetricsHandler)"""
+        return _handler_class()(self)
+
+    def _node(self, name: str) -> dict:
+        return self.nodes.setdefault(name, _empty_node())
+
+    def add(self, node: str, **counts):
+        with self._lock:
+            entry = self._node(node)
+            for key, value in counts.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def add_cache(self, node: str, cache: str, outcome: str, count: int = 1):
+        with self._lock:
+            stats = self._node(node)["cache"].setdefault(cache, {})
+            stats[outcome] = stats.get(outcome, 0) + count
+
+    def finish(self) -> "GraphMetrics":
+        if self.total_ms is None:
+            self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        return self
+
+    def as_dict(self) -> dict:
+        self.finish()
+        with self._lock:
+            nodes = {
+                name: {**values, "ms": round(values["ms"], 1)}
+                for name, values in self.nodes.items()
+            }
+        return {"total_ms": self.total_ms, "nodes": nodes, **self.extra}
+
+
+def _usage(response) -> tuple:
+    """LLMResult → (입력 토큰, 출력 토큰). 모델이 사용량을 주지 않으면 (0, 0)"""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if not usage:
+                usage = (generation.generation_info or {}).get("usage_metadata")
+            if usage:
+                input_tokens += usage.get("input_tokens", 0) or 0
+                output_tokens += usage.get("output_tokens", 0) or 0
+    if not (input_tokens or output_tokens):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = usage.get("prompt_tokens", 0) or 0
+        output_tokens = usage.get("completion_tokens", 0) or 0
+    return input_tokens, output_tokens
+
+
+class _NodeCallbacks:
+    """
+    LangChain 콜백 → GraphMetrics (BaseCallbackHandler 와 합쳐서 쓰는 본체. _handler_class 참고)
+
+    노드 하나를 실행하면 on_chain_start 가 두 번 옵니다. 그래프가 만든 노드 run(tags 에 graph:step:N)과
+    그 안의 RunnableLambda run 인데, 둘 다 name 이 노드 이름이라 이름만 보면 시간/호출이 두 번 더해집니다.
+    여기서는 graph:step 태그가 붙은 바깥 run 만 노드 실행으로 보고, 시작 시각을 run_id 로 기록합니다.
+
+    RetryPolicy 재시도는 on_retry 콜백을 보내지 않으므로, 같은 태스크(langgraph_checkpoint_ns)의
+    노드 run 이 다시 시작되면 재시도 한 번으로 셉니다. calls 는 시도 횟수(재시도 포함)입니다.
+    """
+
+    run_inline = True                     # 비동기 실행에서도 콜백 순서를 보장
+
+    def __init__(self, metrics: GraphMetrics):
+        super().__init__()
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._node_runs = {}              # run_id → (노드, 시작 시각) : 노드 자체의 run
+        self._run_nodes = {}              # run_id → 노드 : 노드 안에서 시작된 LLM run
+        self._tasks = set()               # 시작된 노드 태스크 (langgraph_checkpoint_ns) → 다시 시작되면 재시도
+
+    @staticmethod
+    def _is_node_run(node, tags) -> bool:
+        return bool(node) and any(tag.startswith("graph:step:") for tag in tags or ())
+
+    def on_chain_start(self, serialized, inputs, *, run_id, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        if not self._is_node_run(node, tags):
+            return
+        task = metadata.get("langgraph_checkpoint_ns") or (node, metadata.get("langgraph_step"))
+        with self._lock:
+            retried = task in self._tasks
+            self._tasks.add(task)
+            self._node_runs[run_id] = (node, time.perf_counter())
+        if retried:
+            self.metrics.add(node, retries=1)
+
+    def _finish_node(self, run_id, error=False):
+        with self._lock:
+            started = self._node_runs.pop(run_id, None)
+        if started:
+            node, began = started
+            self.metrics.add(node, ms=(time.perf_counter() - began) * 1000, calls=1, errors=int(error))
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_node(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish_node(run_id, error=True)
+
+    def _remember(self, run_id, metadata):
+        node = (metadata or {}).get("langgraph_node")
+        if node:
+            with self._lock:
+                self._run_nodes[run_id] = node
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._remember(run_id, metadata)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._remember(run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            node = self._run_nodes.pop(run_id, None)
+        if node:
+            input_tokens, output_tokens = _usage(response)
+            self.metrics.add(node, llm_calls=1, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            node = self._run_nodes.pop(run_id, None)
+        if node:
+            self.metrics.add(node, llm_calls=1, errors=1)
+
+
+_HANDLER_CLASS = None
+
+
+def _handler_class():
+    """
+    GraphMetricsHandler 클래스를 처음 쓸 때 만듦
+    langchain_core 임포트가 무거워서(~0.1s 이상) views 가 이 모듈을 임포트할 때 함께 불러오지 않도록 함
+    """
+    global _HANDLER_CLASS
+    if _HANDLER_CLASS is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+        _HANDLER_CLASS = type("GraphMetricsHandler", (_NodeCallbacks, BaseCallbackHandler), {})
+    return _HANDLER_CLASS
+
+
+def _current():
+    """실행 중인 그래프 노드의 (GraphMetrics, 노드 이름). 그래프 밖이거나 계측하지 않으면 (None, None)"""
+    try:
+        from langgraph.config import get_config
+        config = get_config()
+    except Exception:                     # 그래프 실행 컨텍스트 밖
+        return None, None
+    metrics = (config.get("configurable") or {}).get("metrics")
+    node = (config.get("metadata") or {}).get("langgraph_node")
+    if not isinstance(metrics, GraphMetrics) or not node:
+        return None, None
+    return metrics, node
+
+
+def record_cache(cache: str, outcome: str, count: int = 1):
+    """캐시 사용 결과(hit/miss 등)를 현재 노드에 기록. 그래프 밖에서 호출되면 무시"""
+    if count <= 0:
+        return
+    metrics, node = _current()
+    if metrics is not None:
+        metrics.add_cache(node, cache, outcome, count)
+
+
+def percentile(values, q: float) -> float:
+    """최근접 순위 방식 백분위수 (values 는 정렬 불필요)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(-(-q * len(ordered) // 100)))      # ceil(q/100 * n)
+    return float(ordered[min(rank, len(ordered)) - 1])
@@ -0,0 +1,271 @@
+# api/services/itinerary_cache.py
+"""
+일정 생성 결과(answer, places) 캐시
+
+같은 구/테마/동행/인원/식사/여행 일수로 요청하면 그래프 전체(get_result)를 다시 돌리지 않고
+이전 결과를 돌려줍니다.
+
+- 키 정규화: 절대 날짜 대신 (여행 일수, 여행 요일 집합) 을 사용
+  예) 2025-07-05(토)~07-06(일) 과 2025-07-12(토)~07-13(일) 은 같은 항목
+  프롬프트/답변의 영업시간·휴무가 여행 요일 기준이므로(candidate_encoding) 월~수 와 화~목 은 다른 항목
+- 저장 시 answer/places 안의 여행 날짜를 {{trip_day:N}} 으로 바꿔 두고, 조회 시 요청한 날짜로 되돌림
+- 요청에 fresh=true 를 주면 캐시를 건너뛰고 새로 생성 (결과는 다시 저장)
+- 무효화(invalidate)는 세대 토큰을 바꿈. 토큰은 결과와 다른 별칭(ITINERARY_CACHE_GENERATION_ALIAS)에 둠
+- 히트/미스 카운터는 캐시 백엔드에 저장되어 워커 전체 합계를 볼 수 있음
+  (python manage.py itinerary_cache_stats)
+  파일/DB 캐시의 incr 는 원자적이지 않아 동시 요청 시 증가분이 빠질 수 있음 → stats()["approximate"] 로 표시
+"""
+import datetime
+import hashlib
+import json
+import logging
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX     = "itinerary"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+STAT_KEYS      = ("hits", "misses", "bypasses", "stores")
+MEAL_ORDER     = ("아침", "점심", "저녁")
+
+DEFAULT_TTL = 60 * 60 * 6          # 6시간
+
+
+def _cache():
+    from django.core.cache import caches
+    return caches[getattr(settings, "ITINERARY_CACHE_ALIAS", "default")]
+
+
+def _ttl() -> int:
+    return getattr(settings, "ITINERARY_CACHE_TTL", DEFAULT_TTL)
+
+
+def enabled() -> bool:
+    return getattr(settings, "ITINERARY_CACHE_ENABLED", True)
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def trip_dates(session_parameters: dict) -> list:
+    """startDate~endDate 의 날짜 목록 (날짜가 없거나 잘못되면 빈 리스트)"""
+    start = _parse_date(session_parameters.get("startDate"))
+    end = _parse_date(session_parameters.get("endDate"))
+    if not start or not end or end < start:
+        return []
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def trip_weekdays(session_parameters: dict) -> list:
+    """여행 기간의 요일(0=월 … 6=일) 정렬 목록 - 영업시간 압축과 캐시 키에 같은 값을 사용"""
+    return sorted({day.weekday() for day in trip_dates(session_parameters)})
+
+
+def normalize_parameters(session_parameters: dict) -> dict:
+    """결과에 영향을 주는 값만 남기고 표기 차이를 없앤 파라미터"""
+    meals = session_parameters.get("mealSchedule") or []
+    dates = trip_dates(session_parameters)
+    group_size = session_parameters.get("groupSize")
+    try:
+        group_size = int(group_size)
+    except (TypeError, ValueError):
+        pass
+    return {
+        "city":         (session_parameters.get("city") or "").strip(),
+        "district":     (session_parameters.get("district") or "").strip(),
+        "theme":        (session_parameters.get("theme") or "").strip(),
+        "companions":   (session_parameters.get("companions") or "").strip(),
+        "group_size":   group_size,
+        "meals":        [m for m in MEAL_ORDER if m in meals],
+        "trip_days":    len(dates),
+        # 여행 요일 (예: 금~일 → [4, 5, 6]). 후보의 영업시간/휴무를 이 요일만 남겨 프롬프트에 넣음
+        "weekdays":     trip_weekdays(session_parameters),
+    }
+
+
+def _generation_cache():
+    """
+    세대 토큰을 두는 캐시. 결과 캐시(FileBasedCache, MAX_ENTRIES)는 가득 차면 무작위로 항목을 지우므로
+    세대 키는 항목이 몇 개 없는 별도 별칭(ITINERARY_CACHE_GENERATION_ALIAS, 기본 "catalog")에 둠
+    """
+    from django.core.cache import caches
+    return caches[getattr(settings, "ITINERARY_CACHE_GENERATION_ALIAS", None)
+                  or getattr(settings, "ITINERARY_CACHE_ALIAS", "default")]
+
+
+def new_generation() -> str:
+    # 번호 대신 무작위 토큰 - 세대 키가 지워져 다시 만들어져도 이전 세대의 키와 겹치지 않음
+    return uuid.uuid4().hex[:12]
+
+
+def _generation() -> str:
+    cache = _generation_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, new_generation(), timeout=None)   # 동시에 만들면 먼저 저장한 값 사용
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def make_key(session_parameters: dict) -> str:
+    normalized = json.dumps(normalize_parameters(session_parameters), ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{_generation()}:{digest}"
+
+
+def _placeholder(index: int) -> str:
+    return "{{trip_day:%d}}" % index
+
+
+def _replace_dates(value, pairs):
+    """answer 문자열/places 구조 안의 날짜 문자열을 pairs(원래값→바꿀값) 순서대로 치환"""
+    text = json.dumps(value, ensure_ascii=False)
+    for old, new in pairs:
+        text = text.replace(old, new)
+    return json.loads(text)
+
+
+def _to_template(answer, places, dates):
+    pairs = [(d.isoformat(), _placeholder(i)) for i, d in enumerate(dates)]
+    return _replace_dates(answer, pairs), _replace_dates(places, pairs)
+
+
+def _from_template(answer, places, dates):
+    pairs = [(_placeholder(i), d.isoformat()) for i, d in enumerate(dates)]
+    return _replace_dates(answer, pairs), _replace_dates(places, pairs)
+
+
+def _atomic_counters(cache) -> bool:
+    """incr 가 원자적인 백엔드인지 (파일/DB 캐시는 읽고-더하고-쓰기라 동시 증가분이 빠짐)"""
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.cache.backends.filebased import FileBasedCache
+    return not isinstance(cache, (FileBasedCache, DatabaseCache))
+
+
+def _count(cache, name: str):
+    key = f"{KEY_PREFIX}:stats:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:                     # 카운터 키가 아직 없음
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def lookup(session_parameters: dict):
+    """캐시된 (answer, places) 를 요청 날짜 기준으로 돌려줍니다. 없으면 None"""
+    cache = _cache()
+    entry = cache.get(make_key(session_parameters))
+    if entry is None:
+        _count(cache, "misses")
+        return None
+    _count(cache, "hits")
+    return _from_template(entry["answer"], entry["places"], trip_dates(session_parameters))
+
+
+def contains(session_parameters: dict) -> bool:
+    """히트/미스 카운터를 건드리지 않고 항목이 있는지만 확인 (pregenerate_itineraries)"""
+    cache = _cache()
+    return cache.get(make_key(session_parameters)) is not None
+
+
+def store(session_parameters: dict, answer: str, places: list, timeout=None):
+    """timeout 을 주지 않으면 ITINERARY_CACHE_TTL"""
+    cache = _cache()
+    template_answer, template_places = _to_template(answer, places, trip_dates(session_parameters))
+    cache.set(make_key(session_parameters),
+              {"answer": template_answer, "places": template_places},
+              timeout=timeout if timeout is not None else _ttl())
+    _count(cache, "stores")
+
+
+def record_bypass():
+    _count(_cache(), "bypasses")
+
+
+def mark_outcome(metrics, outcome: str):
+    """턴 계측(GraphMetrics)에 캐시 결과 기록: hit / miss / bypass / disabled (metrics 가 None 이면 무시)"""
+    if metrics is not None:
+        metrics.extra["itinerary_cache"] = outcome
+
+
+def get_or_generate(session_parameters: dict, generate, fresh: bool = False, metrics=None):
+    """lookup → (없거나 fresh) generate() → store. 캐시 오류는 생성 경로를 막지 않음"""
+    if not enabled():
+        mark_outcome(metrics, "disabled")
+        return generate()
+    if fresh:
+        mark_outcome(metrics, "bypass")
+        record_bypass()
+    else:
+        cached = safe_lookup(session_parameters)
+        mark_outcome(metrics, "hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+    answer, places = generate()
+    safe_store(session_parameters, answer, places)
+    return answer, places
+
+
+async def aget_or_generate(session_parameters: dict, agenerate, fresh: bool = False, metrics=None):
+    """get_or_generate 의 비동기 버전 (agenerate 는 코루틴 함수)"""
+    from asgiref.sync import sync_to_async
+
+    if not enabled():
+        mark_outcome(metrics, "disabled")
+        return await agenerate()
+    if fresh:
+        mark_outcome(metrics, "bypass")
+        await sync_to_async(record_bypass)()
+    else:
+        cached = await sync_to_async(safe_lookup)(session_parameters)
+        mark_outcome(metrics, "hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+    answer, places = await agenerate()
+    await sync_to_async(safe_store)(session_parameters, answer, places)
+    return answer, places
+
+
+def _safe(func, *args):
+    try:
+        return func(*args)
+    except Exception:
+        logger.exception("itinerary cache %s failed", func.__name__)
+        return None
+
+
+def safe_lookup(session_parameters: dict):
+    """lookup 과 같지만 캐시 백엔드 오류 시 None (미스로 취급)"""
+    return _safe(lookup, session_parameters)
+
+
+def safe_store(session_parameters: dict, answer: str, places: list):
+    """store 와 같지만 캐시 백엔드 오류는 로그만 남김"""
+    _safe(store, session_parameters, answer, places)
+
+
+def invalidate():
+    """카탈로그/프롬프트가 바뀌었을 때 모든 일정 캐시를 무효화 (새 세대 토큰)"""
+    _generation_cache().set(GENERATION_KEY, new_generation(), timeout=None)
+
+
+def stats() -> dict:
+    cache = _cache()
+    values = cache.get_many([f"{KEY_PREFIX}:stats:{name}" for name in STAT_KEYS])
+    result = {name: values.get(f"{KEY_PREFIX}:stats:{name}", 0) for name in STAT_KEYS}
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = round(result["hits"] / lookups, 4) if lookups else 0.0
+    result["approximate"] = not _atomic_counters(cache)
+    return result
+
+
+def reset_stats():
+    _cache().delete_many([f"{KEY_PREFIX}:stats:{name}" for name in STAT_KEYS])
@@ -0,0 +1,292 @@
+# api/services/itinerary_jobs.py
+"""
+일정 생성 작업 큐 (DB 백엔드 - 브로커 없이 서버 한 대에서 동작)
+
+start2 는 HTTP 요청 하나가 LLM 파이프라인 전체(수십 초)를 붙잡고 있어서 프록시 타임아웃이 나고,
+사용자가 새로고침하면 같은 일정을 다시 생성했습니다. 작업 큐에서는
+
+- POST .../start2/<session>/jobs/ → enqueue(): ItineraryJob 을 넣고 202 + job_id 로 바로 응답
+  같은 세션에 같은 조건으로 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 돌려줌 (중복 생성 방지)
+- 워커(manage.py run_itinerary_worker)가 claim() 으로 꺼내 execute() 로 실행
+  → views.get_result(일정 결과 캐시 + ItineraryRunner) → 봇 턴 저장 → 결과(start2 응답 본문)를 작업에 기록
+- 클라이언트는 GET .../itinerary-jobs/<job_id>/ 로 조회하거나 .../events/ (SSE) 로 상태 변화를 받음
+
+동시 실행 제한: 워커마다 --concurrency 스레드, 전체는 ITINERARY_JOB_MAX_RUNNING (0 이면 제한 없음)
+              상한이 있으면 claim() 은 대기열 앞 행을 SKIP LOCKED 없이 잠가 워커끼리 차례로 꺼내고,
+              잠금을 얻은 뒤 running 수를 세므로 두 워커가 동시에 상한을 넘겨 꺼내지 않음
+재시도: 실패하면 ITINERARY_JOB_BACKOFF_SECONDS * 2^(시도-1) (최대 ITINERARY_JOB_BACKOFF_MAX_SECONDS, ±20%) 뒤에
+        다시 꺼냄. 실패한 ItineraryRun 의 run_id 를 넘겨 체크포인트에서 이어서 실행. max_attempts 번 실패하면 failed
+임대: 실행하는 동안 워커가 임대 시간의 1/3 마다 locked_at 을 갱신(renew_lease)하고, 갱신이 끊긴 채
+      ITINERARY_JOB_LEASE_SECONDS 가 지나면 워커가 죽은 것으로 보고 requeue_stale() 이 다시 큐에 넣음
+      (그래프가 임대 시간보다 오래 걸려도 살아 있는 작업을 다시 실행하지 않음)
+관측: stats() - 대기열 길이, 가장 오래 기다린 작업, 최근 작업의 대기/실행/전체 시간 p50·p95 (GET itinerary-jobs/stats/)
+"""
+import logging
+import random
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .graph_metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 5
+DEFAULT_BACKOFF_MAX_SECONDS = 300
+DEFAULT_LEASE_SECONDS = 600
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _models():
+    from api.models import ChatSession, ItineraryJob
+    return ChatSession, ItineraryJob
+
+
+# ── 넣기 ────────────────────────────────────────────────────
+def enqueue(session, parameters, fresh=False) -> tuple:
+    """
+    Returns: (job, created)
+    파라미터 오류(district 누락, 알 수 없는 theme)는 큐에 넣기 전에 ValueError
+    """
+    from . import teamdb_langgraph_v5
+    try:
+        teamdb_langgraph_v5.build_initial_state(parameters or {})
+    except KeyError as exc:
+        raise ValueError(f"알 수 없는 파라미터 값: {exc}") from exc
+
+    ChatSession, ItineraryJob = _models()
+    with transaction.atomic():
+        # 같은 세션의 동시 POST 를 직렬화해 중복 작업을 만들지 않음
+        ChatSession.objects.select_for_update().filter(pk=session.pk).values_list('pk', flat=True).first()
+        for job in ItineraryJob.objects.filter(chatsession=session, status__in=ACTIVE_STATUSES).order_by('created_at'):
+            if job.parameters == (parameters or {}) and job.fresh == fresh:
+                return job, False
+        job = ItineraryJob.objects.create(
+            chatsession=session,
+            parameters=parameters or {},
+            fresh=fresh,
+            max_attempts=_setting("ITINERARY_JOB_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+            available_at=timezone.now(),
+        )
+    return job, True
+
+
+# ── 꺼내기 / 실행 ───────────────────────────────────────────
+def claim(worker_id: str, limit: int = 1) -> list:
+    """실행할 시각이 된 대기 작업을 최대 limit 개 running 으로 바꿔 돌려줌"""
+    _, ItineraryJob = _models()
+    if limit <= 0:
+        return []
+    max_running = _setting("ITINERARY_JOB_MAX_RUNNING", 0)
+    # 상한이 있으면 다른 워커가 잠근 행을 건너뛰지 않고 기다림 → claim 이 차례로 실행되어 아래 count 가 정확함
+    skip_locked = connection.features.has_select_for_update_skip_locked and not max_running
+
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        candidates = list(
+            ItineraryJob.objects
+            .select_for_update(skip_locked=skip_locked)
+            .filter(status='queued', available_at__lte=now)
+            .order_by('available_at', 'id')[:limit]
+        )
+        if max_running and candidates:
+            # 잠금을 얻은 뒤에 셈 (앞서 꺼낸 워커의 커밋이 보임)
+            free = max_running - ItineraryJob.objects.filter(status='running').count()
+            candidates = candidates[:max(0, free)]
+        for job in candidates:
+            # 조건부 UPDATE: SKIP LOCKED 가 없는 DB(SQLite)에서도 두 워커가 같은 작업을 꺼내지 않음
+            updated = ItineraryJob.objects.filter(pk=job.pk, status='queued').update(
+                status='running', locked_by=worker_id, locked_at=now, started_at=now, attempts=F('attempts') + 1)
+            if updated:
+                job.status, job.locked_by, job.locked_at, job.started_at = 'running', worker_id, now, now
+                job.attempts += 1
+                claimed.append(job)
+    return claimed
+
+
+def renew_lease(job_pk, worker_id: str) -> bool:
+    """실행 중인 작업의 locked_at 을 지금으로 갱신. 임대를 잃었으면(다른 워커가 가져감) False"""
+    _, ItineraryJob = _models()
+    return bool(ItineraryJob.objects.filter(pk=job_pk, status='running', locked_by=worker_id)
+                .update(locked_at=timezone.now()))
+
+
+@contextmanager
+def _lease_heartbeat(job, worker_id: str):
+    """with 블록(그래프 실행) 동안 임대 시간의 1/3 마다 renew_lease"""
+    from django.db import connection as thread_connection
+    interval = _setting("ITINERARY_JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS) / 3
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    if not renew_lease(job.pk, worker_id):
+                        logger.warning("itinerary job %s lease lost while running", job.job_id)
+                        return
+                except Exception:
+                    logger.exception("itinerary job %s lease renewal failed", job.job_id)
+        finally:
+            thread_connection.close()                       # 이 스레드의 DB 연결 정리
+
+    thread = threading.Thread(target=beat, name=f"lease-{job.job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def retry_delay(attempts: int) -> float:
+    """attempts 번째 실패 뒤 다시 꺼낼 때까지 기다릴 시간(초). 지수 백오프 ±20%"""
+    base = _setting("ITINERARY_JOB_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)
+    cap = _setting("ITINERARY_JOB_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS)
+    return min(cap, base * 2 ** max(0, attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+class LeaseLost(Exception):
+    """실행하는 동안 임대가 만료되어 다른 워커가 작업을 가져감 → 저장한 턴을 되돌림"""
+
+
+def execute(job, worker_id: str) -> str:
+    """claim() 한 작업 하나를 실행하고 최종 상태(succeeded / queued / failed)를 돌려줌"""
+    from api import views
+    from .graph_metrics import GraphMetrics
+    from .itinerary_runs import ItineraryRunner
+    _, ItineraryJob = _models()
+
+    session = job.chatsession
+    metrics = GraphMetrics(endpoint='start2-job')
+    runner = ItineraryRunner(session.id, job.parameters, run_id=job.run_id or None)
+    try:
+        with _lease_heartbeat(job, worker_id):
+            answer, places = views.get_result(job.parameters, fresh=job.fresh, session_id=session.id,
+                                              metrics=metrics, runner=runner)
+        with transaction.atomic():
+            data = views._save_itinerary_turn(
+                session, answer, places,
+                interaction=views._interaction_payload(job.parameters, metrics, fresh=job.fresh,
+                                                       run_id=runner.run_id, job_id=str(job.job_id)))
+            data["run_id"] = runner.run_id
+            finished = ItineraryJob.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+                status='succeeded', result=data, error='', finished_at=timezone.now(), locked_at=None)
+            if not finished:
+                raise LeaseLost(f"job {job.job_id} is no longer leased by {worker_id}")
+    except LeaseLost:
+        logger.warning("itinerary job %s lease lost, result discarded", job.job_id)
+        return 'lost'
+    except Exception as exc:
+        return _fail(job, worker_id, exc, run_id=getattr(exc, 'run_id', None) or runner.run_id)
+    return 'succeeded'
+
+
+def _fail(job, worker_id, exc, run_id=None) -> str:
+    _, ItineraryJob = _models()
+    now = timezone.now()
+    error = f"{type(exc).__name__}: {exc}"[:2000]
+    fields = {'error': error, 'run_id': run_id or '', 'locked_at': None}
+    if job.attempts < job.max_attempts:
+        delay = retry_delay(job.attempts)
+        fields.update(status='queued', available_at=now + timedelta(seconds=delay), locked_by='')
+        logger.warning("itinerary job %s failed (attempt %s/%s), retry in %.0fs: %s",
+                       job.job_id, job.attempts, job.max_attempts, delay, error)
+    else:
+        fields.update(status='failed', finished_at=now)
+        logger.error("itinerary job %s failed permanently after %s attempts: %s", job.job_id, job.attempts, error)
+    ItineraryJob.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(**fields)
+    return fields['status']
+
+
+def requeue_stale(lease_seconds=None) -> int:
+    """
+    임대가 만료된(locked_at 갱신이 끊긴) running 작업을 다시 큐에 넣음 (시도 횟수가 남지 않았으면 failed)
+    Returns: 처리한 작업 수
+    """
+    _, ItineraryJob = _models()
+    lease = lease_seconds or _setting("ITINERARY_JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+    now = timezone.now()
+    stale = ItineraryJob.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=lease))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', error='lease expired (worker stopped?)', finished_at=now, locked_at=None)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued', available_at=now, locked_by='', locked_at=None)
+    if failed or requeued:
+        logger.warning("itinerary jobs with expired lease: %s requeued, %s failed", requeued, failed)
+    return failed + requeued
+
+
+# ── 조회 ────────────────────────────────────────────────────
+def status_payload(job) -> dict:
+    """상태 조회/SSE 응답 본문"""
+    _, ItineraryJob = _models()
+
+    def iso(value):
+        return value.isoformat() if value else None
+
+    payload = {
+        "job_id": str(job.job_id),
+        "session_id": job.chatsession_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": iso(job.created_at),
+        "started_at": iso(job.started_at),
+        "finished_at": iso(job.finished_at),
+        "error": job.error or None,
+        "run_id": job.run_id or None,
+    }
+    if job.status == 'queued':
+        payload["available_at"] = iso(job.available_at)
+        payload["queue_position"] = ItineraryJob.objects.filter(
+            status='queued', available_at__lt=job.available_at).count()  # 앞에 기다리는 작업 수
+    if job.status == 'succeeded':
+        payload["result"] = job.result
+    return payload
+
+
+def stats(window_minutes: int = 60, sample: int = 1000) -> dict:
+    """대기열 상태와 최근 window_minutes 동안 끝난 작업(최대 sample 개)의 지연 시간(초)"""
+    _, ItineraryJob = _models()
+    now = timezone.now()
+    counts = dict(ItineraryJob.objects.filter(status__in=ACTIVE_STATUSES)
+                  .values_list('status').annotate(n=Count('id')).order_by())
+    queued = ItineraryJob.objects.filter(status='queued')
+    oldest = queued.aggregate(oldest=Min('created_at'))['oldest']
+    recent = list(
+        ItineraryJob.objects
+        .filter(status__in=('succeeded', 'failed'), finished_at__gte=now - timedelta(minutes=window_minutes))
+        .order_by('-finished_at')
+        .values_list('status', 'created_at', 'started_at', 'finished_at')[:sample]
+    )
+
+    def summary(values):
+        return {"p50": round(percentile(values, 50), 2), "p95": round(percentile(values, 95), 2),
+                "max": round(max(values), 2) if values else 0.0}
+
+    # wait 는 마지막 실행이 시작되기까지(재시도 대기 포함), run 은 마지막 실행 시간
+    wait = [(started - created).total_seconds() for _, created, started, _ in recent if started]
+    run = [(finished - started).total_seconds() for _, _, started, finished in recent if started]
+    total = [(finished - created).total_seconds() for _, created, _, finished in recent]
+    return {
+        "queued": counts.get('queued', 0),
+        "due": queued.filter(available_at__lte=now).count(),
+        "running": counts.get('running', 0),
+        "oldest_queued_s": round((now - oldest).total_seconds(), 1) if oldest else None,
+        "window_minutes": window_minutes,
+        "succeeded": sum(1 for status, *_ in recent if status == 'succeeded'),
+        "failed": sum(1 for status, *_ in recent if status == 'failed'),
+        "latency_s": {"wait": summary(wait), "run": summary(run), "total": summary(total)},
+    }
@@ -0,0 +1,189 @@
+# api/services/itinerary_planner.py
+"""
+후보 행으로 Day 1..N 일정을 결정적으로 배치하는 planner
+
+select_place_prompt 가 LLM 에게 맡기던 규칙을 코드로 옮겼습니다.
+- 식사 조건: breakfast/lunch/dinner 가 'True' 인 식사 칸만 채움
+- 고유성: 식당/관광지는 여행 전체에서 한 번만 사용 (숙소는 한 곳에 묵는 것으로 보고 매일 같은 곳)
+- 순위: 식당/숙소는 restaurant_query_prompt 의 랭킹 공식(ranking_score), 관광지는 DB 조회 순서
+- 동선: 칸마다 순위 상위 RANK_WINDOW 개 후보 중 직전 장소와 가장 가까운 곳을 고름
+  (첫 칸은 숙소 기준). 거리는 travel_matrix 의 행렬 값, 좌표가 없는 후보는 순위만으로 고름
+- 이동: 각 칸에 직전 장소에서의 거리/예상 이동 시간(travel_matrix)을 붙여 프롬프트에 숫자로 넣음
+
+칸 순서는 answer_prompt 의 일정 틀과 같습니다.
+    아침식사 → 관광지 1 → 점심식사 → 관광지 2 → 저녁식사 → 숙소
+후보가 모자라면 그 칸은 비우지 않고 생략합니다. (빈 자리를 남기지 말라는 프롬프트 규칙과 동일)
+
+LLM 은 plan_to_markdown() 으로 만든 고정 일정에 설명 문장만 덧붙입니다.
+"""
+from .teamdb_query_builder import RANKING_WEIGHTS, VISITOR_REVIEW_CAP, BLOG_REVIEW_CAP
+
+RANK_WINDOW = 3                    # 동선을 위해 순위를 양보할 수 있는 범위 (상위 몇 개 중에서 고를지)
+
+# (칸 이름, 후보 종류, 제목, 식사 조건 키)
+SLOTS = (
+    ("breakfast",    "restaurant",    "🍽️ 아침식사", "breakfast"),
+    ("attraction_1", "tourinfo",      "🏛️ 관광지 1", None),
+    ("lunch",        "restaurant",    "🍽️ 점심식사", "lunch"),
+    ("attraction_2", "tourinfo",      "🏛️ 관광지 2", None),
+    ("dinner",       "restaurant",    "🍽️ 저녁식사", "dinner"),
+    ("lodging",      "accommodation", "🏨 숙소",       None),
+)
+
+NAME_COLUMNS = {"restaurant": "store_name", "tourinfo": "title", "accommodation": "store_name"}
+
+
+def _number(value, default=0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def ranking_score(row: dict) -> float:
+    """teamdb_query_builder.ranking_expression 과 같은 점수 (SQL 밖에서 다시 정렬할 때 사용)"""
+    return (
+        _number(row.get("rating")) * RANKING_WEIGHTS["rating"]
+        + min(_number(row.get("visitor_review_count")) / VISITOR_REVIEW_CAP, 1) * RANKING_WEIGHTS["visitor_review_count"]
+        + min(_number(row.get("blog_review_count")) / BLOG_REVIEW_CAP, 1) * RANKING_WEIGHTS["blog_review_count"]
+    )
+
+
+def place_name(kind: str, row: dict) -> str:
+    return str(row.get(NAME_COLUMNS[kind]) or row.get("title") or row.get("store_name") or "")
+
+
+def coordinates(row: dict):
+    """(map_x=경도, map_y=위도) 또는 None"""
+    x, y = _number(row.get("map_x"), None), _number(row.get("map_y"), None)
+    if x is None or y is None or (x == 0 and y == 0):
+        return None
+    return x, y
+
+
+def _ranked(kind: str, rows) -> list:
+    rows = [row for row in rows or [] if place_name(kind, row)]
+    if kind == "tourinfo":
+        return rows                                   # 관광지는 조회 순서가 곧 추천 순서
+    return sorted(rows, key=ranking_score, reverse=True)   # sorted 는 안정 정렬 → 동점이면 조회 순서
+
+
+def _meal_enabled(meal_schedule: dict, key) -> bool:
+    return key is None or str((meal_schedule or {}).get(key)) == "True"
+
+
+def _pick(kind: str, pool: list, used: set, previous, distance, window: int):
+    """순위 상위 window 개 중 previous 와 가장 가까운 후보 (거리를 모르면 최상위)
+
+    used 는 이미 배치한 (kind, 장소 이름) - 같은 장소가 여러 행으로 조회돼도(조인/중복 적재) 한 번만 배치
+    """
+    choices, seen = [], set()
+    for row in pool:
+        key = (kind, place_name(kind, row))
+        if key not in used and key not in seen:      # 같은 이름의 중복 행이 window 칸을 차지하지 않도록
+            seen.add(key)
+            choices.append(row)
+            if len(choices) == window:
+                break
+    if not choices:
+        return None
+    if previous is None:
+        return choices[0]
+    best, best_distance = choices[0], None
+    for row in choices:
+        d = distance(previous, row)
+        if d is not None and (best_distance is None or d < best_distance):
+            best, best_distance = row, d
+    return best
+
+
+def plan_days(candidates: dict, meal_schedule: dict, dates, matrix=None, window: int = RANK_WINDOW) -> list:
+    """
+    candidates: {"restaurant": [행...], "tourinfo": [...], "accommodation": [...]}
+    meal_schedule: {"breakfast": 'True'/'False', "lunch": ..., "dinner": ...}
+    dates: 여행 날짜 목록 (datetime.date) - 길이가 곧 일수
+    matrix: travel_matrix.TravelMatrix. 없으면 candidates 로 새로 계산
+
+    Returns: [{"day": 1, "date": "YYYY-MM-DD",
+               "stops": [{"slot", "kind", "title", "name", "row", "travel"}, ...]}, ...]
+             travel: 직전 장소에서의 {"from", "km", "mode", "label", "minutes"} 또는 None
+    """
+    if matrix is None:
+        from .travel_matrix import TravelMatrix
+        matrix = TravelMatrix(row for kind in sorted(candidates) for row in candidates[kind] or [])
+    distance = matrix.distance
+    pools = {kind: _ranked(kind, candidates.get(kind)) for kind in NAME_COLUMNS}
+    lodging = pools["accommodation"][0] if pools["accommodation"] else None
+    used = set()
+    plan = []
+    for number, date in enumerate(dates, start=1):
+        stops = []
+        previous = lodging                            # 하루의 시작은 숙소 근처에서
+        for slot, kind, title, meal_key in SLOTS:
+            if not _meal_enabled(meal_schedule, meal_key):
+                continue
+            if kind == "accommodation":
+                row = lodging
+            else:
+                row = _pick(kind, pools[kind], used, previous, distance, window)
+                if row is not None:
+                    used.add((kind, place_name(kind, row)))
+            if row is None:
+                continue
+            # 첫날 첫 일정은 출발지를 모르므로 이동 정보 없음
+            origin = previous if (stops or number > 1) else None
+            leg = matrix.leg(origin, row) if origin is not None and origin is not row else None
+            if leg is not None:
+                leg["from"] = "숙소" if origin is lodging else place_name(stops[-1]["kind"], origin)
+            stops.append({"slot": slot, "kind": kind, "title": title,
+                          "name": place_name(kind, row), "row": row, "travel": leg})
+            previous = row
+        plan.append({"day": number, "date": date.isoformat(), "stops": stops})
+    return plan
+
+
+def plan_places(plan: list) -> list:
+    """프론트 지도 표시용 places (answer_prompt 의 places 와 같은 형식, 방문 순서대로)"""
+    places = []
+    for day in plan:
+        for stop in day["stops"]:
+            point = coordinates(stop["row"])
+            places.append({"name": stop["name"],
+                           "map_x": point[0] if point else None,
+                           "map_y": point[1] if point else None})
+    return places
+
+
+def _facts(stop: dict) -> list:
+    row, kind = stop["row"], stop["kind"]
+    lines = []
+    if kind == "restaurant":
+        lines.append(f"- **종류**: {row.get('category') or '정보없음'}")
+        lines.append(f"- **평점/리뷰**: 평점 {row.get('rating')}점, 방문자 리뷰 {row.get('visitor_review_count')}개, "
+                     f"블로그 리뷰 {row.get('blog_review_count')}개")
+    elif kind == "tourinfo":
+        category = " > ".join(str(row[c]) for c in ("category_one", "category_two", "category_three") if row.get(c))
+        lines.append(f"- **종류**: {category or '정보없음'}")
+    else:
+        lines.append(f"- **등급**: {row.get('grade') or '정보없음'}")
+        lines.append(f"- **평점/리뷰**: 평점 {row.get('rating')}점, 리뷰 {row.get('visitor_review_count')}개")
+    lines.append(f"- **주소**: {row.get('address') or '정보없음'}")
+    if stop.get("travel"):
+        from .travel_matrix import describe_leg
+        lines.append(f"- **이동**: {stop['travel']['from']}에서 {describe_leg(stop['travel'])}")
+    if kind == "accommodation" and row.get("reservation_site"):
+        lines.append(f"- **예약사이트**: {row['reservation_site']}")
+    return lines
+
+
+def plan_to_markdown(plan: list) -> str:
+    """고정 일정 → LLM 에 넘길 마크다운 틀 (각 장소의 '추천 이유' 만 LLM 이 채움)"""
+    lines = []
+    for day in plan:
+        lines.append(f"### Day {day['day']} ({day['date']})")
+        for stop in day["stops"]:
+            lines.append(f"#### {stop['title']}: {stop['name']}")
+            lines.extend(_facts(stop))
+            lines.append("- **추천 이유**: ")
+            lines.append("")
+    return "\n".join(lines).rstrip()
@@ -0,0 +1,173 @@
+# api/services/itinerary_runs.py
+"""
+실패한 일정 생성 run 을 체크포인트에서 이어서 실행
+
+그래프의 LLM 노드는 노드 단위로 재시도(teamdb_langgraph_v5.NODE_RETRY)하지만, 그래도 실패하면
+예외가 요청 밖으로 나가고 클라이언트는 다시 요청해야 합니다. 예전에는 이때 후보 조회/장소 선택까지
+처음부터 다시 실행했습니다.
+
+여기서는 start2 요청 한 번을 ItineraryRun 으로 기록합니다.
+- 실패: 세션 thread 의 마지막 체크포인트(checkpoint_id)와 남은 노드(failed_node)를 저장하고
+  ItineraryRunFailed(run_id 포함)를 올림 → 뷰는 503 + run_id 로 응답
+- 같은 run_id 로 다시 요청: 그 체크포인트에서 입력 없이 실행 → 이미 끝난 노드는 다시 돌지 않고
+  실패한 노드부터 진행. 재개는 ITINERARY_RUN_MAX_RESUMES 번까지
+- 체크포인트가 이미 정리됐거나(BoundedMemorySaver 의 LRU/TTL) 재개 횟수를 넘기면 처음부터 실행
+
+다른 워커/재시작 후에도 재개하려면 GRAPH_CHECKPOINT_DB_STORE=True 가 필요합니다.
+(DB 에는 세션별 마지막 체크포인트만 남으므로 같은 세션의 다음 턴이 시작되면 재개 지점은 사라짐)
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESUMES = 3
+
+
+class ItineraryRunFailed(Exception):
+    """그래프 실행 실패. run_id 로 다시 요청하면 failed_node 부터 재개"""
+
+    def __init__(self, run_id, failed_node, error):
+        super().__init__(f"itinerary run {run_id} failed at {failed_node or '?'}: {error}")
+        self.run_id = run_id
+        self.failed_node = failed_node
+        self.error = error
+
+
+def _graph():
+    from . import teamdb_langgraph_v5
+    return teamdb_langgraph_v5
+
+
+def _max_resumes() -> int:
+    return getattr(settings, "ITINERARY_RUN_MAX_RESUMES", DEFAULT_MAX_RESUMES)
+
+
+def _same_request(stored, requested) -> bool:
+    """
+    저장된 run 의 파라미터로 이번 요청을 이어서 실행해도 되는지
+    결과 캐시와 같은 기준(itinerary_cache.normalize_parameters)에 실제 여행 날짜까지 같아야 함
+    (체크포인트 state 에 날짜가 들어 있으므로 요일만 같은 다른 주는 재개하지 않음)
+    """
+    from .itinerary_cache import normalize_parameters, trip_dates
+    stored, requested = stored or {}, requested or {}
+    return (normalize_parameters(stored) == normalize_parameters(requested)
+            and trip_dates(stored) == trip_dates(requested))
+
+
+class ItineraryRunner:
+    """
+    한 세션의 start2 요청 하나. 뷰의 get_result/aget_result/astream_result 에 넘기면
+    캐시 미스일 때만 run 을 만들고(run_id 는 캐시 히트면 None) 그래프를 실행합니다.
+
+        runner = ItineraryRunner(session.id, session_params, run_id=body.get("run_id"))
+    """
+
+    def __init__(self, session_id, session_parameters, run_id=None):
+        self.session_id = session_id
+        self.session_parameters = session_parameters
+        self.requested_run_id = run_id
+        self.run = None
+
+    @property
+    def run_id(self):
+        return str(self.run.run_id) if self.run is not None else None
+
+    # ── run 시작/종료 기록 (ORM, 동기) ──────────────────────
+    def _previous(self):
+        from django.core.exceptions import ValidationError
+        from api.models import ItineraryRun
+        if not self.requested_run_id:
+            return None
+        try:
+            previous = ItineraryRun.objects.filter(
+                run_id=self.requested_run_id, chatsession_id=self.session_id, status='failed').first()
+        except ValidationError:                                  # UUID 형식이 아님
+            return None
+        if previous is not None and not _same_request(previous.parameters, self.session_parameters):
+            # 다른 조건의 체크포인트에서 재개하면 이전 일정이 새 조건의 결과(캐시 키)로 저장됨 → 새 run 으로 처음부터
+            logger.info("run %s was started with different parameters, not resuming", self.requested_run_id)
+            return None
+        return previous
+
+    def begin(self):
+        """재개할 run 이면 checkpoint_id, 새로 실행하면 None"""
+        from api.models import ItineraryRun
+        from .checkpointing import session_thread_id
+
+        # 파라미터 오류(district 누락 등)는 재시도해도 같으므로 run 을 만들기 전에 그대로 올림
+        _graph().build_initial_state(self.session_parameters or {})
+        previous = self._previous()
+        if previous is not None and previous.attempts <= _max_resumes():
+            self.run = previous
+            self.run.attempts += 1
+            self.run.status = 'running'
+            resume_from = previous.checkpoint_id or None
+            if resume_from and not _graph().has_checkpoint(self.session_id, resume_from):
+                logger.info("checkpoint of run %s is gone, restarting", self.run_id)
+                resume_from = None
+            self.run.save(update_fields=['attempts', 'status', 'updated_at'])
+            return resume_from
+
+        if previous is not None:                                 # 재개 횟수 초과 → 새 run 으로 처음부터
+            previous.status = 'abandoned'
+            previous.save(update_fields=['status', 'updated_at'])
+        self.run = ItineraryRun.objects.create(
+            chatsession_id=self.session_id,
+            parameters=self.session_parameters or {},
+            thread_id=session_thread_id(self.session_id),
+        )
+        return None
+
+    def succeed(self):
+        self.run.status = 'succeeded'
+        self.run.checkpoint_id = ''
+        self.run.failed_node = ''
+        self.run.error = ''
+        self.run.save(update_fields=['status', 'checkpoint_id', 'failed_node', 'error', 'updated_at'])
+
+    def fail(self, exc) -> ItineraryRunFailed:
+        checkpoint_id, next_nodes = _graph().failed_checkpoint(self.session_id)
+        self.run.status = 'failed'
+        self.run.checkpoint_id = checkpoint_id or ''
+        self.run.failed_node = ",".join(next_nodes)
+        self.run.error = f"{type(exc).__name__}: {exc}"[:2000]
+        self.run.save(update_fields=['status', 'checkpoint_id', 'failed_node', 'error', 'updated_at'])
+        logger.warning("itinerary run %s failed at %s (attempt %s): %s",
+                       self.run_id, self.run.failed_node, self.run.attempts, self.run.error)
+        return ItineraryRunFailed(self.run_id, self.run.failed_node, self.run.error)
+
+    # ── 실행 ────────────────────────────────────────────────
+    def generate(self, metrics=None) -> tuple:
+        resume_from = self.begin()
+        try:
+            result = _graph().get_result(self.session_parameters, session_id=self.session_id,
+                                         metrics=metrics, resume_from=resume_from)
+        except Exception as exc:
+            raise self.fail(exc) from exc
+        self.succeed()
+        return result
+
+    async def agenerate(self, metrics=None) -> tuple:
+        resume_from = await sync_to_async(self.begin)()
+        try:
+            result = await _graph().aget_result(self.session_parameters, session_id=self.session_id,
+                                                metrics=metrics, resume_from=resume_from)
+        except Exception as exc:
+            raise await sync_to_async(self.fail)(exc) from exc
+        await sync_to_async(self.succeed)()
+        return result
+
+    async def astream(self, metrics=None):
+        """teamdb_langgraph_v5.astream_result 와 같은 (event, data) 를 내보냄"""
+        resume_from = await sync_to_async(self.begin)()
+        try:
+            async for event, data in _graph().astream_result(self.session_parameters, session_id=self.session_id,
+                                                             metrics=metrics, resume_from=resume_from):
+                if event == "result":
+                    await sync_to_async(self.succeed)()
+                yield event, data
+        except Exception as exc:
+            raise await sync_to_async(self.fail)(exc) from exc
@@ -0,0 +1,35 @@
+# api/services/itinerary_schema.py
+"""
+일정 생성 결과 스키마
+
+generate_message / plan_itinerary 가 돌려주는 JSON
+    {"answer": "<마크다운 일정>", "places": [{"name": ..., "map_x": ..., "map_y": ...}, ...]}
+을 검증합니다. places 항목에는 모델이 추가한 필드(주소, 날짜 등)나
+웹 검색 보강 결과(web_results)가 더 들어올 수 있으므로 그대로 보존합니다.
+"""
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ItineraryPlace(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name:  str
+    map_x: Optional[float] = None      # 경도 (DB 의 map_x)
+    map_y: Optional[float] = None      # 위도 (DB 의 map_y)
+
+
+class ItineraryPlan(BaseModel):
+    answer: str = Field(description="사용자에게 보여줄 전체 마크다운 일정")
+    places: list[ItineraryPlace] = Field(default_factory=list, description="일정에 등장하는 장소 (등장 순서)")
+
+
+def strip_code_fence(text: str) -> str:
+    """모델이 ```json ... ``` 으로 감싸 보낸 경우 벗겨냄"""
+    return text.replace("```json", "").replace("```", "").strip()
+
+
+def parse_plan(text: str) -> ItineraryPlan:
+    """모델 출력 문자열 → ItineraryPlan (스키마에 맞지 않으면 pydantic.ValidationError)"""
+    return ItineraryPlan.model_validate_json(strip_code_fence(text))
@@ -0,0 +1,162 @@
+# api/services/llm_registry.py
+"""
+프로세스 전체에서 공유하는 LLM 클라이언트/서비스 등록소
+
+ChatGoogleGenerativeAI 는 생성할 때 gRPC 채널(HTTP/2 keep-alive 연결)을 만들기 때문에
+요청마다 새로 만들면 매번 TLS 핸드셰이크부터 다시 합니다. 여기서는
+- (종류, 모델 이름, 옵션) 별로 클라이언트를 한 번만 만들어 모든 스레드가 같은 연결을 재사용하고
+- 비동기 클라이언트(grpc_asyncio)는 이벤트 루프에 묶이므로 루프마다 얕은 복사본을 하나씩 두며
+  (GoogleGenerativeAI 는 안쪽 ChatGoogleGenerativeAI 까지 복사)
+- ss_LLMService 처럼 프롬프트 템플릿을 만드는 서비스 객체도 한 번만 생성합니다.
+
+모델별 기본 옵션은 settings.LLM_CLIENTS 로 바꿀 수 있습니다.
+
+    LLM_CLIENTS = {
+        "gemini-2.0-flash": {"timeout": 60, "max_retries": 2},
+    }
+
+API 키는 값이 아니라 환경변수 이름(api_key_env)으로 받아 캐시 키에 비밀값이 남지 않게 합니다.
+"""
+import asyncio
+import logging
+import os
+import threading
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_KEY_ENV = ("GOOGLE_API_KEY",)
+
+_lock = threading.RLock()
+_clients = {}                           # (종류, 모델, 옵션) → 클라이언트
+_loop_clients = {}                      # (종류, 모델, 옵션) → WeakKeyDictionary(루프 → 복사본)
+_services = {}                          # (클래스, 인자) → 서비스 인스턴스
+_factory = None                         # set_factory 로 바꾼 클라이언트 생성 함수 (벤치마크용 fake 등)
+stats = {"created": 0, "reused": 0}
+
+
+def _freeze(options: dict) -> tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in options.items()))
+
+
+def _api_key(env_names) -> str:
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv())          # .env 값은 읽되 이미 설정된 환경변수는 덮어쓰지 않음
+    for name in env_names:
+        if os.getenv(name):
+            return os.getenv(name)
+    return None
+
+
+def _build(kind: str, model_name: str, options: dict):
+    if _factory is not None:
+        return _factory(kind, model_name, dict(options))
+    options = dict(options)
+    api_key = _api_key(options.pop("api_key_env", DEFAULT_API_KEY_ENV))
+    if kind == "chat":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key, **options)
+    if kind == "text":
+        from langchain_google_genai import GoogleGenerativeAI
+        return GoogleGenerativeAI(model=model_name, google_api_key=api_key, **options)
+    raise ValueError(f"unknown LLM client kind: {kind}")
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _loop_copy(client):
+    """비동기 클라이언트만 비운 얕은 복사본 (동기 gRPC 채널은 공유)"""
+    copy = client.model_copy()
+    if hasattr(copy, "async_client_running"):             # ChatGoogleGenerativeAI
+        copy.async_client_running = None
+    else:                                                  # GoogleGenerativeAI: 안쪽 ChatGoogleGenerativeAI 가 비동기 클라이언트를 가짐
+        copy.client = _loop_copy(client.client)
+    return copy
+
+
+def _has_async_client(client) -> bool:
+    return hasattr(client, "async_client_running") or hasattr(getattr(client, "client", None), "async_client_running")
+
+
+def _for_loop(key, client, loop):
+    # 비동기 gRPC 클라이언트는 처음 만든 이벤트 루프에서만 쓸 수 있음
+    # → 동기 채널은 공유하고 비동기 클라이언트만 루프별로 새로 만드는 얕은 복사본 사용
+    copies = _loop_clients.setdefault(key, weakref.WeakKeyDictionary())
+    copy = copies.get(loop)
+    if copy is None:
+        copy = copies[loop] = _loop_copy(client)
+    return copy
+
+
+def get_client(kind: str, model_name: str, **options):
+    """
+    공유 LLM 클라이언트. kind: "chat"(ChatGoogleGenerativeAI) / "text"(GoogleGenerativeAI)
+    options 는 settings.LLM_CLIENTS[model_name] 위에 덮어씁니다.
+    """
+    options = {**getattr(settings, "LLM_CLIENTS", {}).get(model_name, {}), **options}
+    key = (kind, model_name, _freeze(options))
+    loop = _running_loop()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build(kind, model_name, options)
+            stats["created"] += 1
+            logger.debug("created %s LLM client %s", kind, model_name)
+        else:
+            stats["reused"] += 1
+        if loop is not None and _has_async_client(client):
+            return _for_loop(key, client, loop)
+        return client
+
+
+def set_factory(factory):
+    """
+    factory(kind, model_name, options) 로 클라이언트를 만들게 함 (None 이면 Gemini). 이전 factory 를 돌려줌
+    이미 만들어 둔 클라이언트는 그대로이므로 바꾼 뒤 clear() 를 함께 호출합니다.
+    """
+    global _factory
+    with _lock:
+        previous, _factory = _factory, factory
+    return previous
+
+
+def chat_model(model_name: str, **options):
+    return get_client("chat", model_name, **options)
+
+
+def text_model(model_name: str, **options):
+    return get_client("text", model_name, **options)
+
+
+def get_service(cls, *args, **kwargs):
+    """
+    cls(*args, **kwargs) 를 한 번만 만들어 공유. 요청마다 상태를 바꾸지 않는 서비스에만 사용합니다.
+    (ss_LLMService: 클라이언트 + few-shot 프롬프트 템플릿, DummyLLMService)
+    """
+    key = (cls, args, _freeze(kwargs))
+    with _lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = cls(*args, **kwargs)
+        return service
+
+
+def clear():
+    """등록된 클라이언트/서비스를 모두 버림 (테스트, API 키 교체 후)"""
+    with _lock:
+        _clients.clear()
+        _loop_clients.clear()
+        _services.clear()
+        stats.update(created=0, reused=0)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"clients": len(_clients), "services": len(_services), **stats}
@@ -1,10 +1,5 @@
 # api/services/llm_service.py
-from dotenv import load_dotenv, find_dotenv
-import os
-
-load_dotenv(find_dotenv())
-os.environ["GOOGLE_API_KEY"] = os.getenv("KNY_GOOGLE_API_KEY")
-# GOOGLE_API_KEY = load_dotenv(find_dotenv())
+# GOOGLE_API_KEY 는 import 시점에 환경변수를 덮어쓰지 않고, llm_registry 가 클라이언트 생성 시 직접 전달합니다.
 
 import re
 def _clean_markdown_json(content: str) -> str:
@@ -104,21 +99,18 @@ class DummyLLMService(BaseLLMService):  # Dummy LLM 서비스 구현체
         return deltas
 
 import json
+import logging
+import time
 from typing import Any, Dict, List, Tuple
 
 from django.db import transaction
 from rest_framework.response import Response
 from rest_framework import status
 
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.prompts import PromptTemplate
-from langchain.prompts.chat import (
-    ChatPromptTemplate,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-    AIMessagePromptTemplate,
-)
-from langchain_google_genai import ChatGoogleGenerativeAI
+logger = logging.getLogger(__name__)
+
+# langchain / langchain_google_genai 는 import 비용이 커서 (Django 기동 시간)
+# ss_LLMService 를 실제로 생성할 때 가져옵니다.
 
 class ss_LLMService(BaseLLMService):
     """
@@ -140,13 +132,16 @@ class ss_LLMService(BaseLLMService):
             temperature: Sampling temperature for generation.
             max_retries: Number of attempts to parse JSON.
         """
+        from .llm_registry import chat_model
+
         self.model_name = model_name
         self.max_retries = max_retries
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.model_name,
+        # 같은 모델/옵션의 클라이언트(gRPC 연결)는 프로세스 전체에서 공유
+        # 뷰에서는 llm_registry.get_service(ss_LLMService) 로 이 객체 자체도 재사용합니다.
+        self.llm = chat_model(
+            self.model_name,
+            api_key_env=("KNY_GOOGLE_API_KEY", "GOOGLE_API_KEY"),
             temperature=temperature,
-            max_tokens=None,
-            timeout=None,
             max_retries=max_retries,
         )
         self._build_prompt_template()
@@ -155,6 +150,14 @@ class ss_LLMService(BaseLLMService):
         """
         Constructs the few-shot prompt template for session metadata generation.
         """
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.prompts.chat import (
+            ChatPromptTemplate,
+            SystemMessagePromptTemplate,
+            HumanMessagePromptTemplate,
+            AIMessagePromptTemplate,
+        )
+
         # 시스템 역할 프롬프트 생성: 모델 역할과 출력 형식 지정
         system_text = (
             "You are a travel session creator assistant.\n"
@@ -284,13 +287,15 @@ class ss_LLMService(BaseLLMService):
 
 
     def generate_session_metadata(
-        self, session_parameters: Dict[str, Any]
+        self, session_parameters: Dict[str, Any], metrics=None
     ) -> Tuple[str, str]:
         """
         Generates a session title and info string based on session parameters.
 
         Args:
             session_parameters: Dictionary of user-supplied session parameters.
+            metrics: Optional GraphMetrics; records latency, tokens and parse
+                retries under the "session_metadata" node.
 
         Returns:
             A tuple of (title, info) extracted from the LLM's JSON output.
@@ -306,16 +311,24 @@ class ss_LLMService(BaseLLMService):
             example_output_2=self.example_output_2,
             params=params_json,
         ).to_messages()
-        print(">> prompt messages repr:", repr(messages))
-        print(">> prompt messages types:", [type(m) for m in messages])
-
-        for idx, m in enumerate(messages):
-            print(f">> idx={idx}, element repr={repr(m)}")
+        logger.debug("session metadata prompt: %r", messages)
 
         for attempt in range(self.max_retries):
             # result = self.llm(messages)
+            started = time.perf_counter()
             result = self.llm.invoke(messages)   # deprecated 경고 해결 위해 __call__ 대신 invoke 사용
-            print("LLM raw content:", repr(result.content))
+            if metrics is not None:
+                usage = getattr(result, "usage_metadata", None) or {}
+                metrics.add(
+                    "session_metadata",
+                    ms=(time.perf_counter() - started) * 1000,
+                    calls=1,
+                    llm_calls=1,
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0),
+                    retries=int(attempt > 0),           # JSON 파싱 실패로 다시 호출한 횟수
+                )
+            logger.debug("LLM raw content: %r", result.content)
             # 1) 마크다운 fence 제거
             clean_content = _clean_markdown_json(result.content)
             try:
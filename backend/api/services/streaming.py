@@ -0,0 +1,106 @@
+# api/services/streaming.py
+"""
+일정 생성 스트리밍(Server-Sent Events) 보조 도구
+
+- sse_event:            (event, data) 를 SSE 프레임 문자열로 변환
+- JSONFieldTokenStream: LLM 이 토큰 단위로 내보내는 JSON 텍스트에서
+                        특정 문자열 필드("answer")의 값만 풀어서 흘려보냄
+- PlainTextTokenStream: 마크다운을 그대로 내보내는 노드용 (같은 인터페이스)
+"""
+import json
+import re
+
+
+def sse_event(event: str, data) -> str:
+    """SSE 프레임 한 개를 만듭니다. data 는 JSON 으로 직렬화합니다."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class JSONFieldTokenStream:
+    """
+    generate_message 의 출력은 {"answer": "<마크다운>", "places": [...]} 형태의 JSON 입니다.
+    토큰이 도착하는 대로 feed() 에 넣으면 "answer" 문자열 값 중 새로 확정된 부분만
+    JSON 이스케이프를 풀어서 돌려줍니다. (값이 끝나면 이후 토큰은 무시)
+    """
+
+    def __init__(self, field: str = 'answer'):
+        self._start_re = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._state   = 'seek'     # seek → value → done
+        self._buffer  = ''         # seek 단계에서 모은 텍스트
+        self._escape  = ''         # 처리 중인 이스케이프 시퀀스 ("\\", "\\u12" 등)
+        self._high    = ''         # 짝(low surrogate)을 기다리는 high surrogate 시퀀스
+        self.emitted  = ''         # 지금까지 내보낸 전체 텍스트
+
+    @property
+    def done(self) -> bool:
+        return self._state == 'done'
+
+    def feed(self, chunk: str) -> str:
+        if not chunk or self._state == 'done':
+            return ''
+        if self._state == 'seek':
+            self._buffer += chunk
+            match = self._start_re.search(self._buffer)
+            if not match:
+                return ''
+            chunk = self._buffer[match.end():]
+            self._buffer = ''
+            self._state = 'value'
+
+        out = []
+        for ch in chunk:
+            if self._state == 'done':
+                break
+            if self._escape:
+                self._escape += ch
+                decoded = self._decode_escape()
+                if decoded is not None:
+                    out.append(decoded)
+            elif ch == '\\':
+                self._escape = ch
+            elif ch == '"':
+                self._state = 'done'
+            else:
+                out.append(self._flush_high() + ch)
+        text = ''.join(out)
+        self.emitted += text
+        return text
+
+    def _flush_high(self) -> str:
+        # 짝이 오지 않은 high surrogate 는 그대로 버림 (잘못된 입력)
+        self._high = ''
+        return ''
+
+    def _decode_escape(self):
+        seq = self._escape
+        if seq[1] != 'u':
+            self._escape = ''
+            return self._flush_high() + json.loads(f'"{seq}"')
+        if len(seq) < 6:
+            return None                                  # \uXXXX 가 아직 덜 도착함
+        self._escape = ''
+        code = int(seq[2:], 16)
+        if 0xD800 <= code <= 0xDBFF:                     # 이모지 등: low surrogate 를 기다림
+            self._high = seq
+            return ''
+        if 0xDC00 <= code <= 0xDFFF and self._high:
+            pair, self._high = self._high + seq, ''
+            return json.loads(f'"{pair}"')
+        return self._flush_high() + json.loads(f'"{seq}"')
+
+
+class PlainTextTokenStream:
+    """
+    planned 모드의 write_itinerary 처럼 answer 마크다운을 JSON 없이 바로 내보내는 노드용.
+    JSONFieldTokenStream 과 같은 feed()/emitted 인터페이스로 조각을 그대로 통과시킵니다.
+    """
+
+    def __init__(self):
+        self.emitted = ''
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ''
+        self.emitted += chunk
+        return chunk
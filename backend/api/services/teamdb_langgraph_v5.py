@@ -1,14 +1,14 @@
 ## llm 답변 실제로 받아보자
 
 # 1. State 정의 및 그래프 초기화
+#
+# 이 모듈은 import 시점에 아무 부작용도 일으키지 않습니다.
+# (환경변수 덮어쓰기, DB 스키마 조회, LLM/Tavily 클라이언트 생성, 그래프 컴파일 없음)
+# 무거운 객체는 처음 사용할 때 _get_llm() / _get_db() / _get_search_tool() / get_app() 에서
+# 한 번만 만들어지며, 서버 기동 시 미리 만들고 싶다면 warm_up() 을 호출합니다.
 import os
-from dotenv import load_dotenv, find_dotenv
-
-# .env 파일에서 GOOGLE API 키를 불러와 환경변수에 설정
-load_dotenv(find_dotenv())
-
-os.environ["GOOGLE_API_KEY"] = os.getenv("LKK_GOOGLE_API_KEY")
-os.environ['TAVILY_API_KEY'] = os.getenv("KYN_TAVILY_API")
+import logging
+import threading
 
 import operator
 import json
@@ -30,8 +30,17 @@ from .teamdb_prompts_v5 import (combined_table_info,
                                project_context,
                                select_place_prompt,
                                answer_prompt,
+                               itinerary_prose_prompt,
                                rewrite_question_prompt
                                )
+from .teamdb_query_builder import (build_tourinfo_query,
+                                   build_restaurant_query,
+                                   build_accommodation_query,
+                                   TOURINFO_TOP_K,
+                                   RESTAURANT_TOP_K,
+                                   ACCOMMODATION_TOP_K
+                                   )
+from .candidate_cache import candidate_cache
 
 class State(TypedDict):
     question:                    Annotated[str, "Question"] # 질문
@@ -55,36 +64,128 @@ class State(TypedDict):
     # 병렬 처리 결과물 저장할 필드들 (reducer 사용)
     all_queries:                 Annotated[dict, operator.or_]
     all_results:                 Annotated[dict, operator.or_]
+    candidate_tokens:            Annotated[dict, operator.or_] # 테이블별 후보 토큰 수 (변환 전/후)
+    candidate_rows:              Annotated[dict, operator.or_] # planned 모드: 테이블별 후보 행(dict 목록)
+    plan:                        Annotated[str, "Plan"] # planned 모드: itinerary_planner 가 정한 일정 마크다운 틀
+    plan_places:                 Annotated[list, "Plan_Places"] # planned 모드: [{"name", "map_x", "map_y"}, ...]
+    # 여행 파라미터 (요청마다 get_result 에서 채워짐 → 동시 요청 간 공유되지 않음)
+    city:                        Annotated[str, "City"]
+    district:                    Annotated[str, "District"]
+    category_two:                Annotated[str, "Category_Two"]
+    companions:                  Annotated[str, "Companions"]
+    group_size:                  Annotated[int, "Group_Size"]
+    meal_schedule:               Annotated[dict, "Meal_Schedule"] # {"breakfast": 'True'/'False', ...}
+    schedule:                    Annotated[dict, "Schedule"] # {"startDate": ..., "endDate": ...}
 
 ### LLM 정의
-from langchain_google_genai                      import GoogleGenerativeAI
 from langchain_core.prompts                      import PromptTemplate
-from langchain.chains                            import create_sql_query_chain
-from langchain.utilities                         import SQLDatabase
-from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
-from langchain_tavily                            import TavilySearch
 
 import datetime
 
 import ast
 
-# DB 엔진 설정 (환경에 맞게 수정)
-HOST                 = os.getenv("DB_HOST")
-PORT                 = os.getenv("DB_PORT")
-USERNAME             = os.getenv("DB_USER")
-PASSWORD             = os.getenv("DB_PASSWORD")
-DB_SCHEMA            = os.getenv("DB_NAME")
-
-mysql_uri = f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}:{PORT}/{DB_SCHEMA}"
-
-
-llm = GoogleGenerativeAI(model='gemini-2.0-flash')
+logger = logging.getLogger(__name__)
+
+LLM_MODEL_NAME = 'gemini-2.0-flash'
+
+def _mysql_uri() -> str:
+    # DB 엔진 설정 (환경에 맞게 수정)
+    HOST                 = os.getenv("DB_HOST")
+    PORT                 = os.getenv("DB_PORT")
+    USERNAME             = os.getenv("DB_USER")
+    PASSWORD             = os.getenv("DB_PASSWORD")
+    DB_SCHEMA            = os.getenv("DB_NAME")
+    return f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}:{PORT}/{DB_SCHEMA}"
+
+# 지연 생성되는 공유 객체들 (첫 사용 시 한 번만 생성)
+_init_lock      = threading.RLock()
+_llm            = None   # LLM 클라이언트는 llm_registry 가 공유 관리 (여기 값을 넣으면 그것을 대신 사용)
+_db             = None
+_execute_query  = None
+_search_tool    = None
+_structured_llm = None
+_app            = None
+
+def _load_env() -> None:
+    # .env 파일 값을 읽되, 이미 설정된 환경변수는 덮어쓰지 않음
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv())
+
+LLM_API_KEY_ENV = ("LKK_GOOGLE_API_KEY", "GOOGLE_API_KEY")
+
+def _get_llm():
+    # _llm 을 직접 넣은 경우(테스트/스모크)를 제외하면 llm_registry 의 공유 클라이언트 사용
+    # (프로세스 환경변수(GOOGLE_API_KEY)를 바꾸지 않고 키를 직접 전달)
+    if _llm is not None:
+        return _llm
+    from .llm_registry import text_model
+    return text_model(LLM_MODEL_NAME, api_key_env=LLM_API_KEY_ENV)
+
+def _get_structured_llm():
+    """
+    single_pass 모드용 채팅 모델. JSON 모드(response_mime_type)로 응답 형식을 강제하고
+    결과는 itinerary_schema.ItineraryPlan 으로 검증합니다.
+    """
+    if _structured_llm is not None:
+        return _structured_llm
+    from .llm_registry import chat_model
+    # 비동기 노드에서 호출되면 이벤트 루프별 복사본을 돌려받음 (gRPC 연결은 공유)
+    return chat_model(LLM_MODEL_NAME, api_key_env=LLM_API_KEY_ENV, response_mime_type="application/json")
+
+def _get_db():
+    global _db
+    if _db is None:
+        with _init_lock:
+            if _db is None:
+                from langchain_community.utilities import SQLDatabase
+                _load_env()
+                _db = SQLDatabase.from_uri(_mysql_uri())
+    return _db
+
+def _get_execute_query():
+    # SQL 실행 도구 정의
+    global _execute_query
+    if _execute_query is None:
+        with _init_lock:
+            if _execute_query is None:
+                from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+                _execute_query = QuerySQLDatabaseTool(db=_get_db())
+    return _execute_query
+
+def _get_search_tool():
+    ## tavily 추가
+    global _search_tool
+    if _search_tool is None:
+        with _init_lock:
+            if _search_tool is None:
+                # TavilySearch 와 같은 invoke 형식이지만 HTTP 요청에 타임아웃이 있음 (WEB_SEARCH_REQUEST_TIMEOUT)
+                from .web_search import TavilySearchClient
+                _load_env()
+                api_key = os.getenv("KYN_TAVILY_API") or os.getenv("TAVILY_API_KEY")
+                _search_tool = TavilySearchClient(api_key, max_results=3, topic="general")
+    return _search_tool
+
+def set_search_tool(tool) -> None:
+    """
+    웹 검색 클라이언트 교체 (테스트/벤치마크용 로컬 스텁 등)
+    tool 은 {"query": ...} 를 받아 {"results": [{"content": ...}]} 를 돌려주는
+    invoke (비동기 경로에서는 ainvoke) 를 제공해야 합니다. None 이면 다음 호출 때 Tavily 로 다시 생성
+    """
+    global _search_tool
+    with _init_lock:
+        _search_tool = tool
 
-## tavily 추가
-tool = TavilySearch(
-    max_results=3,
-    topic="general"
-)
+def set_backends(llm=None, structured_llm=None, db=None) -> dict:
+    """
+    LLM/구조화 LLM/카탈로그 DB 교체 (벤치마크용 fakes.fake_backends 등). 이전 값을 돌려줘서 되돌릴 수 있게 함
+    None 이면 원래대로 llm_registry 의 공유 클라이언트 / MySQL(다음 호출 때 생성)을 사용
+    """
+    global _llm, _structured_llm, _db, _execute_query
+    with _init_lock:
+        previous = {"llm": _llm, "structured_llm": _structured_llm, "db": _db}
+        _llm, _structured_llm, _db = llm, structured_llm, db
+        _execute_query = None                       # 새 DB 로 SQL 실행 도구를 다시 만듦
+    return previous
 
 # city = "서울"
 # district = "성동구"
@@ -139,44 +240,81 @@ tool = TavilySearch(
 
 
 
-# 현재 시점(YYYY-MM-DD HH:MM:SS) 저장
+# 후보 조회 SQL 생성 방식
+# - "builder": teamdb_query_builder 로 SQL을 직접 생성 (LLM 호출 없음, 기본값)
+# - "llm":     create_sql_query_chain 으로 Gemini가 SQL을 작성 (기존 방식)
+QUERY_MODE = os.getenv("TEAMDB_QUERY_MODE", "builder").lower()
 
-now_date = datetime.datetime.now().strftime("%Y-%m-%d")
-now_time = datetime.datetime.now().strftime("%H:%M:%S")
-now_date_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# 후보 행을 프롬프트에 넣는 방식 (builder 모드에서만 적용)
+# - "compact": 필요한 컬럼만, 여행 요일 영업시간만 담은 압축 표 (candidate_encoding, 기본값)
+# - "raw":     QuerySQLDatabaseTool 의 SELECT * 튜플 문자열 그대로 (기존 방식)
+CANDIDATE_ENCODING = os.getenv("TEAMDB_CANDIDATE_ENCODING", "compact").lower()
 
-db = SQLDatabase.from_uri(mysql_uri)
-
-# SQL 실행 도구 정의
-execute_query = QuerySQLDatabaseTool(db=db)
+# 그래프 구성 방식
+# - "two_pass":    select_place(LLM) → search_web → generate_message(LLM) (기존 방식, 기본값)
+# - "single_pass": plan_itinerary 한 번의 LLM 호출로 answer + places 를 스키마 검증된 JSON 으로 생성
+#                  → (WEB_ENRICHMENT 가 켜져 있으면) 선택된 장소만 웹 검색해 places 에 덧붙임
+# - "planned":     itinerary_planner 가 식사 조건/중복/순위/동선 규칙으로 일정을 코드로 배치하고
+#                  LLM(write_itinerary)은 고정된 일정에 설명 문장만 씀 (장소 선택 LLM 호출/파싱 없음)
+#                  → WEB_ENRICHMENT 는 single_pass 와 같게 적용
+GRAPH_MODE = os.getenv("TEAMDB_GRAPH_MODE", "two_pass").lower()
+WEB_ENRICHMENT = os.getenv("TEAMDB_WEB_ENRICHMENT", "true").lower() in ("1", "true", "yes")
 
 #################################################
 
 # 2. 노드 정의
 ## def
 
+def _now_date_time() -> str:
+    # 현재 시점(YYYY-MM-DD HH:MM:SS) - 모듈 import 시점이 아닌 호출 시점 기준
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _trip_prompt_vars(state: State) -> dict:
+    """State 에 담긴 여행 파라미터를 select_place/answer 프롬프트 변수로 변환"""
+    meal_schedule = state["meal_schedule"]
+    schedule = state["schedule"]
+    return {
+        "city":         state["city"],
+        "district":     state["district"],
+        "category_two": state["category_two"],
+        "companions":   state["companions"],
+        "group_size":   state["group_size"],
+        "breakfast":    meal_schedule["breakfast"],
+        "lunch":        meal_schedule["lunch"],
+        "dinner":       meal_schedule["dinner"],
+        "startDate":    schedule["startDate"],
+        "endDate":      schedule["endDate"],
+    }
+
+def _write_query_with_llm(prompt, question: str) -> str:
+    """create_sql_query_chain 으로 LLM 이 SQL을 작성하게 합니다. (QUERY_MODE='llm')"""
+    from langchain.chains import create_sql_query_chain
+    write_query = create_sql_query_chain(_get_llm(), _get_db(), prompt)
+    result = write_query.invoke({"question": question})
+    clean_query = result.replace("```sql", "").replace("```", "").strip()
+    logger.debug("generated query: %s", clean_query)
+    return clean_query
+
 def create_query_tourinfo(state: State) -> dict:
     
     question = state["question"]
     # 사용자의 요청에 맞는 쿼리 생성
-    write_query = create_sql_query_chain(llm,
-                                         db,
-                                         tourinfo_query_prompt.partial(
-                                             dialect=db.dialect,
-                                             current_time=now_date_time,
-                                             table_info=tourinfo_table_info,
-                                             top_k=20,
-                                             city=city,
-                                             gu=district,
-                                             category_two=category_two,
-                                             companions=companions,
-                                             group_size=group_size
-                                             )
-                                         )
-    result = write_query.invoke({"question": question})
-    print(result)
-    clean_query = result.replace("```sql", "").replace("```", "").strip()
-    print(clean_query)
+    if QUERY_MODE == "llm":
+        clean_query = _write_query_with_llm(tourinfo_query_prompt.partial(
+                                                dialect=_get_db().dialect,
+                                                current_time=_now_date_time(),
+                                                table_info=tourinfo_table_info,
+                                                top_k=TOURINFO_TOP_K,
+                                                city=state["city"],
+                                                gu=state["district"],
+                                                category_two=state["category_two"],
+                                                companions=state["companions"],
+                                                group_size=state["group_size"]
+                                                ),
+                                            question)
+    else:
+        clean_query = build_tourinfo_query(state["district"], state["category_two"],
+                                           top_k=TOURINFO_TOP_K, dialect=_get_db().dialect)
     # return State(query_tourinfo=clean_query)
     return {"query_tourinfo": clean_query,
             "all_queries": {"tourinfo": clean_query}}
@@ -185,21 +323,18 @@ def create_query_accommodation(state: State) -> dict:
     
     question = state["question"]
     # 사용자의 요청에 맞는 쿼리 생성
-    write_query = create_sql_query_chain(llm,
-                                         db,
-                                         accommodation_query_prompt.partial(
-                                             dialect=db.dialect,
-                                             current_time=now_date_time,
-                                             table_info=accommodation_table_info,
-                                             top_k=20,
-                                             gu=district
-                                             )
-                                         )
-    
-    result = write_query.invoke({"question": question})
-    print(result)
-    clean_query = result.replace("```sql", "").replace("```", "").strip()
-    print(clean_query)
+    if QUERY_MODE == "llm":
+        clean_query = _write_query_with_llm(accommodation_query_prompt.partial(
+                                                dialect=_get_db().dialect,
+                                                current_time=_now_date_time(),
+                                                table_info=accommodation_table_info,
+                                                top_k=ACCOMMODATION_TOP_K,
+                                                gu=state["district"]
+                                                ),
+                                            question)
+    else:
+        clean_query = build_accommodation_query(state["district"],
+                                                top_k=ACCOMMODATION_TOP_K, dialect=_get_db().dialect)
     return {"query_accommodation": clean_query,
             "all_queries": {"accommodation": clean_query}}
 
@@ -207,76 +342,126 @@ def create_query_restaurant(state: State) -> dict:
     
     question = state["question"]
     # 사용자의 요청에 맞는 쿼리 생성
-    write_query = create_sql_query_chain(llm,
-                                         db,
-                                         restaurant_query_prompt.partial(
-                                             dialect=db.dialect,
-                                             current_time=now_date_time,
-                                             table_info=restaurant_table_info,
-                                             top_k=20,
-                                             gu=district
-                                             )
-                                         )
-    
-    result = write_query.invoke({"question": question})
-    print(result)
-    clean_query = result.replace("```sql", "").replace("```", "").strip()
-    print(clean_query)
+    if QUERY_MODE == "llm":
+        clean_query = _write_query_with_llm(restaurant_query_prompt.partial(
+                                                dialect=_get_db().dialect,
+                                                current_time=_now_date_time(),
+                                                table_info=restaurant_table_info,
+                                                top_k=RESTAURANT_TOP_K,
+                                                gu=state["district"]
+                                                ),
+                                            question)
+    else:
+        clean_query = build_restaurant_query(state["district"],
+                                             top_k=RESTAURANT_TOP_K, dialect=_get_db().dialect)
     return {"query_restaurant": clean_query,
             "all_queries": {"restaurant": clean_query}}
 
 
+def _trip_weekdays(state: State) -> list:
+    """여행 기간의 요일(0=월 … 6=일) - 영업시간 압축에 사용"""
+    from .itinerary_cache import trip_weekdays
+    return trip_weekdays(state["schedule"])
+
+def _select_rows(query: str) -> list:
+    """SELECT 결과 → dict 목록 (SQLDatabase.run 의 cursor 결과를 바로 읽음. 행을 돌려주지 않는 문장이면 [])"""
+    result = _get_db().run(query, fetch="cursor")
+    if not hasattr(result, "mappings"):
+        return []
+    return [dict(row) for row in result.mappings()]
+
+def _candidate_rows(table: str, state: State, query: str, top_k: int,
+                    category_two: Optional[str] = None) -> list:
+    """후보 행(dict 목록). builder 모드면 SQL 이 결정적이므로 candidate_cache 를 거침"""
+    if QUERY_MODE == "llm":
+        return _select_rows(query)
+    return candidate_cache.get_or_fetch(
+        f"{table}:rows", state["district"], category_two, top_k,
+        lambda: _select_rows(query),
+    )
+
+def _fetch_candidates(table: str, state: State, query: str, top_k: int,
+                      category_two: Optional[str] = None) -> tuple:
+    """
+    후보 조회 실행 → (프롬프트에 넣을 문자열, 토큰 리포트 또는 None)
+
+    - builder 모드: SQL이 (table, district, category_two, top_k) 로 완전히 결정되므로 candidate_cache 를 거침
+      CANDIDATE_ENCODING="compact" 면 행(dict)을 캐시하고 candidate_encoding 으로 필요한 컬럼만 압축해 넣음
+    - llm 모드: SQL(선택 컬럼)이 매번 달라질 수 있어 캐시/압축 없이 QuerySQLDatabaseTool 결과를 그대로 사용
+    """
+    if QUERY_MODE == "llm":
+        return _get_execute_query().invoke({"query": query}), None
+    if CANDIDATE_ENCODING != "compact":
+        return candidate_cache.get_or_fetch(
+            table, state["district"], category_two, top_k,
+            lambda: _get_execute_query().invoke({"query": query}),
+        ), None
+
+    from .candidate_encoding import encode_candidates, token_report
+    rows = _candidate_rows(table, state, query, top_k, category_two)
+    weekdays = _trip_weekdays(state)
+    report = token_report(table, rows, weekdays)
+    logger.info("candidates %s: %d rows, %d → %d tokens", table, report["rows"],
+                report["raw_tokens"], report["compact_tokens"])
+    return encode_candidates(table, rows, weekdays), report
+
 def fetch_db_tourinfo(state: State) -> dict:
     
     query = state["query_tourinfo"]
     
-    fetch_db = execute_query.invoke({"query": query})
-    print(fetch_db)
+    fetch_db, report = _fetch_candidates("api_tourinfo", state, query, TOURINFO_TOP_K,
+                                         category_two=state["category_two"])
     # return State(fetch_db_tourinfo=fetch_db)
     return {"fetch_db_tourinfo": fetch_db,
-            "all_results": {"tourinfo": fetch_db}}
+            "all_results": {"tourinfo": fetch_db},
+            "candidate_tokens": {"tourinfo": report}}
 
 def fetch_db_accommodation(state: State) -> dict:
     
     query = state["query_accommodation"]
     
-    fetch_db = execute_query.invoke({"query": query})
-    print(fetch_db)
+    fetch_db, report = _fetch_candidates("api_accommodation", state, query, ACCOMMODATION_TOP_K)
     return {"fetch_db_accommodation": fetch_db,
-            "all_results": {"accommodation": fetch_db}}
+            "all_results": {"accommodation": fetch_db},
+            "candidate_tokens": {"accommodation": report}}
 
 def fetch_db_restaurant(state: State) -> dict:
     
     query = state["query_restaurant"]
     
-    fetch_db = execute_query.invoke({"query": query})
-    print(fetch_db)
+    fetch_db, report = _fetch_candidates("api_restaurant", state, query, RESTAURANT_TOP_K)
     return {"fetch_db_restaurant": fetch_db,
-            "all_results": {"restaurant": fetch_db}}
+            "all_results": {"restaurant": fetch_db},
+            "candidate_tokens": {"restaurant": report}}
+
+# planned 모드의 fetch 노드: 프롬프트용 문자열 대신 planner 가 쓸 행을 그대로 넘김
+def fetch_rows_tourinfo(state: State) -> dict:
+    rows = _candidate_rows("api_tourinfo", state, state["query_tourinfo"], TOURINFO_TOP_K,
+                           category_two=state["category_two"])
+    return {"candidate_rows": {"tourinfo": rows}}
+
+def fetch_rows_accommodation(state: State) -> dict:
+    rows = _candidate_rows("api_accommodation", state, state["query_accommodation"], ACCOMMODATION_TOP_K)
+    return {"candidate_rows": {"accommodation": rows}}
+
+def fetch_rows_restaurant(state: State) -> dict:
+    rows = _candidate_rows("api_restaurant", state, state["query_restaurant"], RESTAURANT_TOP_K)
+    return {"candidate_rows": {"restaurant": rows}}
 
 
 # 사용자의 질문과 답변에 맞게 장소를 정함
-def select_place(state: State) -> dict:
+# LLM 을 부르는 노드는 동기(invoke)/비동기(ainvoke) 두 버전을 함께 제공하고,
+# 체인 구성과 결과 처리는 공통 헬퍼로 나눠 둡니다.
+def _select_place_chain(state: State):
     # gemini 답변
     question = state["question"]
     
     # all_queries = state["all_queries"]
     all_results = state["all_results"]
     
-    answer_chain = select_place_prompt.partial(
-                                               city=city,
-                                               district=district,
-                                               category_two=category_two,
-                                               companions=companions,
-                                               group_size=group_size,
-                                               breakfast=meal_schedule['breakfast'],
-                                               lunch=meal_schedule['lunch'],
-                                               dinner=meal_schedule['dinner'],
-                                               startDate=schedule['startDate'],
-                                               endDate=schedule['endDate']
-                                               ) | llm | StrOutputParser()
-
-    selected_place = answer_chain.invoke({
+    answer_chain = select_place_prompt.partial(**_trip_prompt_vars(state)) | _get_llm() | StrOutputParser()
+
+    inputs = {
         "question": question,
         # "query_tourinfo": all_queries["tourinfo"],
         # "query_accommodation": all_queries["accommodation"],
@@ -284,46 +469,77 @@ def select_place(state: State) -> dict:
         "fetch_db_tourinfo": all_results["tourinfo"],
         "fetch_db_accommodation": all_results["accommodation"],
         "fetch_db_restaurant": all_results["restaurant"]
-    })
-    
-    print(selected_place)
-    
+    }
+    return answer_chain, inputs
+
+def _selected_places(selected_place: str) -> dict:
     selected_place_list = ast.literal_eval(selected_place)
-    
-    print(selected_place)
-    print(type(selected_place))
-    print(selected_place_list)
-    print(type(selected_place_list))
+    logger.debug("selected places: %s", selected_place_list)
     
     return State(places=selected_place_list)
 
+def select_place(state: State) -> dict:
+    answer_chain, inputs = _select_place_chain(state)
+    return _selected_places(answer_chain.invoke(inputs))
+
+async def aselect_place(state: State) -> dict:
+    answer_chain, inputs = _select_place_chain(state)
+    return _selected_places(await answer_chain.ainvoke(inputs))
+
+# 장소별 웹 검색은 web_search 모듈에서 중복 제거 + 캐시 + 동시 실행(마감 시간 포함)으로 처리
+def _place_queries(state: State) -> list:
+    """(장소, 검색어) 목록 - 빈 장소는 제외"""
+    return [(place, state["district"] + " " + place) for place in state['places'] if place]
+
 def search_web(state: State) -> dict:
-    
-    all_text = ""
-    
-    places = state['places']
-    
-    print(places)
-    
-    for place in places:
+    from .web_search import search_many, format_results
 
-        print(place)
-        
-        if not place:
-            continue
-        
-        all_text += f"{places} 웹 검색 결과: "
-        print(district + " " + place)
-        result = tool.invoke({"query": district + " " + place})
-        print(result)
-        for re in result['results']:
-            all_text += '\n' + re['content']
-        
-        all_text += '\n'
-    
-    return {"web_results": all_text}
+    place_queries = _place_queries(state)
+    results = search_many(_get_search_tool(), [query for _, query in place_queries])
+    return {"web_results": format_results(place_queries, results)}
 
-def generate_message(state: State) -> State:
+async def asearch_web(state: State) -> dict:
+    from .web_search import asearch_many, format_results
+
+    place_queries = _place_queries(state)
+    results = await asearch_many(_get_search_tool(), [query for _, query in place_queries])
+    return {"web_results": format_results(place_queries, results)}
+
+NO_TRAVEL_TIMES = "(계산된 이동 시간 없음)"
+
+def _candidate_matrix(state: State, candidates: dict):
+    from .travel_matrix import matrix_for
+    return matrix_for(state["district"], state["category_two"], candidates)
+
+def _travel_times(state: State) -> str:
+    """
+    two_pass: select_place 가 고른 장소 순서대로 연속 구간의 거리/예상 이동 시간 (answer_prompt 의 이동 시간 표)
+    후보 행이 필요하므로 builder 모드에서만 계산 (llm 모드는 SQL 이 매번 달라 행을 재사용할 수 없음)
+    """
+    if QUERY_MODE == "llm":
+        return NO_TRAVEL_TIMES
+    from .travel_matrix import describe_leg, row_key
+
+    candidates = {
+        "tourinfo":      _candidate_rows("api_tourinfo", state, state["query_tourinfo"], TOURINFO_TOP_K,
+                                         category_two=state["category_two"]),
+        "accommodation": _candidate_rows("api_accommodation", state, state["query_accommodation"],
+                                         ACCOMMODATION_TOP_K),
+        "restaurant":    _candidate_rows("api_restaurant", state, state["query_restaurant"], RESTAURANT_TOP_K),
+    }
+    matrix = _candidate_matrix(state, candidates)
+    by_name = {}
+    for row in matrix.rows:
+        by_name.setdefault(row_key(row)[0], row)
+    route = [by_name[place] for place in state["places"] if place in by_name]
+    lines = []
+    for origin, destination in zip(route, route[1:]):
+        leg = matrix.leg(origin, destination)
+        if leg is not None and origin is not destination:
+            lines.append(f"- {row_key(origin)[0]} → {row_key(destination)[0]}: {describe_leg(leg)}")
+    return "\n".join(lines) or NO_TRAVEL_TIMES
+
+def _generate_message_chain(state: State):
     # gemini 답변
     question = state["question"]
     
@@ -333,28 +549,12 @@ def generate_message(state: State) -> State:
     web_results = state["web_results"]
     
     answer_chain = answer_prompt.partial(project_context=project_context,
-                                         city=city,
-                                         district=district,
-                                         category_two=category_two,
-                                         companions=companions,
-                                         group_size=group_size,
-                                         breakfast=meal_schedule['breakfast'],
-                                         lunch=meal_schedule['lunch'],
-                                         dinner=meal_schedule['dinner'],
-                                         startDate=schedule['startDate'],
-                                         endDate=schedule['endDate'],
-                                         web_results=web_results
-                                         ) | llm | StrOutputParser()
-
-    print(all_queries["tourinfo"])
-    print(all_queries["accommodation"])
-    print(all_queries["restaurant"])
-    print(all_results["tourinfo"])
-    print(all_results["accommodation"])
-    print(all_results["restaurant"])
+                                         web_results=web_results,
+                                         travel_times=_travel_times(state),
+                                         **_trip_prompt_vars(state)
+                                         ) | _get_llm() | StrOutputParser()
 
-    
-    answer = answer_chain.invoke({
+    inputs = {
         "question": question,
         "query_tourinfo": all_queries["tourinfo"],
         "query_accommodation": all_queries["accommodation"],
@@ -363,64 +563,245 @@ def generate_message(state: State) -> State:
         "fetch_db_accommodation": all_results["accommodation"],
         "fetch_db_restaurant": all_results["restaurant"],
         # "web_results": web_results,
-    })
-    
+    }
+    return answer_chain, inputs
+
+def _checked_answer(answer: str) -> State:
+    # JSON 형식 검사를 노드 안에서 해야 파싱 실패가 이 노드의 재시도(NODE_RETRY)로 처리됨
+    _parse_answer({"answer": answer})
     return State(answer=answer)
 
+def generate_message(state: State) -> State:
+    answer_chain, inputs = _generate_message_chain(state)
+    return _checked_answer(answer_chain.invoke(inputs))
+
+async def agenerate_message(state: State) -> State:
+    answer_chain, inputs = _generate_message_chain(state)
+    # astream 으로 받아야 LLM 토큰 이벤트(on_llm_stream)가 발생해 SSE 로 흘려보낼 수 있음
+    answer = ""
+    async for piece in answer_chain.astream(inputs):
+        answer += piece
+    return _checked_answer(answer)
+
+# single_pass 모드: 후보 행을 한 번만 LLM 에 넣어 장소 선택과 일정 작성을 함께 처리
+def _plan_itinerary_chain(state: State):
+    # answer_prompt 는 이미 후보 행으로 {"answer", "places"} JSON 을 만들도록 작성되어 있으므로 그대로 사용
+    # (웹 검색 결과는 계획 이후 enrich_places 에서 places 에만 덧붙임)
+    # 장소가 아직 정해지지 않았으므로 이동 시간 표도 없음 → 프롬프트 규칙대로 '이동' 줄 생략
+    answer_chain = answer_prompt.partial(project_context=project_context,
+                                         web_results="(웹 검색 결과 없음)",
+                                         travel_times=NO_TRAVEL_TIMES,
+                                         **_trip_prompt_vars(state)
+                                         ) | _get_structured_llm() | StrOutputParser()
+    all_results = state["all_results"]
+    inputs = {
+        "question": state["question"],
+        "fetch_db_tourinfo": all_results["tourinfo"],
+        "fetch_db_accommodation": all_results["accommodation"],
+        "fetch_db_restaurant": all_results["restaurant"],
+    }
+    return answer_chain, inputs
+
+def _planned(text: str) -> dict:
+    from .itinerary_schema import parse_plan
+    plan = parse_plan(text)
+    # answer 채널에는 two_pass 와 같은 JSON 문자열을 넣어 get_result/_parse_answer 를 공유
+    return {"answer": plan.model_dump_json(),
+            "places": [place.name for place in plan.places]}
+
+def plan_itinerary(state: State) -> dict:
+    answer_chain, inputs = _plan_itinerary_chain(state)
+    return _planned(answer_chain.invoke(inputs))
+
+async def aplan_itinerary(state: State) -> dict:
+    answer_chain, inputs = _plan_itinerary_chain(state)
+    text = ""
+    async for piece in answer_chain.astream(inputs):        # SSE 토큰 스트리밍용
+        text += piece
+    return _planned(text)
+
+# planned 모드: 장소 배치는 코드로, LLM 은 고정된 일정의 설명 문장만 작성
+def plan_schedule(state: State) -> dict:
+    from .itinerary_cache import trip_dates
+    from .itinerary_planner import plan_days, plan_places, plan_to_markdown
+
+    candidates = state["candidate_rows"]
+    plan = plan_days(candidates, state["meal_schedule"], trip_dates(state["schedule"]),
+                     matrix=_candidate_matrix(state, candidates))
+    places = plan_places(plan)
+    return {"plan": plan_to_markdown(plan),
+            "plan_places": places,
+            "places": [place["name"] for place in places]}
+
+def _write_itinerary_chain(state: State):
+    return itinerary_prose_prompt.partial(project_context=project_context,
+                                          **_trip_prompt_vars(state)
+                                          ) | _get_llm() | StrOutputParser()
+
+def _written(state: State, text: str) -> dict:
+    from .itinerary_schema import strip_code_fence
+    # answer 채널은 다른 모드와 같은 {"answer", "places"} JSON 문자열 (places 는 planner 결과 그대로)
+    return {"answer": json.dumps({"answer": strip_code_fence(text).strip(), "places": state["plan_places"]},
+                                 ensure_ascii=False)}
+
+def write_itinerary(state: State) -> dict:
+    return _written(state, _write_itinerary_chain(state).invoke({"plan": state["plan"]}))
+
+async def awrite_itinerary(state: State) -> dict:
+    text = ""
+    async for piece in _write_itinerary_chain(state).astream({"plan": state["plan"]}):   # SSE 토큰 스트리밍용
+        text += piece
+    return _written(state, text)
+
+def _enriched(state: State, results: dict) -> dict:
+    from .web_search import normalize_query
+    plan = json.loads(state["answer"])
+    for place in plan["places"]:
+        result = results.get(normalize_query(state["district"] + " " + place["name"]))
+        if result:
+            place["web_results"] = [item.get("content", "") for item in result.get("results", [])]
+    return {"answer": json.dumps(plan, ensure_ascii=False)}
+
+def enrich_places(state: State) -> dict:
+    from .web_search import search_many
+    queries = [query for _, query in _place_queries(state)]
+    return _enriched(state, search_many(_get_search_tool(), queries))
+
+async def aenrich_places(state: State) -> dict:
+    from .web_search import asearch_many
+    queries = [query for _, query in _place_queries(state)]
+    return _enriched(state, await asearch_many(_get_search_tool(), queries))
+
 from langgraph.graph import END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import RetryPolicy, default_retry_on
 
 # 3. 그래프 정의 및 엣지 연결
 
-# Langgraph.graph에서 StateGraph와 END를 가져옵니다.
-graph = StateGraph(State)
-
-# 노드 추가
-
-graph.add_node("create_query_tourinfo", create_query_tourinfo)
-graph.add_node("create_query_accommodation", create_query_accommodation)
-graph.add_node("create_query_restaurant", create_query_restaurant)
-graph.add_node("fetch_tourinfo", fetch_db_tourinfo)
-graph.add_node("fetch_accommodation", fetch_db_accommodation)
-graph.add_node("fetch_restaurant", fetch_db_restaurant)
-
-graph.add_node("select_place", select_place)
-graph.add_node("search_web", search_web)
-
-graph.add_node("generate_message", generate_message)
-
-# 엣지로 노드 연결
-
-graph.add_edge(START         , "create_query_tourinfo")
-graph.add_edge(START         , "create_query_accommodation")
-graph.add_edge(START         , "create_query_restaurant")
-graph.add_edge("create_query_tourinfo", "fetch_tourinfo")
-graph.add_edge("create_query_accommodation", "fetch_accommodation")
-graph.add_edge("create_query_restaurant", "fetch_restaurant")
-
-graph.add_edge(["fetch_tourinfo", "fetch_accommodation", "fetch_restaurant"], "select_place")
-
-graph.add_edge("select_place", "search_web")
-
-graph.add_edge("search_web", "generate_message")
-
-graph.add_edge("generate_message", END)
-
-# 기록을 위한 메모리 저장소 생성
-memory = MemorySaver()
-
-# 그래프 컴파일
-app = graph.compile(checkpointer=memory)
-
-from IPython.display import Image, display
-
-# 그래프 시각화
-display(Image(app.get_graph().draw_mermaid_png()))
+# LLM 을 부르는 노드의 재시도 정책
+# 모델 출력 파싱 실패(json/ast.literal_eval/pydantic → ValueError, SyntaxError, KeyError)는
+# 다시 호출하면 대부분 해결되므로 네트워크 오류와 함께 재시도합니다. 횟수를 넘기면 예외가 그래프 밖으로 나가고,
+# 그 직전까지의 체크포인트에서 itinerary_runs 가 실패한 노드부터 재개할 수 있습니다.
+NODE_MAX_ATTEMPTS = int(os.getenv("TEAMDB_NODE_MAX_ATTEMPTS", "2"))
+
+def _retry_on(exc: Exception) -> bool:
+    return isinstance(exc, (ValueError, SyntaxError, KeyError)) or default_retry_on(exc)
+
+NODE_RETRY = RetryPolicy(max_attempts=NODE_MAX_ATTEMPTS, retry_on=_retry_on)
+
+def build_graph(mode: Optional[str] = None) -> StateGraph:
+    # Langgraph.graph에서 StateGraph와 END를 가져옵니다.
+    mode = mode or GRAPH_MODE
+    graph = StateGraph(State)
+
+    # 노드 추가
+
+    # llm 모드에서는 SQL 작성도 LLM 호출이므로 재시도 대상
+    query_retry = NODE_RETRY if QUERY_MODE == "llm" else None
+    graph.add_node("create_query_tourinfo", create_query_tourinfo, retry=query_retry)
+    graph.add_node("create_query_accommodation", create_query_accommodation, retry=query_retry)
+    graph.add_node("create_query_restaurant", create_query_restaurant, retry=query_retry)
+    if mode == "planned":
+        graph.add_node("fetch_tourinfo", fetch_rows_tourinfo)
+        graph.add_node("fetch_accommodation", fetch_rows_accommodation)
+        graph.add_node("fetch_restaurant", fetch_rows_restaurant)
+    else:
+        graph.add_node("fetch_tourinfo", fetch_db_tourinfo)
+        graph.add_node("fetch_accommodation", fetch_db_accommodation)
+        graph.add_node("fetch_restaurant", fetch_db_restaurant)
+
+    # 엣지로 노드 연결
+
+    graph.add_edge(START         , "create_query_tourinfo")
+    graph.add_edge(START         , "create_query_accommodation")
+    graph.add_edge(START         , "create_query_restaurant")
+    graph.add_edge("create_query_tourinfo", "fetch_tourinfo")
+    graph.add_edge("create_query_accommodation", "fetch_accommodation")
+    graph.add_edge("create_query_restaurant", "fetch_restaurant")
+
+    fetched = ["fetch_tourinfo", "fetch_accommodation", "fetch_restaurant"]
+
+    # 외부 호출이 긴 노드는 ainvoke/astream 시 이벤트 루프를 막지 않도록 async 구현을 함께 등록
+    if mode in ("single_pass", "planned"):
+        if mode == "single_pass":
+            graph.add_node("plan_itinerary", RunnableLambda(plan_itinerary, afunc=aplan_itinerary),
+                           retry=NODE_RETRY)
+            graph.add_edge(fetched, "plan_itinerary")
+            last = "plan_itinerary"
+        else:
+            graph.add_node("plan_schedule", plan_schedule)
+            graph.add_node("write_itinerary", RunnableLambda(write_itinerary, afunc=awrite_itinerary),
+                           retry=NODE_RETRY)
+            graph.add_edge(fetched, "plan_schedule")
+            graph.add_edge("plan_schedule", "write_itinerary")
+            last = "write_itinerary"
+        if WEB_ENRICHMENT:
+            graph.add_node("enrich_places", RunnableLambda(enrich_places, afunc=aenrich_places))
+            graph.add_edge(last, "enrich_places")
+            graph.add_edge("enrich_places", END)
+        else:
+            graph.add_edge(last, END)
+        return graph
+
+    graph.add_node("select_place", RunnableLambda(select_place, afunc=aselect_place), retry=NODE_RETRY)
+    graph.add_node("search_web", RunnableLambda(search_web, afunc=asearch_web))
+
+    graph.add_node("generate_message", RunnableLambda(generate_message, afunc=agenerate_message),
+                   retry=NODE_RETRY)
+
+    graph.add_edge(fetched, "select_place")
+
+    graph.add_edge("select_place", "search_web")
+
+    graph.add_edge("search_web", "generate_message")
+
+    graph.add_edge("generate_message", END)
+
+    return graph
+
+def get_app():
+    """컴파일된 그래프를 반환합니다. 최초 호출 시 한 번만 컴파일합니다."""
+    global _app
+    if _app is None:
+        with _init_lock:
+            if _app is None:
+                # 세션(thread)별 체크포인트를 LRU/TTL/메모리 상한으로 관리하는 저장소로 그래프 컴파일
+                from .checkpointing import BoundedMemorySaver
+                _app = build_graph().compile(checkpointer=BoundedMemorySaver())
+    return _app
+
+def warm_up() -> None:
+    """
+    서버 기동 직후 첫 요청이 초기화 비용을 떠안지 않도록
+    LLM/Tavily 클라이언트, DB 스키마 조회, 그래프 컴파일을 미리 수행합니다.
+    """
+    _get_structured_llm() if GRAPH_MODE == "single_pass" else _get_llm()
+    # start 뷰의 세션 메타데이터 서비스(클라이언트 + few-shot 프롬프트)도 공유 인스턴스로 미리 생성
+    from .llm_registry import get_service
+    from .llm_service import ss_LLMService
+    get_service(ss_LLMService)
+    _get_execute_query()
+    _get_search_tool()
+    get_app()
 
 from langchain_core.runnables import RunnableConfig
-
-config = RunnableConfig(recursion_limit=30,
-                        configurable={"thread_id": "1"})
+import uuid
+
+def make_config(session_id=None, metrics=None, checkpoint_id=None) -> RunnableConfig:
+    # 채팅 세션마다 thread_id 를 고정해 같은 세션의 다음 턴이 이전 상태를 이어받도록 함
+    # 세션 없이 호출(스크립트/테스트)하면 매번 새 thread 를 사용
+    # checkpoint_id 를 주면 그 체크포인트에서 이어서 실행 (실패한 run 재개)
+    from .checkpointing import session_thread_id
+    thread_id = session_thread_id(session_id) if session_id is not None else uuid.uuid4().hex
+    configurable = {"thread_id": thread_id}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    callbacks = []
+    if metrics is not None:
+        # 노드별 시간/토큰은 콜백으로, 캐시 히트는 노드 안에서 configurable["metrics"] 로 기록
+        metrics.extra.update(graph_mode=GRAPH_MODE, query_mode=QUERY_MODE, candidate_encoding=CANDIDATE_ENCODING)
+        configurable["metrics"] = metrics
+        callbacks.append(metrics.handler)
+    return RunnableConfig(recursion_limit=30, configurable=configurable, callbacks=callbacks)
 
 
 # {
@@ -436,53 +817,153 @@ config = RunnableConfig(recursion_limit=30,
 #   }
 # }
 
-def get_result(session_parameters: dict) -> str:
-    global city, district, theme, category_two, startDate, endDate, companions, groupSize, group_size, meal, meal_schedule, schedule
-    city = session_parameters.get("city")
+THEME_TO_CATEGORY_TWO = {
+    '종합 예술,문화 공간 체험':      '문화시설',
+    '역사 이야기 길 따라가기':         '역사관광지',
+    '도심 속 안식처 속 힐링':           '휴양관광지',
+    'K-컬처 메이킹 체험':    '체험관광지',
+    '도시 속 힐링 숲, 산 둘레길': '자연관광지',
+    '미디어 예술 축제,페스티벌':      '공연/행사',
+    '맛의 향연 투어(맛집 투어)':   '맛코스',
+    }
+
+def build_initial_state(session_parameters: dict) -> dict:
+    """
+    session_parameters 를 그래프 입력 State 로 변환합니다.
+    여행 파라미터는 모듈 전역이 아닌 State 에 담아 요청마다 독립적으로 전달됩니다.
+    """
     district = session_parameters.get("district")
     if not district:
         raise ValueError("'district' 파라미터가 필요합니다.")
     theme = session_parameters.get("theme")
-    theme_to_category_two = {
-        '종합 예술,문화 공간 체험':      '문화시설',
-        '역사 이야기 길 따라가기':         '역사관광지',
-        '도심 속 안식처 속 힐링':           '휴양관광지',
-        'K-컬처 메이킹 체험':    '체험관광지',
-        '도시 속 힐링 숲, 산 둘레길': '자연관광지',
-        '미디어 예술 축제,페스티벌':      '공연/행사',
-        '맛의 향연 투어(맛집 투어)':   '맛코스',
-        }
-    category_two = theme_to_category_two[theme]
-    startDate = session_parameters.get("startDate")
-    endDate = session_parameters.get("endDate")
-    companions = session_parameters.get("companions")
-    groupSize = session_parameters.get("groupSize")
-    group_size = groupSize
-    meal = session_parameters.get("mealSchedule")
-    
-    meal_schedule = {
-        'breakfast': 'True' if '아침' in meal else 'False',
-        'lunch':     'True' if '점심' in meal else 'False',
-        'dinner':    'True' if '저녁' in meal else 'False',
-        }
-    
-    schedule = {"startDate": startDate,
-                "endDate": endDate}
-    
+    meal = session_parameters.get("mealSchedule") or []
+
+    return {
+        "question":      district,
+        "city":          session_parameters.get("city"),
+        "district":      district,
+        "category_two":  THEME_TO_CATEGORY_TWO[theme],
+        "companions":    session_parameters.get("companions"),
+        "group_size":    session_parameters.get("groupSize"),
+        "meal_schedule": {
+            'breakfast': 'True' if '아침' in meal else 'False',
+            'lunch':     'True' if '점심' in meal else 'False',
+            'dinner':    'True' if '저녁' in meal else 'False',
+            },
+        "schedule":      {"startDate": session_parameters.get("startDate"),
+                          "endDate":   session_parameters.get("endDate")},
+    }
+
+def _parse_answer(response: dict) -> tuple:
+    results = response['answer'].replace("```json","").replace("```","")
+    js_result = json.loads(results)
+    js_result_answer = js_result['answer']
+    js_result_places = js_result['places']
+    return js_result_answer, js_result_places
+
+def _graph_input(session_parameters: dict, resume_from):
+    # 재개할 때는 입력 없이(None) 실행해야 체크포인트의 상태와 남은 노드(next)를 그대로 이어감
+    return None if resume_from else build_initial_state(session_parameters)
+
+def get_result(session_parameters: dict, session_id=None, metrics=None, resume_from=None) -> tuple:
     """
     Args:
         session_parameters (dict): {"city": "...", "district": "...", ...}
+        session_id: ChatSession.id (체크포인트 thread_id 로 사용)
+        metrics: graph_metrics.GraphMetrics (주면 노드별 시간/토큰/캐시 히트를 기록)
+        resume_from: 실패 직전 checkpoint_id (failed_checkpoint). 주면 처음부터가 아니라 실패한 노드부터 실행
 
     Returns:
-        str: LLM이 생성한 answer 문자열
+        tuple: (LLM이 생성한 answer 문자열, places 리스트)
     """
-
     # LangGraph 실행
-    response = app.invoke({"question": district}, config=config)
-    results = response['answer'].replace("```json","").replace("```","")
-    js_result = json.loads(results)
-    js_result_answer = js_result['answer']
-    print("answer res: " , js_result_answer )
-    js_result_places = js_result['places']
-    print("place res: " , js_result_places )
-    return js_result_answer, js_result_places
\ No newline at end of file
+    response = get_app().invoke(_graph_input(session_parameters, resume_from),
+                                config=make_config(session_id, metrics, resume_from))
+    return _parse_answer(response)
+
+async def aget_result(session_parameters: dict, session_id=None, metrics=None, resume_from=None) -> tuple:
+    """get_result 의 비동기 버전 (ASGI 뷰에서 사용, 워커 스레드를 점유하지 않음)"""
+    response = await get_app().ainvoke(_graph_input(session_parameters, resume_from),
+                                       config=make_config(session_id, metrics, resume_from))
+    return _parse_answer(response)
+
+def failed_checkpoint(session_id) -> tuple:
+    """
+    실행이 예외로 끝난 뒤 호출. 세션 thread 의 마지막 체크포인트 → (checkpoint_id, 남은 노드 목록)
+    남은 노드가 없으면(그래프가 끝까지 갔거나 체크포인트가 없으면) (None, ())
+    """
+    snapshot = get_app().get_state(make_config(session_id))
+    if not snapshot.next:
+        return None, ()
+    return snapshot.config["configurable"]["checkpoint_id"], tuple(snapshot.next)
+
+def has_checkpoint(session_id, checkpoint_id) -> bool:
+    """재개 지점이 아직 체크포인터에 남아 있는지 (메모리 체크포인터는 LRU/TTL 로 밀려날 수 있음)"""
+    return bool(get_app().get_state(make_config(session_id, checkpoint_id=checkpoint_id)).next)
+
+# 스트리밍 시 진행 상황으로 알려줄 노드 → 단계 이름
+PROGRESS_STAGES = {
+    "fetch_tourinfo":      "candidates_fetched",
+    "fetch_accommodation": "candidates_fetched",
+    "fetch_restaurant":    "candidates_fetched",
+    "select_place":        "places_selected",
+    "plan_schedule":       "places_selected",
+    "search_web":          "web_search_done",
+    "enrich_places":       "web_search_done",
+}
+
+# answer JSON 을 토큰 단위로 만들어 내는 노드 (two_pass / single_pass)
+ANSWER_NODES = ("generate_message", "plan_itinerary")
+# answer 마크다운을 JSON 없이 그대로 만들어 내는 노드 (planned)
+PROSE_NODES = ("write_itinerary",)
+
+async def astream_result(session_parameters: dict, session_id=None, metrics=None, resume_from=None):
+    """
+    그래프를 astream_events 로 실행하면서 (event, data) 를 순서대로 내보냅니다.
+
+    - ("progress", {"node": ..., "stage": ...}): 주요 노드 완료
+    - ("token",    {"text": ...}):               generate_message/plan_itinerary/write_itinerary 의 answer 마크다운 조각
+    - ("reset",    {"node": ...}):               answer 노드가 재시도됨 → 지금까지 받은 token 을 버려야 함
+    - ("result",   {"answer": ..., "places": [...]}): 최종 결과 (마지막 한 번)
+    """
+    from .streaming import JSONFieldTokenStream, PlainTextTokenStream
+
+    answer_stream = None
+    started_nodes = set()
+    finished_nodes = set()
+    final_state = None
+
+    async for event in get_app().astream_events(_graph_input(session_parameters, resume_from),
+                                                config=make_config(session_id, metrics, resume_from),
+                                                version="v2"):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chain_start" and event["name"] == node and (node in ANSWER_NODES or node in PROSE_NODES):
+            if node in started_nodes and answer_stream is not None and answer_stream.emitted:
+                answer_stream = None
+                yield "reset", {"node": node}
+            started_nodes.add(node)
+            continue
+
+        # answer 체인 끝의 StrOutputParser 가 흘려보내는 문자열 조각 (LLM 종류와 무관)
+        if kind == "on_parser_stream" and (node in ANSWER_NODES or node in PROSE_NODES):
+            if answer_stream is None:
+                answer_stream = PlainTextTokenStream() if node in PROSE_NODES else JSONFieldTokenStream("answer")
+            piece = answer_stream.feed(event["data"]["chunk"])
+            if piece:
+                yield "token", {"text": piece}
+
+        elif kind == "on_chain_end":
+            if not event.get("parent_ids"):
+                final_state = event["data"]["output"]       # 루트(그래프 전체) 종료
+            elif event["name"] == node and node in PROGRESS_STAGES and node not in finished_nodes:
+                finished_nodes.add(node)
+                yield "progress", {"node": node, "stage": PROGRESS_STAGES[node]}
+
+    answer, places = _parse_answer(final_state)
+    # 모델이 토큰 스트리밍을 지원하지 않았거나 일부만 흘려보낸 경우 나머지를 한 번에 전송
+    emitted = answer_stream.emitted if answer_stream is not None else ""
+    if answer.startswith(emitted) and len(answer) > len(emitted):
+        yield "token", {"text": answer[len(emitted):]}
+    yield "result", {"answer": answer, "places": places}
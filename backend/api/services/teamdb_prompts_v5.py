@@ -763,12 +763,15 @@ answer_prompt = PromptTemplate.from_template(
 **식당 + 관광지 + 숙소 (웹 검색 결과):**  
 {{ web_results }}
 
+**이동 시간 (좌표로 계산한 값):**  
+{{ travel_times }}
+
 **출력 조건:**
 - 위 데이터에서 첫 번째 항목들을 우선 선택
 - 평점이나 리뷰 수가 높은 이유를 명시
 - 실제 좌표(map_x, map_y)와 주소 포함
 - DB에서 가져온 정보를 우선시 사용하되, 부족한 정보는 웹 검색 결과로 보강
-- 이동시간은 대략적으로 계산
+- [이동 시간]은 위 '이동 시간' 표의 값을 그대로 쓰고, 표에 없는 구간은 '이동' 줄을 생략
 
 **여행 일정**
 - start_date={{ startDate }}
@@ -814,35 +817,35 @@ answer_prompt = PromptTemplate.from_template(
 - **종류**: [category_one] > [category_two]  
 - **추천 이유**: {{ category_two }} 테마에 적합  
 - **주소**: [address]  
-- **이동**: {% if breakfast == 'True' %}아침식사 장소에서{% else %}출발지에서{% endif %} 약 15분
+- **이동**: {% if breakfast == 'True' %}아침식사 장소에서{% else %}출발지에서{% endif %} [이동 시간]
 
 {% if lunch == 'True' %}
 #### 🍽️ 점심식사: [두 번째 식당명]
 - **종류**: [category]  
 - **추천 이유**: 평점 [rating]점, 블로그 리뷰 [blog_review_count]개  
 - **주소**: [address]  
-- **이동**: 관광지 1에서 약 10분
+- **이동**: 관광지 1에서 [이동 시간]
 
 {% endif %}
 #### 🏛️ 관광지 2: [두 번째 관광지명]
 - **종류**: [category_one] > [category_two]  
 - **추천 이유**: {{ category_two }} 관련  
 - **주소**: [address]  
-- **이동**: {% if lunch == 'True' %}점심식사 장소에서{% else %}관광지 1에서{% endif %} 약 12분
+- **이동**: {% if lunch == 'True' %}점심식사 장소에서{% else %}관광지 1에서{% endif %} [이동 시간]
 
 {% if dinner == 'True' %}
 #### 🍽️ 저녁식사: [세 번째 식당명]
 - **종류**: [category]  
 - **추천 이유**: 평점 [rating]점, 인기 맛집  
 - **주소**: [address]  
-- **이동**: 관광지 2에서 약 20분
+- **이동**: 관광지 2에서 [이동 시간]
 
 {% endif %}
 #### 🏨 숙소: [첫 번째 숙소명]
 - **등급**: [grade]  
 - **추천 이유**: 평점 [rating]점, 리뷰 [visitor_review_count]개  
 - **주소**: [address]  
-- **이동**: {% if dinner == 'True' %}저녁식사 장소에서{% else %}관광지 2에서{% endif %} 약 15분  
+- **이동**: {% if dinner == 'True' %}저녁식사 장소에서{% else %}관광지 2에서{% endif %} [이동 시간]  
 - **예약사이트**: [reservation_site]
 
 ### Day 2
@@ -851,42 +854,42 @@ answer_prompt = PromptTemplate.from_template(
 - **종류**: [category]  
 - **추천 이유**: 평점 [rating]점, 방문자 리뷰 [visitor_review_count]개  
 - **주소**: [address]  
-- **이동**: 전 날 숙소에서 약 1분
+- **이동**: 전 날 숙소에서 [이동 시간]
 
 {% endif %}
 #### 🏛️ 관광지 1: [첫 번째 관광지명]
 - **종류**: [category_one] > [category_two]  
 - **추천 이유**: {{ category_two }} 테마에 적합  
 - **주소**: [address]  
-- **이동**: {% if breakfast == 'True' %}아침식사 장소에서{% else %}출발지에서{% endif %} 약 15분
+- **이동**: {% if breakfast == 'True' %}아침식사 장소에서{% else %}출발지에서{% endif %} [이동 시간]
 
 {% if lunch == 'True' %}
 #### 🍽️ 점심식사: [두 번째 식당명]
 - **종류**: [category]  
 - **추천 이유**: 평점 [rating]점, 블로그 리뷰 [blog_review_count]개  
 - **주소**: [address]  
-- **이동**: 관광지 1에서 약 10분
+- **이동**: 관광지 1에서 [이동 시간]
 
 {% endif %}
 #### 🏛️ 관광지 2: [두 번째 관광지명]
 - **종류**: [category_one] > [category_two]  
 - **추천 이유**: {{ category_two }} 관련  
 - **주소**: [address]  
-- **이동**: {% if lunch == 'True' %}점심식사 장소에서{% else %}관광지 1에서{% endif %} 약 12분
+- **이동**: {% if lunch == 'True' %}점심식사 장소에서{% else %}관광지 1에서{% endif %} [이동 시간]
 
 {% if dinner == 'True' %}
 #### 🍽️ 저녁식사: [세 번째 식당명]
 - **종류**: [category]  
 - **추천 이유**: 평점 [rating]점, 인기 맛집  
 - **주소**: [address]  
-- **이동**: 관광지 2에서 약 20분
+- **이동**: 관광지 2에서 [이동 시간]
 
 {% endif %}
 #### 🏨 숙소: [첫 번째 숙소명]
 - **등급**: [grade]  
 - **추천 이유**: 평점 [rating]점, 리뷰 [visitor_review_count]개  
 - **주소**: [address]  
-- **이동**: {% if dinner == 'True' %}저녁식사 장소에서{% else %}관광지 2에서{% endif %} 약 15분  
+- **이동**: {% if dinner == 'True' %}저녁식사 장소에서{% else %}관광지 2에서{% endif %} [이동 시간]  
 - **예약사이트**: [reservation_site]
 
 ### Day N
@@ -908,4 +911,38 @@ answer_prompt = PromptTemplate.from_template(
 
 """,
 template_format="jinja2"
-)
\ No newline at end of file
+)
+
+
+# planned 모드: itinerary_planner 가 정한 일정에 설명 문장만 붙임
+# (장소 선택/식사 조건/중복 검사는 코드에서 끝났으므로 모델은 고정된 틀을 그대로 옮겨 적기만 함)
+itinerary_prose_prompt = PromptTemplate.from_template(
+    """
+{project_context}
+
+{city} {district}에서 {category_two} 테마로 {companions}({group_size}명)과(와) 함께하는 {startDate}부터 {endDate}까지의 여행 일정입니다.
+장소와 순서는 아래 틀로 이미 정해져 있습니다.
+
+{plan}
+
+**작성 규칙:**
+- 위 틀의 제목, 장소명, 종류, 평점, 주소, 이동, 예약사이트 줄은 글자 하나도 바꾸지 말고 그대로 옮기세요.
+- 장소를 추가하거나 빼거나 순서를 바꾸지 마세요.
+- 각 "- **추천 이유**: " 뒤에 {category_two} 테마와 {companions} 동행에 맞는 이유를 한 문장으로 채우세요. 평점/리뷰 수가 있으면 근거로 쓰세요.
+- 모르는 내용(영업시간, 가격 등)은 지어내지 마세요.
+- 백틱(```)이나 코드 블록 없이 순수 Markdown 만 출력하세요.
+
+아래 형식으로만 출력하세요.
+
+# OnGill
+
+## 1. 즐거운 여행을 위한 OnGill의 Summary
+(여행 전체 추천 이유와 테마를 한두 문장으로)
+
+---
+
+## 2. 일정 세부 정보
+
+(위 틀을 추천 이유를 채워 그대로)
+"""
+)
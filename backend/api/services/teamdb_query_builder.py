@@ -0,0 +1,108 @@
+# api/services/teamdb_query_builder.py
+"""
+teamdb_prompts_v5 의 tourinfo/restaurant/accommodation_query_prompt 에 적혀 있는
+후보 조회 SQL을 LLM 호출 없이 session_parameters 로부터 직접 만들어 줍니다.
+
+- 사용자 입력(district, category_two)은 문자열 리터럴로 이스케이프해서 넣습니다.
+- dialect 별로 다른 부분(LEAST 함수, 백슬래시 이스케이프)만 분기합니다.
+"""
+
+# 관광지 후보 필터 (tourinfo_query_prompt 와 동일)
+TOURINFO_CONTENT_TYPES = ('음식점', '문화시설', '쇼핑', '숙박', '축제공연행사', '여행코스', '관광지', '레포츠')
+TOURINFO_CATEGORY_ONE  = ('음식', '인문(문화/예술/역사)', '쇼핑', '숙박', '추천코스', '레포츠', '자연')
+
+# 프롬프트에 명시된 기본 LIMIT 값
+TOURINFO_TOP_K      = 20
+RESTAURANT_TOP_K    = 20
+ACCOMMODATION_TOP_K = 5
+
+# 식당/숙소 정렬에 쓰는 랭킹 공식 (restaurant_query_prompt 의 ORDER BY 와 동일)
+RANKING_WEIGHTS = {
+    'rating':               0.4,   # 별점 가중치
+    'visitor_review_count': 0.3,   # 방문자 리뷰 가중치 (100개에서 포화)
+    'blog_review_count':    0.3,   # 블로그 리뷰 가중치 (50개에서 포화)
+}
+VISITOR_REVIEW_CAP = 100
+BLOG_REVIEW_CAP    = 50
+
+LIKE_ESCAPE_CHAR = '!'             # MySQL/SQLite 모두에서 같은 의미를 갖는 LIKE 이스케이프 문자
+
+
+def _least(dialect: str) -> str:
+    """두 값 중 작은 값을 돌려주는 SQL 함수 이름 (SQLite 에는 LEAST 가 없음)"""
+    return 'MIN' if dialect == 'sqlite' else 'LEAST'
+
+
+def quote_literal(value, dialect: str = 'mysql') -> str:
+    """
+    값을 SQL 문자열 리터럴로 감쌉니다.
+    MySQL 은 백슬래시가 이스케이프 문자이므로 함께 이중화합니다.
+    """
+    text = str(value)
+    if dialect == 'mysql':
+        text = text.replace('\\', '\\\\')
+    return "'" + text.replace("'", "''") + "'"
+
+
+def like_contains(column: str, value, dialect: str = 'mysql') -> str:
+    """`column` 이 value 를 포함하는지 검사하는 LIKE 조건식을 만듭니다."""
+    escaped = (
+        str(value)
+        .replace(LIKE_ESCAPE_CHAR, LIKE_ESCAPE_CHAR * 2)
+        .replace('%', LIKE_ESCAPE_CHAR + '%')
+        .replace('_', LIKE_ESCAPE_CHAR + '_')
+    )
+    pattern = quote_literal(f'%{escaped}%', dialect)
+    return f"{column} LIKE {pattern} ESCAPE '{LIKE_ESCAPE_CHAR}'"
+
+
+def _in_list(values, dialect: str) -> str:
+    return '(' + ', '.join(quote_literal(v, dialect) for v in values) + ')'
+
+
+def ranking_expression(dialect: str = 'mysql') -> str:
+    """식당/숙소 후보 정렬 점수 SQL 식"""
+    least = _least(dialect)
+    return (
+        f"(rating * {RANKING_WEIGHTS['rating']}"
+        f" + {least}(visitor_review_count/{VISITOR_REVIEW_CAP}.0, 1) * {RANKING_WEIGHTS['visitor_review_count']}"
+        f" + {least}(blog_review_count/{BLOG_REVIEW_CAP}.0, 1) * {RANKING_WEIGHTS['blog_review_count']})"
+    )
+
+
+def build_tourinfo_query(district: str, category_two: str,
+                         top_k: int = TOURINFO_TOP_K, dialect: str = 'mysql') -> str:
+    """api_tourinfo 후보 조회 SQL (tourinfo_query_prompt 참고)"""
+    return (
+        "SELECT *\n"
+        "  FROM api_tourinfo\n"
+        f" WHERE {like_contains('address', district, dialect)}\n"
+        f"   AND content_type_id IN {_in_list(TOURINFO_CONTENT_TYPES, dialect)}\n"
+        f"   AND category_one IN {_in_list(TOURINFO_CATEGORY_ONE, dialect)}\n"
+        f"   AND category_two = {quote_literal(category_two, dialect)}\n"
+        f" LIMIT {int(top_k)};"
+    )
+
+
+def _build_ranked_query(table: str, district: str, top_k: int, dialect: str) -> str:
+    return (
+        "SELECT *\n"
+        f"  FROM {table}\n"
+        f" WHERE {like_contains('address', district, dialect)}\n"
+        "   AND rating > 0\n"
+        "   AND visitor_review_count > 0\n"
+        f" ORDER BY {ranking_expression(dialect)} DESC\n"
+        f" LIMIT {int(top_k)};"
+    )
+
+
+def build_restaurant_query(district: str, top_k: int = RESTAURANT_TOP_K,
+                           dialect: str = 'mysql') -> str:
+    """api_restaurant 후보 조회 SQL (restaurant_query_prompt 참고)"""
+    return _build_ranked_query('api_restaurant', district, top_k, dialect)
+
+
+def build_accommodation_query(district: str, top_k: int = ACCOMMODATION_TOP_K,
+                              dialect: str = 'mysql') -> str:
+    """api_accommodation 후보 조회 SQL (accommodation_query_prompt 참고)"""
+    return _build_ranked_query('api_accommodation', district, top_k, dialect)
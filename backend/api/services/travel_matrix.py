@@ -0,0 +1,146 @@
+# api/services/travel_matrix.py
+"""
+후보 장소 간 거리/예상 이동 시간 행렬
+
+answer_prompt 의 "약 15분" 같은 이동 시간은 모델이 알 수 없는 값이었습니다.
+여기서는 요청의 후보 전체(식당/관광지/숙소)에 대해 map_x(경도)/map_y(위도)로
+- haversine 대원 거리(km) n×n 행렬을 NumPy 로 한 번에 계산하고
+- 이동 수단별 속도 프로필(SPEED_PROFILES)로 예상 분(minutes) 행렬을 만듭니다.
+
+후보 수백 개도 수 ms 안에 끝나며, 같은 (구, 테마, 후보 집합)이면 프로세스 안에서 재사용합니다.
+itinerary_planner 는 동선 결정에, 프롬프트는 '이동' 줄의 숫자로 이 값을 씁니다.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# 이동 수단별 (평균 속도 km/h, 직선 대비 실제 경로 배율, 고정 소요 분 - 대기/환승/주차)
+SPEED_PROFILES = {
+    "walk":    {"label": "도보",     "kmh": 4.5, "detour": 1.3, "overhead": 0},
+    "transit": {"label": "대중교통", "kmh": 18,  "detour": 1.4, "overhead": 8},
+    "car":     {"label": "차량",     "kmh": 22,  "detour": 1.3, "overhead": 5},
+}
+WALK_MAX_KM = 1.2                  # 이보다 가까우면 도보, 멀면 대중교통으로 안내
+
+MAX_CACHED_MATRICES = 64
+
+NAME_COLUMNS = ("title", "store_name")
+
+
+def _name(row: dict) -> str:
+    for column in NAME_COLUMNS:
+        if row.get(column):
+            return str(row[column])
+    return ""
+
+
+def row_key(row: dict) -> tuple:
+    """행 → (이름, map_x, map_y). 같은 장소는 상태 직렬화/복사 후에도 같은 키"""
+    return (_name(row), row.get("map_x"), row.get("map_y"))
+
+
+def _coordinate(value) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if value else np.nan          # 0 은 좌표 없음으로 취급
+
+
+def haversine_matrix(lon, lat) -> np.ndarray:
+    """경도/위도 배열(도) → n×n 대원 거리(km). 좌표가 없는 점과의 거리는 NaN"""
+    lon = np.radians(np.asarray(lon, dtype=float))
+    lat = np.radians(np.asarray(lat, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def travel_minutes(distance_km: np.ndarray, mode: str) -> np.ndarray:
+    profile = SPEED_PROFILES[mode]
+    minutes = profile["overhead"] + distance_km * profile["detour"] / profile["kmh"] * 60
+    return np.where(distance_km > 0, minutes, 0.0)
+
+
+class TravelMatrix:
+    """후보 행 목록에 대한 거리(km)/이동 시간(분) 행렬"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.index = {}
+        for i, row in enumerate(self.rows):
+            self.index.setdefault(row_key(row), i)
+        lon = [_coordinate(row.get("map_x")) for row in self.rows]
+        lat = [_coordinate(row.get("map_y")) for row in self.rows]
+        self.distance_km = haversine_matrix(lon, lat)
+        self.minutes = {mode: travel_minutes(self.distance_km, mode) for mode in SPEED_PROFILES}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _pair(self, row_a, row_b):
+        i, j = self.index.get(row_key(row_a)), self.index.get(row_key(row_b))
+        if i is None or j is None or np.isnan(self.distance_km[i, j]):
+            return None
+        return i, j
+
+    def distance(self, row_a, row_b):
+        """두 행 사이 거리(km). 행렬에 없거나 좌표가 없으면 None (itinerary_planner 의 distance 인자)"""
+        pair = self._pair(row_a, row_b)
+        return float(self.distance_km[pair]) if pair else None
+
+    def leg(self, row_a, row_b):
+        """{"km", "mode", "label", "minutes"} - 가까우면 도보, 멀면 대중교통. 모르면 None"""
+        pair = self._pair(row_a, row_b)
+        if pair is None:
+            return None
+        km = float(self.distance_km[pair])
+        mode = "walk" if km <= WALK_MAX_KM else "transit"
+        return {"km": round(km, 1), "mode": mode, "label": SPEED_PROFILES[mode]["label"],
+                "minutes": max(1, int(round(float(self.minutes[mode][pair]))))}
+
+
+def describe_leg(leg: dict) -> str:
+    return f"{leg['label']} 약 {leg['minutes']}분 ({leg['km']}km)"
+
+
+def _flatten(candidates: dict) -> list:
+    rows = []
+    for kind in sorted(candidates):
+        rows.extend(candidates[kind] or [])
+    return rows
+
+
+_lock = threading.Lock()
+_matrices = OrderedDict()           # (구, 테마, 후보 집합 digest) → TravelMatrix
+
+
+def matrix_for(district, category_two, candidates: dict) -> TravelMatrix:
+    """
+    candidates({"restaurant": [...], "tourinfo": [...], ...}) 의 행렬.
+    같은 (구, 테마, 후보 집합)이면 이전에 계산한 행렬을 돌려줍니다. (카탈로그가 바뀌면 digest 가 달라짐)
+    """
+    rows = _flatten(candidates)
+    digest = hashlib.sha256(repr([row_key(row) for row in rows]).encode("utf-8")).hexdigest()[:16]
+    key = (district, category_two or "", digest)
+    with _lock:
+        matrix = _matrices.get(key)
+        if matrix is not None:
+            _matrices.move_to_end(key)
+            return matrix
+    matrix = TravelMatrix(rows)
+    with _lock:
+        _matrices[key] = matrix
+        while len(_matrices) > MAX_CACHED_MATRICES:
+            _matrices.popitem(last=False)
+    return matrix
+
+
+def clear():
+    with _lock:
+        _matrices.clear()
@@ -0,0 +1,245 @@
+# api/services/web_search.py
+"""
+search_web 노드용 웹 검색 도우미
+
+선택된 장소마다 Tavily 를 순서대로 부르면 장소 수만큼 왕복 시간이 더해지므로,
+- 같은 검색어는 한 번만 조회하고 (중복 제거)
+- 캐시(WEB_SEARCH_CACHE_ALIAS, TTL)에 있는 검색어는 네트워크를 타지 않으며
+- 나머지는 WEB_SEARCH_MAX_WORKERS 개까지 동시에 조회하고
+- WEB_SEARCH_DEADLINE 초 안에 끝나지 않은 검색어는 결과 없이 넘어갑니다.
+
+마감은 기다리기만 멈출 뿐 실행 중인 호출을 끊지 못하므로, 응답 없는 호출이 공유 풀의 스레드를
+계속 잡고 있지 않도록 HTTP 요청 자체에 WEB_SEARCH_REQUEST_TIMEOUT 을 겁니다. (TavilySearchClient)
+마감 후에도 아직 실행 중인 검색 수는 abandoned_in_flight() 로 보고, 경고 로그에 함께 남깁니다.
+
+검색 클라이언트는 {"query": ...} 를 받는 invoke(/ainvoke) 만 있으면 되므로
+테스트에서는 teamdb_langgraph_v5.set_search_tool() 로 로컬 스텁을 넣어 사용합니다.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from .graph_metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DEADLINE    = 8.0                # 초
+DEFAULT_CACHE_TTL   = 60 * 60 * 24       # 1일
+DEFAULT_REQUEST_TIMEOUT = 6.0            # 초, 검색 한 건의 HTTP 요청
+TAVILY_SEARCH_URL   = "https://api.tavily.com/search"
+
+_executor = None
+_executor_lock = threading.Lock()
+_abandoned = 0                           # 마감을 넘겨 결과를 버렸지만 아직 실행 중인 검색 수
+_abandoned_lock = threading.Lock()
+
+
+class TavilySearchClient:
+    """
+    Tavily 검색 API 클라이언트. invoke/ainvoke 는 langchain_tavily.TavilySearch 와 같이 {"query": ...} → 응답 dict
+    TavilySearch 는 HTTP 요청에 타임아웃을 줄 수 없어서 직접 호출합니다.
+    """
+
+    def __init__(self, api_key, max_results=3, topic="general", timeout=None, url=TAVILY_SEARCH_URL):
+        self.api_key = api_key
+        self.max_results = max_results
+        self.topic = topic
+        self.timeout = timeout if timeout is not None else _setting("WEB_SEARCH_REQUEST_TIMEOUT",
+                                                                    DEFAULT_REQUEST_TIMEOUT)
+        self.url = url
+
+    def invoke(self, payload, config=None):
+        import requests
+        response = requests.post(
+            self.url,
+            json={"query": payload["query"], "max_results": self.max_results, "topic": self.topic},
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def ainvoke(self, payload, config=None):
+        return await asyncio.to_thread(self.invoke, payload, config)
+
+
+def abandoned_in_flight() -> int:
+    """마감 후에도 아직 끝나지 않은 검색 수 (요청 타임아웃이 지나면 줄어듦)"""
+    return _abandoned
+
+
+def _abandon(future):
+    """마감을 넘긴 검색의 결과를 버림. 이미 실행 중이면 끝날 때까지 abandoned_in_flight() 에 잡힘"""
+    global _abandoned
+    if future.cancel():                  # 아직 시작 전이면 취소
+        return
+    with _abandoned_lock:
+        _abandoned += 1
+
+    def release(_):
+        global _abandoned
+        with _abandoned_lock:
+            _abandoned -= 1
+
+    future.add_done_callback(release)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _executor_pool() -> ThreadPoolExecutor:
+    # 요청마다 풀을 만들지 않고 프로세스 전체에서 하나를 공유 (동시 검색 수 상한 역할)
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_setting("WEB_SEARCH_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+                    thread_name_prefix="web-search",
+                )
+    return _executor
+
+
+def _cache():
+    alias = _setting("WEB_SEARCH_CACHE_ALIAS", None)
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(str(query).split())
+
+
+def cache_key(query: str) -> str:
+    digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:32]
+    return f"websearch:{digest}"
+
+
+def unique_queries(queries) -> list:
+    """빈 검색어를 빼고 순서를 유지한 채 중복 제거"""
+    seen, result = set(), []
+    for query in queries:
+        query = normalize_query(query or "")
+        if query and query not in seen:
+            seen.add(query)
+            result.append(query)
+    return result
+
+
+def _cached(cache, queries) -> dict:
+    if cache is None or not queries:
+        return {}
+    try:
+        found = cache.get_many([cache_key(q) for q in queries])
+    except Exception:
+        logger.exception("web search cache read failed")
+        return {}
+    return {q: found[cache_key(q)] for q in queries if cache_key(q) in found}
+
+
+def _store(cache, results: dict):
+    if cache is None or not results:
+        return
+    try:
+        cache.set_many({cache_key(q): r for q, r in results.items()},
+                       timeout=_setting("WEB_SEARCH_CACHE_TTL", DEFAULT_CACHE_TTL))
+    except Exception:
+        logger.exception("web search cache write failed")
+
+
+def search_many(tool, queries, deadline=None) -> dict:
+    """
+    검색어 목록 → {검색어: 검색 결과}.
+    실패하거나 deadline 을 넘긴 검색어는 결과에서 빠집니다.
+    """
+    deadline = _setting("WEB_SEARCH_DEADLINE", DEFAULT_DEADLINE) if deadline is None else deadline
+    queries = unique_queries(queries)
+    cache = _cache()
+    results = _cached(cache, queries)
+    pending = [q for q in queries if q not in results]
+    record_cache("web_search", "hit", len(results))
+    record_cache("web_search", "miss", len(pending))
+    if not pending:
+        return results
+
+    started = time.monotonic()
+    futures = {_executor_pool().submit(tool.invoke, {"query": q}): q for q in pending}
+    done, not_done = wait(futures, timeout=deadline)
+    fetched = {}
+    for future in done:
+        query = futures[future]
+        try:
+            fetched[query] = future.result()
+        except Exception:
+            logger.warning("web search failed: %s", query, exc_info=True)
+            record_cache("web_search", "error")
+    for future in not_done:
+        _abandon(future)
+        logger.warning("web search timed out after %.1fs: %s (still running: %d)",
+                       deadline, futures[future], abandoned_in_flight())
+        record_cache("web_search", "timeout")
+    logger.debug("web search: %d cached, %d fetched in %.2fs",
+                 len(results), len(fetched), time.monotonic() - started)
+    _store(cache, fetched)
+    return {**results, **fetched}
+
+
+async def asearch_many(tool, queries, deadline=None) -> dict:
+    """search_many 의 비동기 버전 (tool.ainvoke 사용, 동시 실행 수는 WEB_SEARCH_MAX_WORKERS)"""
+    from asgiref.sync import sync_to_async
+
+    deadline = _setting("WEB_SEARCH_DEADLINE", DEFAULT_DEADLINE) if deadline is None else deadline
+    queries = unique_queries(queries)
+    cache = _cache()
+    results = await sync_to_async(_cached)(cache, queries)
+    pending = [q for q in queries if q not in results]
+    record_cache("web_search", "hit", len(results))
+    record_cache("web_search", "miss", len(pending))
+    if not pending:
+        return results
+
+    semaphore = asyncio.Semaphore(_setting("WEB_SEARCH_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+
+    async def one(query):
+        async with semaphore:
+            return await tool.ainvoke({"query": query})
+
+    tasks = {asyncio.ensure_future(one(q)): q for q in pending}
+    done, not_done = await asyncio.wait(tasks, timeout=deadline)
+    fetched = {}
+    for task in done:
+        query = tasks[task]
+        try:
+            fetched[query] = task.result()
+        except Exception:
+            logger.warning("web search failed: %s", query, exc_info=True)
+            record_cache("web_search", "error")
+    for task in not_done:
+        task.cancel()                    # ainvoke 가 to_thread 면 스레드는 요청 타임아웃까지 남음
+        logger.warning("web search timed out after %.1fs: %s", deadline, tasks[task])
+        record_cache("web_search", "timeout")
+    await sync_to_async(_store)(cache, fetched)
+    return {**results, **fetched}
+
+
+def format_results(place_queries, results: dict) -> str:
+    """(장소, 검색어) 순서대로 '장소 웹 검색 결과: ...' 블록을 이어 붙임"""
+    all_text = ""
+    for place, query in place_queries:
+        result = results.get(normalize_query(query))
+        if not result:
+            continue
+        all_text += f"{place} 웹 검색 결과: "
+        for item in result.get("results", []):
+            all_text += "\n" + item.get("content", "")
+        all_text += "\n"
+    return all_text
@@ -27,3 +27,944 @@ class ChatMessageAPITest(APITestCase):                        # what: APITestCas
         list_resp = self.client.get(self.url)                # what: GET 요청 실행 why: 목록 조회
         self.assertEqual(list_resp.status_code, 200)         # what: 응답 코드 검증 why: 조회 성공 여부 확인
         self.assertEqual(len(list_resp.data), 1)             # what: 반환 데이터 개수 확인 why: 메시지 1건 존재 확인
+
+
+import sqlite3                                                # what: 표준 sqlite3 임포트 why: 생성된 SQL을 실제로 실행해 검증
+from django.test import SimpleTestCase                        # what: DB 없는 테스트 클래스 임포트 why: 순수 함수 검증
+from .services.teamdb_query_builder import (                  # what: 후보 SQL 빌더 임포트 why: 검증 대상
+    build_tourinfo_query,
+    build_restaurant_query,
+)
+
+class TeamDBQueryBuilderTest(SimpleTestCase):                 # what: LLM 없는 후보 SQL 생성 검증 why: 프롬프트와 같은 결과 보장
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(
+            'CREATE TABLE api_restaurant (store_name TEXT, address TEXT, rating REAL,'
+            ' visitor_review_count INT, blog_review_count INT)'
+        )
+        self.conn.executemany('INSERT INTO api_restaurant VALUES (?, ?, ?, ?, ?)', [
+            ('A식당', '서울 강남구 역삼동', 4.0, 10, 5),
+            ('B식당', '서울 강남구 삼성동', 4.5, 500, 100),
+            ('C식당', '서울 마포구 합정동', 5.0, 900, 900),
+            ('D식당', '서울 강남구 논현동', 0, 10, 10),
+        ])
+
+    def test_restaurant_ranking_and_district_filter(self):
+        sql = build_restaurant_query('강남구', top_k=5, dialect='sqlite')
+        rows = [r[0] for r in self.conn.execute(sql)]
+        self.assertEqual(rows, ['B식당', 'A식당'])           # what: 랭킹 순서 및 평점 0 제외 확인
+
+    def test_district_is_escaped(self):
+        sql = build_restaurant_query("강남구' OR '1'='1", dialect='sqlite')
+        self.assertEqual(list(self.conn.execute(sql)), [])   # what: 따옴표 주입이 조건을 깨지 않는지 확인
+        sql = build_restaurant_query('%', dialect='sqlite')
+        self.assertEqual(list(self.conn.execute(sql)), [])   # what: LIKE 와일드카드가 문자 그대로 취급되는지 확인
+
+    def test_tourinfo_query_filters_category(self):
+        sql = build_tourinfo_query('종로구', '역사관광지', dialect='mysql')
+        self.assertIn("category_two = '역사관광지'", sql)
+        self.assertIn('LIMIT 20', sql)
+
+
+import json                                                   # what: JSON 임포트 why: 스트림 입력 생성
+from .services.streaming import JSONFieldTokenStream          # what: answer 토큰 추출기 임포트 why: 검증 대상
+
+class JSONFieldTokenStreamTest(SimpleTestCase):               # what: SSE 토큰 추출 검증 why: 조각 경계와 무관하게 같은 결과 보장
+    def test_chunk_boundaries_and_escapes(self):
+        source = json.dumps({'answer': '# 제목\n"따옴표" 🍽️ 끝\\', 'places': []}, ensure_ascii=True)
+        for step in (1, 2, 5, len(source)):
+            stream = JSONFieldTokenStream('answer')
+            text = ''.join(stream.feed(source[i:i + step]) for i in range(0, len(source), step))
+            self.assertEqual(text, '# 제목\n"따옴표" 🍽️ 끝\\')
+            self.assertTrue(stream.done)
+
+    def test_ignores_text_before_field(self):
+        stream = JSONFieldTokenStream('answer')
+        self.assertEqual(stream.feed('```json\n{"places": [], '), '')
+        self.assertEqual(stream.feed('"answer": "안녕"}'), '안녕')
+
+
+from django.test import override_settings                    # what: 설정 덮어쓰기 why: 공유 캐시 별칭 주입
+from .services.candidate_cache import CandidateCache          # what: 후보 캐시 임포트 why: 검증 대상
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'candidates-test'},
+})
+@override_settings(CANDIDATE_CACHE_GENERATION_ALIAS=None)   # what: 기본 테스트는 공유 별칭/프로세스 토큰 사용
+class CandidateCacheTest(SimpleTestCase):                     # what: 후보 캐시 검증 why: 같은 구/테마는 DB를 다시 조회하지 않음
+    def setUp(self):
+        from django.core.cache import caches
+        caches['default'].clear()                             # what: 공유 캐시 초기화 why: 테스트 간 간섭 방지
+        self.calls = []
+
+    def fetch(self):
+        self.calls.append(1)                                  # what: DB 조회 횟수 기록
+        return "[('경복궁',)]"
+
+    def test_local_tier_hits_and_ttl(self):
+        cache = CandidateCache(local_ttl=60, max_entries=8)
+        for _ in range(3):
+            cache.get_or_fetch('api_tourinfo', '종로구', '역사관광지', 20, self.fetch)
+        self.assertEqual(len(self.calls), 1)
+        cache.get_or_fetch('api_tourinfo', '종로구', '휴양관광지', 20, self.fetch)   # what: 테마가 다르면 별도 키
+        self.assertEqual(len(self.calls), 2)
+
+        expired = CandidateCache(local_ttl=0)
+        expired.get_or_fetch('api_restaurant', '마포구', None, 20, self.fetch)
+        expired.get_or_fetch('api_restaurant', '마포구', None, 20, self.fetch)
+        self.assertEqual(len(self.calls), 4)                  # what: TTL 0 이면 매번 조회
+
+    def test_shared_tier_and_invalidate(self):
+        worker_a = CandidateCache(shared_alias='default')
+        worker_b = CandidateCache(shared_alias='default')
+        worker_a.get_or_fetch('api_restaurant', '강남구', None, 20, self.fetch)
+        worker_b.get_or_fetch('api_restaurant', '강남구', None, 20, self.fetch)
+        self.assertEqual(len(self.calls), 1)                  # what: 다른 워커는 공유 캐시에서 응답
+        self.assertEqual(worker_b.snapshot()['shared_hits'], 1)
+
+        worker_a.invalidate()                                 # what: 카탈로그 재적재 가정
+        worker_b.get_or_fetch('api_restaurant', '강남구', None, 20, self.fetch)
+        self.assertEqual(len(self.calls), 2)                  # what: 1차 항목이 남아 있어도 새 세대 키로 다시 조회
+        self.assertEqual(worker_b.snapshot()['local_hits'], 0)
+
+    def test_invalidate_command_reaches_other_process_without_shared_tier(self):
+        import os, subprocess, sys, tempfile
+        from django.conf import settings
+        with tempfile.TemporaryDirectory() as catalog_dir, override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                    'catalog': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': catalog_dir}},
+            CANDIDATE_CACHE_ALIAS=None, CANDIDATE_CACHE_GENERATION_ALIAS='catalog',
+        ):
+            worker = CandidateCache(local_ttl=300)           # what: 2차 캐시 없이 1차(프로세스 메모리)만 사용
+            worker.get_or_fetch('api_tourinfo', '종로구', None, 20, self.fetch)
+            worker.get_or_fetch('api_tourinfo', '종로구', None, 20, self.fetch)
+            self.assertEqual(len(self.calls), 1)
+
+            subprocess.run([sys.executable, 'manage.py', 'invalidate_candidate_cache'], cwd=settings.BASE_DIR,
+                           env={**os.environ, 'CATALOG_CACHE_DIR': catalog_dir}, check=True, capture_output=True)
+            worker.get_or_fetch('api_tourinfo', '종로구', None, 20, self.fetch)
+            self.assertEqual(len(self.calls), 2)              # what: 다른 프로세스의 무효화 why: 1차 항목이 남아 있어도 새 세대로 조회
+
+
+from .services import itinerary_cache                         # what: 일정 결과 캐시 임포트 why: 검증 대상
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'itinerary-test'}},
+    ITINERARY_CACHE_ALIAS='default', ITINERARY_CACHE_ENABLED=True, ITINERARY_CACHE_GENERATION_ALIAS=None,
+)
+class ItineraryCacheTest(SimpleTestCase):                     # what: 일정 캐시 검증 why: 같은 여행 조건은 그래프를 다시 돌리지 않음
+    def setUp(self):
+        from django.core.cache import caches
+        caches['default'].clear()
+        self.calls = 0
+
+    def params(self, start, end, **extra):
+        return {'city': '서울', 'district': '종로구', 'theme': '역사 이야기 길 따라가기', 'companions': '가족',
+                'groupSize': '4', 'mealSchedule': ['저녁', '점심'], 'startDate': start, 'endDate': end, **extra}
+
+    def generate(self):
+        self.calls += 1
+        return '### Day 1 (2025-07-05)\n### Day 2 (2025-07-06)', [{'name': '경복궁', 'date': '2025-07-06'}]
+
+    def test_equivalent_trips_share_entry_and_dates_are_rebased(self):
+        itinerary_cache.get_or_generate(self.params('2025-07-05', '2025-07-06'), self.generate)
+        answer, places = itinerary_cache.get_or_generate(
+            self.params('2025-07-12', '2025-07-13', groupSize=4, mealSchedule=['점심', '저녁']), self.generate)
+        self.assertEqual(self.calls, 1)                       # what: 다음 주 토~일 은 같은 항목
+        self.assertEqual(answer, '### Day 1 (2025-07-12)\n### Day 2 (2025-07-13)')
+        self.assertEqual(places[0]['date'], '2025-07-13')
+
+        itinerary_cache.get_or_generate(self.params('2025-07-07', '2025-07-08'), self.generate)
+        self.assertEqual(self.calls, 2)                       # what: 평일 패턴은 다른 항목
+
+    def test_different_weekdays_get_different_keys(self):
+        mon_wed = self.params('2025-07-07', '2025-07-09')
+        tue_thu = self.params('2025-07-08', '2025-07-10')       # what: 둘 다 평일 3일 why: 영업시간/휴무 요일이 다름
+        self.assertNotEqual(itinerary_cache.make_key(mon_wed), itinerary_cache.make_key(tue_thu))
+        self.assertEqual(itinerary_cache.make_key(mon_wed), itinerary_cache.make_key(self.params('2025-07-14', '2025-07-16')))
+
+    def test_lost_generation_key_does_not_revive_old_entries(self):
+        from django.core.cache import caches
+        p = self.params('2025-07-05', '2025-07-06')
+        itinerary_cache.get_or_generate(p, self.generate)
+        itinerary_cache.invalidate()
+        caches['default'].delete(itinerary_cache.GENERATION_KEY)   # what: 가득 찬 캐시 정리로 세대 키 삭제 가정
+        itinerary_cache.get_or_generate(p, self.generate)
+        self.assertEqual(self.calls, 2)                       # what: 새 토큰 why: 무효화 전 항목이 다시 보이지 않음
+
+    def test_fresh_bypasses_and_counters(self):
+        itinerary_cache.reset_stats()
+        p = self.params('2025-07-05', '2025-07-06')
+        itinerary_cache.get_or_generate(p, self.generate)
+        itinerary_cache.get_or_generate(p, self.generate)
+        itinerary_cache.get_or_generate(p, self.generate, fresh=True)
+        self.assertEqual(self.calls, 2)
+        stats = itinerary_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['bypasses']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertFalse(stats['approximate'])                 # what: LocMem incr 는 잠금 아래 원자적
+        from django.core.cache.backends.filebased import FileBasedCache
+        self.assertFalse(itinerary_cache._atomic_counters(FileBasedCache('/tmp/unused', {})))  # why: 파일 캐시 카운터는 근사치로 표시
+
+
+class BoundedMemorySaverTest(SimpleTestCase):                 # what: 체크포인터 상한 검증 why: 세션 thread 가 무한히 쌓이지 않음
+    def build_app(self, saver):
+        from typing import TypedDict
+        from langgraph.graph import StateGraph, START, END
+
+        class CounterState(TypedDict):
+            count: int
+
+        graph = StateGraph(CounterState)
+        graph.add_node('step', lambda state: {'count': state['count'] + 1})
+        graph.add_edge(START, 'step')
+        graph.add_edge('step', END)
+        return graph.compile(checkpointer=saver)
+
+    def test_lru_eviction_by_thread_count(self):
+        from .services.checkpointing import BoundedMemorySaver, session_thread_id
+        saver = BoundedMemorySaver(max_threads=2, ttl=3600, max_bytes=10 ** 9, db_store=False)
+        app = self.build_app(saver)
+        for session_id in (1, 2, 1, 3):                       # what: 1번 세션을 다시 써서 2번이 가장 오래됨
+            app.invoke({'count': 0}, {'configurable': {'thread_id': session_thread_id(session_id)}})
+        self.assertEqual(set(saver._threads), {'session-1', 'session-3'})
+        self.assertNotIn('session-2', saver.storage)
+        self.assertEqual(saver.snapshot()['evictions'], 1)
+
+    def test_ttl_and_memory_cap(self):
+        from .services.checkpointing import BoundedMemorySaver
+        import time
+        expired = BoundedMemorySaver(max_threads=100, ttl=60, db_store=False)
+        app = self.build_app(expired)
+        app.invoke({'count': 0}, {'configurable': {'thread_id': 'a'}})
+        expired._threads['a'] = time.monotonic() - 120        # what: a 를 2분 전 접근으로 되돌림
+        app.invoke({'count': 0}, {'configurable': {'thread_id': 'b'}})
+        self.assertEqual(list(expired._threads), ['b'])       # what: 유휴 시간이 지난 thread 정리
+
+        capped = BoundedMemorySaver(max_threads=100, ttl=3600, max_bytes=1, db_store=False)
+        app = self.build_app(capped)
+        app.invoke({'count': 0}, {'configurable': {'thread_id': 'a'}})
+        app.invoke({'count': 0}, {'configurable': {'thread_id': 'b'}})
+        self.assertEqual(list(capped._threads), ['b'])        # what: 메모리 상한 초과 시 오래된 thread 정리
+        self.assertEqual(capped.total_bytes, capped._thread_bytes['b'])
+
+
+import asyncio                                                # what: 비동기 경로 실행 why: asearch_many 검증
+import threading                                              # what: 스텁 호출 기록 보호
+import time                                                   # what: 지연/마감 시간 측정
+
+class StubSearchTool:                                         # what: Tavily 대체 스텁 why: 네트워크 없이 검색 경로 검증
+    def __init__(self, delay=0.0, slow=()):
+        self.delay, self.slow = delay, set(slow)
+        self.queries, self.lock = [], threading.Lock()
+
+    def invoke(self, payload):
+        with self.lock:
+            self.queries.append(payload['query'])
+        time.sleep(5 if payload['query'] in self.slow else self.delay)
+        return {'results': [{'content': '정보 ' + payload['query']}]}
+
+    async def ainvoke(self, payload):
+        with self.lock:
+            self.queries.append(payload['query'])
+        await asyncio.sleep(5 if payload['query'] in self.slow else self.delay)
+        return {'results': [{'content': '정보 ' + payload['query']}]}
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'websearch-test'}},
+    WEB_SEARCH_CACHE_ALIAS='default', WEB_SEARCH_MAX_WORKERS=8, WEB_SEARCH_DEADLINE=2.0,
+)
+class WebSearchTest(SimpleTestCase):                          # what: 웹 검색 병렬/캐시 검증 why: 노드 지연 = 검색 1회 왕복
+    def setUp(self):
+        from django.core.cache import caches
+        caches['default'].clear()
+
+    def test_concurrent_dedup_and_cache(self):
+        from .services.web_search import search_many
+        tool = StubSearchTool(delay=0.3)
+        started = time.monotonic()
+        results = search_many(tool, ['마포구 A', '마포구 B', '마포구  A', '', '마포구 C'])
+        self.assertLess(time.monotonic() - started, 0.8)      # what: 3건 순차(0.9s)보다 빠름
+        self.assertEqual(sorted(tool.queries), ['마포구 A', '마포구 B', '마포구 C'])
+        self.assertEqual(set(results), {'마포구 A', '마포구 B', '마포구 C'})
+
+        search_many(tool, ['마포구 A', '마포구 B'])
+        self.assertEqual(len(tool.queries), 3)                # what: 두 번째 호출은 캐시 응답
+
+    def test_deadline_skips_slow_queries(self):
+        from .services.web_search import asearch_many, format_results
+        tool = StubSearchTool(slow={'종로구 느림'})
+        results = asyncio.run(asearch_many(tool, ['종로구 빠름', '종로구 느림'], deadline=0.5))
+        self.assertEqual(set(results), {'종로구 빠름'})
+        text = format_results([('빠름', '종로구 빠름'), ('느림', '종로구 느림')], results)
+        self.assertEqual(text, '빠름 웹 검색 결과: \n정보 종로구 빠름\n')  # what: 장소 목록 전체가 아닌 해당 장소명만 기록
+
+    def test_abandoned_lookups_and_request_timeout(self):
+        import socket
+        import requests
+        from .services import web_search
+        release = threading.Event()
+
+        class Hanging:
+            def invoke(self, payload):
+                release.wait(2)
+                return {'results': []}
+
+        self.assertEqual(web_search.search_many(Hanging(), ['멈춤'], deadline=0.1), {})
+        self.assertEqual(web_search.abandoned_in_flight(), 1)   # what: 마감 후에도 풀 스레드를 쓰는 검색
+        release.set()
+        for _ in range(50):
+            if not web_search.abandoned_in_flight():
+                break
+            time.sleep(0.02)
+        self.assertEqual(web_search.abandoned_in_flight(), 0)
+
+        server = socket.socket()                              # what: 연결만 받고 응답하지 않는 서버
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        self.addCleanup(server.close)
+        client = web_search.TavilySearchClient('key', timeout=0.2, url=f'http://127.0.0.1:{server.getsockname()[1]}/search')
+        with self.assertRaises(requests.Timeout):             # why: 스레드가 요청 타임아웃 뒤 풀로 돌아옴
+            client.invoke({'query': '멈춤'})
+
+
+class ItinerarySchemaTest(SimpleTestCase):                    # what: single_pass 출력 검증 why: 스키마에 맞지 않는 응답은 저장 전에 거름
+    def test_parse_plan(self):
+        from pydantic import ValidationError
+        from .services.itinerary_schema import parse_plan
+        plan = parse_plan('```json\n{"answer": "# 일정", "places": [{"name": "경복궁", "map_x": 126.97, "map_y": 37.57, "address": "종로구"}]}\n```')
+        self.assertEqual(plan.places[0].name, '경복궁')
+        self.assertEqual(plan.model_dump()['places'][0]['address'], '종로구')   # what: 추가 필드 보존
+        with self.assertRaises(ValidationError):
+            parse_plan('{"answer": "# 일정", "places": [{"map_x": 1}]}')           # what: name 누락
+
+
+class CandidateEncodingTest(SimpleTestCase):                  # what: 후보 압축 인코딩 검증 why: 프롬프트 토큰 절감
+    def restaurant_row(self, name, saturday='11:00-21:00'):
+        row = {'restaurant_id': 1, 'store_name': name, 'category': '일식', 'description': '신선한 회',
+               'address': '서울 강남구 역삼동 1-1', 'phone_number': '02-000-0000', 'rating': 4.6,
+               'visitor_review_count': 812, 'blog_review_count': 355}
+        for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'):
+            row[f'{day}_biz_hours'] = saturday if day == 'saturday' else '10:00-22:00'
+            row[f'{day}_break_time'] = '15:00-17:00'
+            row[f'{day}_last_order'] = '21:00'
+        row.update({'map_x': 127.029512345, 'map_y': 37.498123456})
+        return row
+
+    def test_projection_and_hours(self):
+        from .services.candidate_encoding import encode_candidates, collapse_hours
+        text = encode_candidates('api_restaurant', [self.restaurant_row('오복수산')], weekdays=[5, 6])
+        header, row = text.splitlines()[1:]
+        self.assertEqual(header, 'name|cat|addr|r|vr|br|x|y|hours')
+        self.assertEqual(row.split('|')[:8], ['오복수산', '일식', '서울 강남구 역삼동 1-1', '4.6', '812', '355', '127.02951', '37.49812'])
+        self.assertNotIn('02-000-0000', text)                 # what: 프롬프트가 쓰지 않는 컬럼 제외
+        self.assertEqual(collapse_hours(self.restaurant_row('a', '10:00-22:00'), [5, 6]),
+                         '10:00-22:00 (브레이크 15:00-17:00, LO 21:00)')   # what: 요일별 값이 같으면 한 번만
+        self.assertTrue(row.endswith('토 11:00-21:00 (브레이크 15:00-17:00, LO 21:00) / 일 10:00-22:00 (브레이크 15:00-17:00, LO 21:00)'))
+
+    def test_token_report_shrinks_restaurants(self):
+        from .services.candidate_encoding import token_report
+        rows = [self.restaurant_row(f'식당{i}') for i in range(20)]
+        report = token_report('api_restaurant', rows, weekdays=[5])
+        self.assertEqual(report['rows'], 20)
+        self.assertLess(report['compact_tokens'], report['raw_tokens'] / 2)
+
+
+class GraphMetricsTest(SimpleTestCase):                       # what: 노드별 계측 검증 why: 느린 노드/캐시 미스를 턴 단위로 추적
+    def test_node_timing_and_cache_attribution(self):
+        from typing import TypedDict
+        from langgraph.graph import StateGraph, START, END
+        from .services.graph_metrics import GraphMetrics, record_cache
+
+        class S(TypedDict):
+            n: int
+
+        def lookup(state):
+            record_cache('candidate', 'miss')
+            record_cache('candidate', 'local_hit', 2)
+            return {'n': state['n'] + 1}
+
+        builder = StateGraph(S)
+        builder.add_node('lookup', lookup)
+        builder.add_edge(START, 'lookup')
+        builder.add_edge('lookup', END)
+        metrics = GraphMetrics(graph_mode='test')
+        builder.compile().invoke({'n': 0}, {'configurable': {'metrics': metrics}, 'callbacks': [metrics.handler]})
+
+        data = metrics.as_dict()
+        self.assertEqual(data['graph_mode'], 'test')
+        self.assertEqual(data['nodes']['lookup']['calls'], 1)
+        self.assertEqual(data['nodes']['lookup']['cache'], {'candidate': {'miss': 1, 'local_hit': 2}})
+        record_cache('candidate', 'miss')                     # what: 그래프 밖 호출은 무시
+        self.assertEqual(metrics.nodes['lookup']['cache']['candidate']['miss'], 1)
+
+    def test_lambda_nodes_counted_once_and_retries(self):
+        from typing import TypedDict
+        from langchain_core.runnables import RunnableLambda
+        from langgraph.graph import StateGraph, START, END
+        from langgraph.types import RetryPolicy
+        from .services.graph_metrics import GraphMetrics
+
+        class S(TypedDict):
+            n: int
+
+        attempts = []
+
+        def plan(state):                                      # what: 노드 이름과 같은 RunnableLambda why: 실제 그래프와 같은 구조
+            time.sleep(0.03)
+            return {'n': 1}
+
+        def write(state):
+            attempts.append(1)
+            time.sleep(0.02)
+            if len(attempts) < 3:
+                raise ValueError('bad json')                  # what: 파싱 실패 why: RetryPolicy 재시도
+            return {'n': 2}
+
+        builder = StateGraph(S)
+        builder.add_node('plan', RunnableLambda(plan))
+        builder.add_node('write', RunnableLambda(write),
+                         retry=RetryPolicy(max_attempts=3, initial_interval=0.001, retry_on=ValueError))
+        builder.add_edge(START, 'plan')
+        builder.add_edge('plan', 'write')
+        builder.add_edge('write', END)
+        metrics = GraphMetrics()
+        builder.compile().invoke({'n': 0}, {'callbacks': [metrics.handler]})
+
+        data = metrics.as_dict()
+        self.assertEqual(data['nodes']['plan']['calls'], 1)
+        self.assertEqual({k: data['nodes']['write'][k] for k in ('calls', 'retries', 'errors')},
+                         {'calls': 3, 'retries': 2, 'errors': 2})  # what: 시도 3번 = 재시도 2번
+        self.assertLessEqual(sum(n['ms'] for n in data['nodes'].values()), data['total_ms'])
+
+    def test_latency_report(self):
+        from .services.graph_metrics import percentile
+        from .management.commands.graph_latency_report import build_report
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3.0)
+        self.assertEqual(percentile(list(range(1, 101)), 95), 95.0)
+        samples = [{'total_ms': ms, 'nodes': {'search_web': {'ms': ms / 2, 'input_tokens': 10}}} for ms in (100, 200, 300)]
+        report = build_report(samples)
+        self.assertEqual(report['total_p50_ms'], 200.0)
+        self.assertEqual(report['nodes']['search_web']['count'], 3)
+        self.assertEqual(report['nodes']['search_web']['avg_input_tokens'], 10.0)
+
+
+class LLMRegistryTest(SimpleTestCase):                        # what: 공유 LLM 클라이언트 검증 why: 요청마다 클라이언트/프롬프트를 만들지 않음
+    def setUp(self):
+        import os
+        from unittest import mock
+        from .services import llm_registry
+        self.registry = llm_registry
+        llm_registry.clear()
+        self.addCleanup(llm_registry.clear)
+        env = mock.patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'})   # what: 실제 호출 없이 클라이언트만 생성
+        env.start()
+        self.addCleanup(env.stop)
+
+    @override_settings(LLM_CLIENTS={'gemini-2.0-flash': {'timeout': 30}})
+    def test_clients_shared_per_options_and_loop(self):
+        chat = self.registry.chat_model('gemini-2.0-flash')
+        self.assertIs(self.registry.chat_model('gemini-2.0-flash'), chat)
+        self.assertEqual(chat.timeout, 30)                    # what: settings.LLM_CLIENTS 기본 옵션 적용
+        self.assertIsNot(self.registry.chat_model('gemini-2.0-flash', temperature=0.1), chat)
+
+        async def in_loop():
+            return self.registry.chat_model('gemini-2.0-flash'), self.registry.chat_model('gemini-2.0-flash')
+        first, second = asyncio.run(in_loop())
+        self.assertIs(first, second)                          # what: 같은 루프에서는 같은 복사본
+        self.assertIsNot(first, chat)                         # what: 비동기 클라이언트는 루프별로 분리
+        self.assertIs(first.client, chat.client)              # what: 동기 gRPC 채널은 공유
+
+    def test_text_client_inner_async_client_per_loop(self):
+        async def in_loop():
+            return self.registry.text_model('gemini-2.0-flash')
+        first, second = asyncio.run(in_loop()), asyncio.run(in_loop())
+        self.assertIsNot(first.client, second.client)          # what: 루프마다 안쪽 ChatGoogleGenerativeAI 복사 why: 닫힌 루프의 비동기 클라이언트 재사용 금지
+        self.assertIsNone(second.client.async_client_running)
+        self.assertIs(first.client.client, self.registry.text_model('gemini-2.0-flash').client.client)  # what: 동기 채널은 공유
+
+    def test_services_built_once(self):
+        from .services.llm_service import DummyLLMService
+        self.assertIs(self.registry.get_service(DummyLLMService), self.registry.get_service(DummyLLMService))
+        self.assertEqual(self.registry.snapshot()['services'], 1)
+
+
+class ItineraryPlannerTest(SimpleTestCase):                   # what: 코드 기반 일정 배치 검증 why: 식사 조건/중복/순위를 LLM 없이 보장
+    def candidates(self):
+        restaurants = [{'store_name': f'식당{i}', 'rating': 4.0 + i / 10, 'visitor_review_count': 100,
+                        'blog_review_count': 50, 'map_x': 127.05, 'map_y': 37.5} for i in range(6)]
+        tours = [{'title': f'관광{i}', 'map_x': 127.0 + i * 0.01, 'map_y': 37.5} for i in range(3)]
+        hotels = [{'store_name': '호텔A', 'rating': 3.0, 'visitor_review_count': 1, 'blog_review_count': 1},
+                  {'store_name': '호텔B', 'rating': 4.8, 'visitor_review_count': 300, 'blog_review_count': 80}]
+        return {'restaurant': restaurants, 'tourinfo': tours, 'accommodation': hotels}
+
+    def test_meals_uniqueness_and_rank(self):
+        import datetime
+        from .services.itinerary_planner import plan_days, plan_places, plan_to_markdown
+        dates = [datetime.date(2025, 8, 1), datetime.date(2025, 8, 2)]
+        plan = plan_days(self.candidates(), {'breakfast': 'False', 'lunch': 'True', 'dinner': 'True'}, dates)
+        self.assertEqual([d['date'] for d in plan], ['2025-08-01', '2025-08-02'])
+        slots = [s['slot'] for s in plan[0]['stops']]
+        self.assertEqual(slots, ['attraction_1', 'lunch', 'attraction_2', 'dinner', 'lodging'])
+        self.assertEqual(plan[0]['stops'][1]['name'], '식당5')            # what: 랭킹 공식 최상위 식당부터
+        self.assertEqual(plan[0]['stops'][-1]['name'], '호텔B')
+        names = [s['name'] for d in plan for s in d['stops'] if s['kind'] != 'accommodation']
+        self.assertEqual(len(names), len(set(names)))                      # what: 같은 장소 반복 없음
+        self.assertNotIn('attraction_2', [s['slot'] for s in plan[1]['stops']])   # what: 관광지가 모자라면 칸 생략
+        self.assertEqual(len(plan_places(plan)), sum(len(d['stops']) for d in plan))
+        self.assertIn('#### 🏨 숙소: 호텔B', plan_to_markdown(plan))
+
+    def test_duplicate_rows_placed_once(self):
+        import datetime
+        from .services.itinerary_planner import plan_days
+        candidates = self.candidates()
+        candidates['restaurant'] = [dict(row) for row in candidates['restaurant'][:2] for _ in range(3)]   # what: 같은 식당이 행 3개씩
+        candidates['tourinfo'] = [dict(candidates['tourinfo'][0]) for _ in range(3)]
+        plan = plan_days(candidates, {'breakfast': 'False', 'lunch': 'True', 'dinner': 'True'},
+                         [datetime.date(2025, 8, 1), datetime.date(2025, 8, 2)])
+        names = [s['name'] for d in plan for s in d['stops'] if s['kind'] != 'accommodation']
+        self.assertEqual(sorted(names), ['관광0', '식당0', '식당1'])        # what: 중복 행이어도 장소당 한 번 why: 행 객체가 아닌 이름 기준
+
+    def test_proximity_within_rank_window(self):
+        import datetime
+        from .services.itinerary_planner import plan_days
+        candidates = self.candidates()
+        candidates['tourinfo'] = [{'title': '먼 관광지', 'map_x': 127.5, 'map_y': 37.5},
+                                  {'title': '가까운 관광지', 'map_x': 127.051, 'map_y': 37.5}]
+        plan = plan_days(candidates, {'breakfast': 'False', 'lunch': 'True', 'dinner': 'False'},
+                         [datetime.date(2025, 8, 1)])
+        self.assertEqual([s['name'] for s in plan[0]['stops']][:2], ['먼 관광지', '식당5'])
+        self.assertEqual(plan[0]['stops'][2]['name'], '가까운 관광지')    # what: 직전 장소(식당5)와 가까운 후보
+
+
+class TravelMatrixTest(SimpleTestCase):                       # what: 좌표 기반 이동 시간 행렬 검증 why: 프롬프트에 추정 대신 계산값 사용
+    def test_distances_and_legs(self):
+        from .services.travel_matrix import TravelMatrix, matrix_for, clear
+        rows = [{'title': 'A', 'map_x': 127.0, 'map_y': 37.0},
+                {'title': 'B', 'map_x': 127.0, 'map_y': 38.0},
+                {'title': 'C', 'map_x': 127.005, 'map_y': 37.0},
+                {'title': '좌표없음', 'map_x': None, 'map_y': None}]
+        matrix = TravelMatrix(rows)
+        self.assertAlmostEqual(matrix.distance(rows[0], rows[1]), 111.19, places=1)   # what: 위도 1도 ≈ 111.19km
+        self.assertEqual(matrix.distance(rows[1], rows[0]), matrix.distance(rows[0], rows[1]))
+        self.assertIsNone(matrix.distance(rows[0], rows[3]))
+        self.assertEqual(matrix.leg(rows[0], rows[2])['mode'], 'walk')               # what: 약 0.44km → 도보
+        self.assertEqual(matrix.leg(rows[0], rows[1])['mode'], 'transit')
+        self.assertEqual(matrix.leg({'title': 'A', 'map_x': 127.0, 'map_y': 37.0}, rows[2]),
+                         matrix.leg(rows[0], rows[2]))                                # what: 복사된 행도 같은 키로 조회
+        clear()
+        self.addCleanup(clear)
+        candidates = {'tourinfo': rows}
+        self.assertIs(matrix_for('강남구', '문화시설', candidates), matrix_for('강남구', '문화시설', candidates))
+
+
+from unittest import mock                                      # what: 그래프 교체 why: LLM 없이 실패/재개 재현
+from django.test import TestCase                              # what: DB 테스트 클래스 why: ItineraryRun 기록 검증
+
+class ItineraryRunResumeTest(TestCase):                       # what: 실패한 run 재개 검증 why: 재요청 시 끝난 노드를 다시 실행하지 않음
+    def setUp(self):
+        from typing import TypedDict
+        from langgraph.graph import StateGraph, START, END
+        from .models import User
+        from .services.checkpointing import BoundedMemorySaver
+
+        class S(TypedDict, total=False):
+            question: str
+            rows: str
+            answer: str
+
+        self.calls = {'fetch': 0, 'write': 0}
+        self.failures = 1
+
+        def fetch(state):
+            self.calls['fetch'] += 1
+            return {'rows': state['question'] + ' 후보'}
+
+        def write(state):
+            self.calls['write'] += 1
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError('LLM 응답 없음')
+            return {'answer': json.dumps({'answer': state['rows'], 'places': []}, ensure_ascii=False)}
+
+        builder = StateGraph(S)
+        builder.add_node('fetch', fetch)
+        builder.add_node('write', write)
+        builder.add_edge(START, 'fetch')
+        builder.add_edge('fetch', 'write')
+        builder.add_edge('write', END)
+        app = builder.compile(checkpointer=BoundedMemorySaver(db_store=False))
+        patcher = mock.patch('api.services.teamdb_langgraph_v5._app', app)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(email='run@example.com', password='pw', username='run')
+        self.session = ChatSession.objects.create(user=user, title='재개')
+        self.params = {'district': '강남구', 'theme': '역사 이야기 길 따라가기'}
+
+    def runner(self, run_id=None):
+        from .services.itinerary_runs import ItineraryRunner
+        return ItineraryRunner(self.session.id, self.params, run_id=run_id)
+
+    def test_resume_skips_finished_nodes(self):
+        from .models import ItineraryRun
+        from .services.itinerary_runs import ItineraryRunFailed
+
+        with self.assertRaises(ItineraryRunFailed) as failed:
+            self.runner().generate()
+        run = ItineraryRun.objects.get(run_id=failed.exception.run_id)
+        self.assertEqual((run.status, run.failed_node), ('failed', 'write'))
+        self.assertTrue(run.checkpoint_id)
+
+        answer, places = self.runner(run_id=failed.exception.run_id).generate()
+        self.assertEqual(answer, '강남구 후보')
+        self.assertEqual(self.calls, {'fetch': 1, 'write': 2})  # what: fetch 는 다시 돌지 않음
+        run.refresh_from_db()
+        self.assertEqual((run.status, run.attempts), ('succeeded', 2))
+
+    @override_settings(ITINERARY_RUN_MAX_RESUMES=0)
+    def test_exhausted_run_restarts(self):
+        from .models import ItineraryRun
+        from .services.itinerary_runs import ItineraryRunFailed
+
+        with self.assertRaises(ItineraryRunFailed) as failed:
+            self.runner().generate()
+        runner = self.runner(run_id=failed.exception.run_id)
+        runner.generate()
+        self.assertNotEqual(runner.run_id, failed.exception.run_id)
+        self.assertEqual(self.calls['fetch'], 2)
+        self.assertEqual(ItineraryRun.objects.get(run_id=failed.exception.run_id).status, 'abandoned')
+
+    def test_run_id_with_other_parameters_starts_fresh(self):
+        from .services.itinerary_runs import ItineraryRunFailed
+
+        with self.assertRaises(ItineraryRunFailed) as failed:
+            self.runner().generate()
+        self.params = {'district': '마포구', 'theme': '역사 이야기 길 따라가기'}   # what: 같은 run_id, 다른 구 why: 이전 체크포인트 재사용 금지
+        runner = self.runner(run_id=failed.exception.run_id)
+        answer, _ = runner.generate()
+        self.assertEqual(answer, '마포구 후보')
+        self.assertNotEqual(runner.run_id, failed.exception.run_id)
+        self.assertEqual(self.calls['fetch'], 2)
+
+
+class PregenerateItinerariesTest(SimpleTestCase):             # what: 사전 생성 대상 집계 검증 why: 캐시 키가 같은 요청은 한 조합으로 셈
+    def test_top_combinations(self):
+        from .management.commands.pregenerate_itineraries import top_combinations
+        base = {'district': '강남구', 'theme': '역사 이야기 길 따라가기', 'mealSchedule': ['점심'],
+                'startDate': '2025-07-05', 'endDate': '2025-07-06'}
+        other = {**base, 'district': '마포구'}
+        same_pattern = {**base, 'startDate': '2025-07-12', 'endDate': '2025-07-13'}   # what: 다음 주 토~일 why: 같은 캐시 키
+        invalid = {**base, 'theme': '없는 테마'}
+        ranked = top_combinations([base, other, same_pattern, invalid, base])
+        self.assertEqual([(count, p['district']) for count, p in ranked], [(3, '강남구'), (1, '마포구')])
+        self.assertEqual(ranked[0][1]['startDate'], '2025-07-05')          # what: 마지막 요청이 대표
+        self.assertEqual(len(top_combinations([base, other], limit=1)), 1)
+
+
+class FakeBackendsTest(SimpleTestCase):                       # what: 로컬 대역 검증 why: Gemini/Tavily/MySQL 없이 그래프 전체 실행
+    @override_settings(WEB_SEARCH_CACHE_ALIAS='')
+    def test_graph_runs_on_fakes(self):
+        from langgraph.checkpoint.memory import InMemorySaver
+        from .services import teamdb_langgraph_v5 as graph
+        from .services.fakes import fake_backends, seeded_catalog_db
+        from .management.commands.graph_benchmark import request_parameters
+
+        db = seeded_catalog_db(districts=('마포구',), rows_per_district=8)
+        params = {**request_parameters(0), 'district': '마포구'}
+        with fake_backends(db=db) as backends, \
+                mock.patch.object(graph, '_app', graph.build_graph('two_pass').compile(checkpointer=InMemorySaver())):
+            answer, places = graph.get_result(params)
+        self.assertIn('# OnGill', answer)
+        self.assertTrue(places and all(place['name'].startswith('마포구 ') for place in places))
+        self.assertEqual(backends['search'].calls, len(places))   # what: 고른 장소마다 웹 검색 한 번
+        self.assertIsNone(graph._llm)                             # what: 블록을 나가면 원래 백엔드로 복원
+
+
+class LoadTestHelpersTest(SimpleTestCase):                    # what: 부하 테스트 램프/집계 검증 why: 실행끼리 같은 기준으로 비교
+    def test_stage_interpolation(self):
+        from .management.commands.load_test import parse_stages, target_vus
+        stages = parse_stages('10s:4,1m:4,10s:0')
+        self.assertEqual(stages, [(10.0, 4), (60.0, 4), (10.0, 0)])
+        self.assertEqual([target_vus(stages, t) for t in (0, 5, 10, 40, 75)], [0, 2, 4, 4, 2])
+        self.assertIsNone(target_vus(stages, 80))                # what: 모든 stage 종료
+        with self.assertRaises(ValueError):
+            parse_stages('10s')
+
+    def test_histogram_and_query_headers(self):
+        from .management.commands.load_test import histogram
+        buckets = histogram([10, 50, 51, 20000])
+        self.assertEqual((buckets['<=50'], buckets['<=100'], buckets['>10000']), (2, 1, 1))
+        from django.conf import settings
+        with override_settings(MIDDLEWARE=[*settings.MIDDLEWARE, 'api.middleware.QueryCountMiddleware']):
+            response = self.client.get('/api/v1/maps/common-places/')
+        self.assertEqual(response['X-DB-Queries'], '0')         # what: DB 를 쓰지 않는 뷰
+        self.assertIn('X-DB-Time-Ms', response)
+
+
+class ChatTurnPersistenceTest(TestCase):                      # what: 봇 턴 일괄 저장 검증 why: 장소 수와 관계없이 쿼리 수 고정
+    def setUp(self):
+        from .models import ChatSession, User
+        user = User.objects.create_user(email='turn@example.com', password='pw', username='turn')
+        self.session = ChatSession.objects.create(user=user, title='t', parameters={})
+
+    def test_itinerary_turn_statements_do_not_grow(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .views import _save_itinerary_turn
+        counts = []
+        for size in (2, 20):
+            places = [{'name': f'장소 {i}'} for i in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                data = _save_itinerary_turn(self.session, 'answer', places, interaction=({'a': 1}, {}))
+            counts.append(len(queries))
+            self.assertEqual(data['places'], places)
+        self.assertEqual(counts[0], counts[1])
+        message = self.session.messages.get(pk=data['messages'][0]['chat_message_id'])
+        self.assertEqual([c.payload['name'] for c in message.components.order_by('order')][:2], ['장소 0', '장소 1'])
+        self.assertEqual(message.interaction.request, {'a': 1})
+
+    def test_delta_components(self):
+        from .services import chat_turns
+        deltas = [{'type': 'map_marker', 'payload': {'lat': 1}}, {'type': 'text', 'payload': {'content': 'hi'}},
+                  {'type': 'end', 'payload': {}}]
+        message, rows = chat_turns.save_assistant_turn(self.session, 'hi', components=chat_turns.delta_components(deltas),
+                                                       interaction=chat_turns.delta_interaction(deltas), order=2)
+        self.assertEqual([(r.component_type, r.order) for r in message.components.all()], [('map_marker', 0)])
+        self.assertEqual(message.interaction.response, {'content': 'hi'})
+
+
+class MessageSequenceTest(TestCase):                          # what: 세션별 메시지 순번 검증 why: count() 없이 겹치지 않는 order
+    def setUp(self):
+        from .models import ChatSession, User
+        self.user = User.objects.create_user(email='seq@example.com', password='pw', username='seq')
+        self.session = ChatSession.objects.create(user=self.user, title='t', parameters={}, next_message_order=1)
+
+    def test_orders_follow_session_sequence(self):
+        from rest_framework.test import APIClient
+        from .views import _save_itinerary_turn
+        _save_itinerary_turn(self.session, 'first', [])
+        _save_itinerary_turn(self.session, 'regenerated', [])    # what: start2 재요청 why: 예전엔 order=1 중복
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(f'/api/v1/users/{self.user.pk}/chat-sessions/{self.session.pk}/send-messages/',
+                               {'message': '안녕'}, format='json')
+        self.assertEqual([m['chat_order_number'] for m in response.data['messages']], [3, 4])
+        self.assertEqual(list(self.session.messages.values_list('order', flat=True)), [1, 2, 3, 4])
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.next_message_order, 5)
+
+    def test_duplicate_order_rejected(self):
+        from django.db import IntegrityError
+        from .models import ChatMessage
+        ChatMessage.objects.create(chatsession=self.session, order=7)
+        with self.assertRaises(IntegrityError):
+            ChatMessage.objects.create(chatsession=self.session, order=7)
+
+
+from django.db import connection                              # what: 실행 중인 DB 종류 why: EXPLAIN 형식이 MySQL/SQLite 다름
+from django.test.utils import CaptureQueriesContext           # what: 실행 쿼리 수집 why: 엔드포인트별 쿼리 예산 검사
+
+class QueryPlanTest(TestCase):                                # what: 조회 경로별 인덱스 사용 검증 why: 인덱스/쿼리 변경으로 풀스캔·filesort 회귀 방지
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), plan)
+        self.assertNotIn('TEMP B-TREE', plan)                    # what: SQLite 정렬용 임시 트리 why: 인덱스 순서로 정렬되어야 함
+        self.assertNotIn('filesort', plan)                       # what: MySQL 정렬 why: 위와 같음
+
+    def test_chat_tables(self):
+        from .models import ChatComponent, ChatMessage, ChatSession
+        self.assertUsesIndex(ChatSession.objects.filter(user_id=1).order_by('-created_at'),
+                             ChatSession._meta.indexes[0].name)
+        self.assertUsesIndex(ChatMessage.objects.filter(chatsession_id=1).order_by('order'),
+                             'uniq_chatmessage_session_order', 'sqlite_autoindex_api_chatmessage')
+        self.assertUsesIndex(ChatComponent.objects.filter(chatmessage_id=1, component_type='place').order_by('order'),
+                             ChatComponent._meta.indexes[0].name)
+
+    def test_tourinfo_candidates(self):
+        from .models import TourInfo
+        from .services.teamdb_query_builder import build_tourinfo_query
+        dialect = 'mysql' if connection.vendor == 'mysql' else 'sqlite'
+        with connection.cursor() as cursor:
+            cursor.execute(('EXPLAIN ' if dialect == 'mysql' else 'EXPLAIN QUERY PLAN ')
+                           + build_tourinfo_query('강남구', '역사관광지', dialect=dialect).rstrip(';'))
+            plan = str(cursor.fetchall())
+        self.assertIn(TourInfo._meta.indexes[0].name, plan)
+
+
+class EndpointQueryBudgetTest(TestCase):                      # what: 엔드포인트별 쿼리 수 상한 why: N+1/재조회가 다시 생기면 바로 실패
+    BUDGETS = {                                               # what: 현재 쿼리 수 why: 늘어나면 이유를 확인하고 갱신
+        'start': 3, 'start2': 6, 'send-messages': 7, 'feedbacks-post': 2, 'feedbacks-get': 2,
+        'sessions-list': 1, 'messages-list': 1,
+    }
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from .models import User
+        self.user = User.objects.create_user(email='budget@example.com', password='pw', username='budget')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def call(self, name, method, path, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(path, data, format='json')
+        self.assertLess(response.status_code, 400, response.content)
+        statements = [q['sql'] for q in queries.captured_queries
+                      if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))]   # what: TestCase 의 atomic why: 운영에선 BEGIN/COMMIT
+        self.assertLessEqual(len(statements), self.BUDGETS[name], f"{name}: " + "\n".join(statements))
+        return response
+
+    @override_settings(ITINERARY_CACHE_ENABLED=False)
+    def test_chat_flow(self):
+        from .services.fakes import fake_backends
+        base = f'/api/v1/users/{self.user.pk}/chat-sessions'
+        params = {'district': '마포구', 'theme': '역사 이야기 길 따라가기'}
+        with fake_backends(db=object()):                          # what: start 의 세션 메타데이터 LLM why: DB 조회 없음
+            session_id = self.call('start', 'post', f'{base}/start/',
+                                   {'session_parameters': params}).data['session']['chat_session_id']
+        places = [{'name': f'장소 {i}'} for i in range(15)]
+        with mock.patch('api.views.get_result', return_value=('answer', places)):
+            self.call('start2', 'post', f'{base}/start2/{session_id}/', {'session_parameters': params})
+        self.call('send-messages', 'post', f'{base}/{session_id}/send-messages/', {'message': '지도모드 채팅모드'})
+        for _ in range(3):
+            self.call('feedbacks-post', 'post', f'{base}/{session_id}/feedbacks/', {'is_liked': True})
+        self.call('feedbacks-get', 'get', f'{base}/{session_id}/feedbacks/')
+        self.call('sessions-list', 'get', f'{base}/')
+        self.call('messages-list', 'get', f'{base}/{session_id}/messages/')
+
+
+class HistoryPaginationTest(TestCase):                        # what: 세션/메시지 목록 커서 페이지 검증 why: 기록이 길어도 페이지 비용 일정
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from .models import ChatSession, User
+        from .services import chat_turns
+        self.user = User.objects.create_user(email='page@example.com', password='pw', username='page')
+        self.session = ChatSession.objects.create(user=self.user, title='t', parameters={})
+        for i in range(6):
+            chat_turns.save_assistant_turn(self.session, f'm{i}', components=chat_turns.place_components([{'i': i}]),
+                                           interaction=({}, {'i': i}))
+        self.client = APIClient()
+        self.base = f'/api/v1/users/{self.user.pk}/chat-sessions/{self.session.pk}/messages/'
+
+    def test_message_pages_with_includes(self):
+        with CaptureQueriesContext(connection) as queries:
+            page = self.client.get(self.base, {'page_size': 4, 'include': 'components,interaction'}).data
+        self.assertEqual(len(queries), 2)                        # what: 메시지+interaction JOIN, 컴포넌트 prefetch
+        self.assertEqual([m['message'] for m in page['results']], ['m0', 'm1', 'm2', 'm3'])
+        self.assertEqual(page['results'][1]['components'], [{'component_type': 'place', 'payload': {'i': 1}, 'order': 0}])
+        self.assertEqual(page['results'][1]['interaction']['response'], {'i': 1})
+        rest = self.client.get(page['next']).data
+        self.assertEqual([m['message'] for m in rest['results']], ['m4', 'm5'])
+        self.assertIsNone(rest['next'])
+        self.assertIn('components', rest['results'][0])         # what: next 링크에도 include 유지 why: 쿼리스트링 보존
+        plain = self.client.get(self.base).data['results'][0]
+        self.assertNotIn('components', plain)
+
+    def test_session_pages_newest_first(self):
+        from .models import ChatSession
+        for i in range(3):
+            ChatSession.objects.create(user=self.user, title=f's{i}', parameters={})
+        page = self.client.get(f'/api/v1/users/{self.user.pk}/chat-sessions/', {'page_size': 2}).data
+        self.assertEqual([s['title'] for s in page['results']], ['s2', 's1'])
+        rest = self.client.get(page['next']).data
+        self.assertEqual([s['title'] for s in rest['results']], ['s0', 't'])
+
+
+class TranscriptTest(TestCase):                               # what: transcript 검증 why: 지난 여행을 요청 한 번/쿼리 고정으로 다시 열기
+    def setUp(self):
+        from .models import ChatSession, User
+        from .services import chat_turns
+        self.chat_turns = chat_turns
+        self.user = User.objects.create_user(email='tr@example.com', password='pw', username='tr')
+        self.session = ChatSession.objects.create(user=self.user, title='t', parameters={})
+        for i in range(4):
+            chat_turns.save_assistant_turn(self.session, f'm{i}',
+                                           components=chat_turns.place_components([{'i': i}, {'i': i + 10}]))
+        self.url = f'/api/v1/users/{self.user.pk}/chat-sessions/{self.session.pk}/transcript/'
+
+    def test_transcript_and_conditional_get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(queries), 4)
+        data = json.loads(response.content)
+        self.assertEqual([m['message'] for m in data['messages']], ['m0', 'm1', 'm2', 'm3'])
+        self.assertEqual([c['payload']['i'] for c in data['messages'][2]['components']], [2, 12])
+
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((cached.status_code, len(queries)), (304, 2))
+
+        self.chat_turns.save_assistant_turn(self.session, 'm4')  # what: 새 턴 why: ETag 가 바뀌어야 함
+        fresh = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], etag)
+
+    def test_other_users_session_is_404(self):
+        self.assertEqual(self.client.get(f'/api/v1/users/{self.user.pk + 1}/chat-sessions/{self.session.pk}/transcript/')
+                         .status_code, 404)
+
+
+class ItineraryJobQueueTest(TestCase):                         # what: 일정 생성 작업 큐 검증 why: 202 후 워커가 실행/재시도
+    PARAMS = {'district': '강남구', 'theme': '역사 이야기 길 따라가기'}
+
+    def setUp(self):
+        from .models import ChatSession, User
+        from .services import itinerary_jobs
+        self.jobs = itinerary_jobs
+        self.user = User.objects.create_user(email='job@example.com', password='pw', username='job')
+        self.session = ChatSession.objects.create(user=self.user, title='t', parameters=self.PARAMS)
+
+    def test_post_returns_202_and_deduplicates(self):
+        url = f'/api/v1/users/{self.user.pk}/chat-sessions/start2/{self.session.pk}/jobs/'
+        first = self.client.post(url, {}, content_type='application/json')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first['Location'], first.json()['status_url'])
+        second = self.client.post(url, {}, content_type='application/json').json()
+        self.assertEqual((second['job_id'], second['deduplicated']), (first.json()['job_id'], True))
+
+        status_response = self.client.get(first['Location'])
+        self.assertEqual((status_response.json()['status'], status_response['Retry-After']), ('queued', '2'))
+        bad = self.client.post(url, {'session_parameters': {'theme': 'x'}}, content_type='application/json')
+        self.assertEqual(bad.status_code, 400)                   # what: district 누락 why: 큐에 넣기 전에 거부
+
+    def test_claim_execute_and_retry(self):
+        job, _ = self.jobs.enqueue(self.session, self.PARAMS)
+        with mock.patch('api.views.get_result', side_effect=RuntimeError('llm down')):
+            [claimed] = self.jobs.claim('w1')
+            self.assertEqual(self.jobs.claim('w2'), [])          # what: 이미 꺼낸 작업 why: 두 워커가 같은 작업 실행 금지
+            self.assertEqual(self.jobs.execute(claimed, 'w1'), 'queued')
+        job.refresh_from_db()
+        self.assertEqual((job.attempts, job.locked_by), (1, ''))
+        self.assertGreater(job.available_at, job.created_at)     # what: 백오프 why: 바로 다시 꺼내지 않음
+
+        job.available_at = job.created_at
+        job.save(update_fields=['available_at'])
+        with mock.patch('api.views.get_result', return_value=('answer', [{'name': 'p'}])):
+            [claimed] = self.jobs.claim('w1')
+            self.assertEqual(self.jobs.execute(claimed, 'w1'), 'succeeded')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('succeeded', 2))
+        self.assertEqual(job.result['places'], [{'name': 'p'}])
+        self.assertEqual(self.session.messages.get().content, 'answer')
+
+    @override_settings(ITINERARY_JOB_MAX_RUNNING=1)
+    def test_max_running_and_lease_renewal(self):
+        self.jobs.enqueue(self.session, self.PARAMS)
+        self.jobs.enqueue(self.session, {**self.PARAMS, 'groupSize': 2})
+        [claimed] = self.jobs.claim('w1', limit=2)              # what: 상한 1 why: 대기 작업이 둘이어도 하나만
+        self.assertEqual(self.jobs.claim('w2'), [])
+        self.assertTrue(self.jobs.renew_lease(claimed.pk, 'w1'))
+        self.assertFalse(self.jobs.renew_lease(claimed.pk, 'w2'))  # what: 다른 워커 why: 임대를 가진 워커만 갱신
+
+        def slow_result(*args, **kwargs):
+            time.sleep(0.35)
+            return 'answer', []
+
+        with override_settings(ITINERARY_JOB_LEASE_SECONDS=0.3), \
+                mock.patch.object(self.jobs, 'renew_lease', return_value=True) as renew, \
+                mock.patch('api.views.get_result', side_effect=slow_result):
+            self.assertEqual(self.jobs.execute(claimed, 'w1'), 'succeeded')
+        self.assertGreaterEqual(renew.call_count, 2)            # what: 0.1초마다 갱신 why: 임대보다 오래 걸려도 다시 큐에 넣지 않음
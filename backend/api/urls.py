@@ -8,12 +8,21 @@ from django.urls import include                            # what: include 함
 from rest_framework.routers import DefaultRouter                # what: DRF 라우터 임포트 why: 자동 라우팅
 from api.viewsets import ChatMessageViewSet, ChatSessionViewSet # what: ViewSet 임포트 why: 라우터 등록 대상
 
-from .views import ChatSessionStartAPIView, ChatSessionMessageAPIView, RealtimeMapView, ChatSessionStartAPIView2
+from .views import ChatSessionStartAPIView, ChatSessionMessageAPIView, RealtimeMapView, ChatSessionStartAPIView2, chat_session_start2_async, chat_session_start2_stream, ChatSessionTranscriptAPIView
+from .views import ItineraryJobCreateAPIView, ItineraryJobStatusAPIView, ItineraryJobStatsAPIView, itinerary_job_events
 
 urlpatterns = [
     path('v1/users/<int:user_pk>/chat-sessions/start/', ChatSessionStartAPIView.as_view(), name='session-start-api'),
     path('v1/users/<int:user_pk>/chat-sessions/start2/<int:session_pk>/', ChatSessionStartAPIView2.as_view(), name='session-start2-api'),
+    path('v1/users/<int:user_pk>/chat-sessions/start2-async/<int:session_pk>/', chat_session_start2_async, name='session-start2-async-api'),
+    path('v1/users/<int:user_pk>/chat-sessions/start2/<int:session_pk>/stream/', chat_session_start2_stream, name='session-start2-stream-api'),
+    # 일정 생성 작업 큐 (202 + 상태 조회/SSE)
+    path('v1/users/<int:user_pk>/chat-sessions/start2/<int:session_pk>/jobs/', ItineraryJobCreateAPIView.as_view(), name='itinerary-job-create-api'),
+    path('v1/users/<int:user_pk>/itinerary-jobs/<uuid:job_id>/', ItineraryJobStatusAPIView.as_view(), name='itinerary-job-status-api'),
+    path('v1/users/<int:user_pk>/itinerary-jobs/<uuid:job_id>/events/', itinerary_job_events, name='itinerary-job-events-api'),
+    path('v1/itinerary-jobs/stats/', ItineraryJobStatsAPIView.as_view(), name='itinerary-job-stats-api'),
     path('v1/users/<int:user_pk>/chat-sessions/<int:session_id>/send-messages/', ChatSessionMessageAPIView.as_view(), name='message-send-api'),
+    path('v1/users/<int:user_pk>/chat-sessions/<int:session_id>/transcript/', ChatSessionTranscriptAPIView.as_view(), name='session-transcript-api'),
     path('v1/users/', RegisterAPIView.as_view(), name='users'),
     # path("v1/login/", CookieLoginView.as_view()),
     path('v1/login/', LoginView.as_view()),
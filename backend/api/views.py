@@ -1,4 +1,9 @@
+import json
+from asgiref.sync import sync_to_async                          # 비동기 뷰에서 ORM 호출용
 from django.db import transaction                               # DB 트랜잭션 관리용
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
 from .models import Feedback
@@ -190,34 +195,87 @@ class LogoutAPIView(APIView):
 from .models import ChatSession, ChatMessage                              # 사용하는 모델 임포트
 from .serializers import ChatSessionSerializer, ChatMessageSerializer     # 직렬화기 임포트
 from .services.llm_service import DummyLLMService, ss_LLMService          # 더미 LLM 서비스 구현체 import
+from .services import llm_registry                                        # 프로세스 공유 LLM 클라이언트/서비스
+from .services import chat_turns                                          # 봇 턴 일괄 저장
 
 from .models import ChatInteraction, ChatComponent
-from .services.teamdb_langgraph_v5 import get_result
-
-def _save_and_parse_deltas(message, deltas):
-    """
-    ChatInteraction 및 ChatComponent 저장 헬퍼
-    메시지당 하나의 ChatInteraction만 update_or_create 사용
-    """
-    # 첫 번째 텍스트 델타를 interaction으로 기록
-    text_delta = next((d for d in deltas if d.get('type') == 'text'), None)
-    if text_delta:
-        ChatInteraction.objects.update_or_create(
-            chatmessage=message,
-            defaults={
-                'request': {},
-                'response': text_delta.get('payload', {})
-            }
-        )
-    # UI 컴포넌트들 기록
-    for idx, delta in enumerate(deltas):
-        if delta.get('type') in ('map_marker', 'form', 'image_carousel', 'button'):
-            ChatComponent.objects.create(
-                chatmessage=message,
-                component_type=delta['type'],
-                payload=delta.get('payload', {}),
-                order=idx
-            )
+from .serializers import ChatMessageHistorySerializer
+from .renderers import FastJSONRenderer                                   # orjson 이 있으면 orjson 으로 렌더링
+from django.db.models import Max, Prefetch
+from django.utils.cache import get_conditional_response
+from .services.streaming import sse_event
+from .services import itinerary_cache
+from .services.graph_metrics import GraphMetrics
+from .services.itinerary_runs import ItineraryRunner, ItineraryRunFailed
+from .services import itinerary_jobs
+from .models import ItineraryJob
+from django.conf import settings
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _itinerary_graph():
+    # LangGraph 서비스는 import 비용이 커서 첫 일정 생성 요청 시점에 불러옴 (manage.py/워커 기동 속도)
+    from .services import teamdb_langgraph_v5
+    return teamdb_langgraph_v5
+
+# 일정 생성은 itinerary_cache 를 거칩니다. (같은 정규화 파라미터면 그래프를 다시 돌리지 않음)
+# fresh=True 면 캐시를 건너뛰고 새로 생성한 결과로 캐시를 갱신합니다.
+# metrics(GraphMetrics)를 주면 노드별 시간/토큰/캐시 결과가 기록되어 ChatInteraction 에 저장됩니다.
+# runner(ItineraryRunner)를 주면 캐시 미스 때 run 으로 기록되어, 실패 후 같은 run_id 로 재요청하면 이어서 실행합니다.
+def get_result(session_parameters, fresh=False, session_id=None, metrics=None, runner=None):
+    if runner is not None:
+        generate = lambda: runner.generate(metrics)
+    else:
+        generate = lambda: _itinerary_graph().get_result(session_parameters, session_id=session_id, metrics=metrics)
+    return itinerary_cache.get_or_generate(session_parameters, generate, fresh=fresh, metrics=metrics)
+
+async def aget_result(session_parameters, fresh=False, session_id=None, metrics=None, runner=None):
+    if runner is not None:
+        agenerate = lambda: runner.agenerate(metrics)
+    else:
+        agenerate = lambda: _itinerary_graph().aget_result(session_parameters, session_id=session_id, metrics=metrics)
+    return await itinerary_cache.aget_or_generate(session_parameters, agenerate, fresh=fresh, metrics=metrics)
+
+async def astream_result(session_parameters, fresh=False, session_id=None, metrics=None, runner=None):
+    if not itinerary_cache.enabled():
+        itinerary_cache.mark_outcome(metrics, "disabled")
+    elif not fresh:
+        cached = await sync_to_async(itinerary_cache.safe_lookup)(session_parameters)
+        itinerary_cache.mark_outcome(metrics, "hit" if cached is not None else "miss")
+        if cached is not None:
+            answer, places = cached
+            yield "token", {"text": answer}                      # 캐시 히트: answer 를 한 번에 전달
+            yield "result", {"answer": answer, "places": places}
+            return
+    else:
+        itinerary_cache.mark_outcome(metrics, "bypass")
+        await sync_to_async(itinerary_cache.record_bypass)()
+    if runner is not None:
+        stream = runner.astream(metrics)
+    else:
+        stream = _itinerary_graph().astream_result(session_parameters, session_id=session_id, metrics=metrics)
+    async for event, data in stream:
+        if event == "result" and itinerary_cache.enabled():
+            await sync_to_async(itinerary_cache.safe_store)(
+                session_parameters, data["answer"], data["places"])
+        yield event, data
+
+def _wants_fresh(value) -> bool:
+    """요청 본문/쿼리스트링의 fresh 플래그 (true/1/yes)"""
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in ('1', 'true', 'yes')
+
+def _run_failed_payload(exc) -> dict:
+    """ItineraryRunFailed → 503 응답 본문. run_id 를 그대로 다시 보내면 실패한 단계부터 재개"""
+    return {
+        "detail": "일정 생성 중 오류가 발생했습니다. run_id 로 다시 요청하면 이어서 생성합니다.",
+        "run_id": exc.run_id,
+        "failed_node": exc.failed_node,
+        "retryable": True,
+    }
 
 class ChatSessionStartAPIView(APIView):
     '''
@@ -234,12 +292,17 @@ class ChatSessionStartAPIView(APIView):
         params   = request.data.get('session_parameters', {})
         session_params = request.data.get("session_parameters")
 
-        llm = ss_LLMService()
+        llm = llm_registry.get_service(ss_LLMService)        # 클라이언트/프롬프트 템플릿을 요청마다 만들지 않음
+        metrics = GraphMetrics(endpoint='start')
         # 3) 세션정보 생성 LLM 호출 -> session DB에 저장
-        title, info = llm.generate_session_metadata(session_parameters=params)
+        title, info = llm.generate_session_metadata(session_parameters=params, metrics=metrics)
         with transaction.atomic():
-            session = ChatSession.objects.create(user_id=user_pk, title=title, info=info, parameters=params)
+            session = ChatSession.objects.create(user_id=user_pk, title=title, info=info, parameters=params,
+                                                 next_message_order=1)
             user_message = ChatMessage.objects.create(chatsession=session, order=0, sender='user', content=info)
+            # info 는 LLM 이 만든 문장이므로 이 메시지에 메타데이터 생성 호출의 계측 값을 기록
+            request_data, response_data = _interaction_payload(params, metrics)
+            ChatInteraction.objects.create(chatmessage=user_message, request=request_data, response=response_data)
 
 
         return Response(
@@ -256,6 +319,27 @@ class ChatSessionStartAPIView(APIView):
         # }, status=status.HTTP_201_CREATED)
         
         
+def _interaction_payload(session_params, metrics, **request_extra):
+    """ChatInteraction.request/response 에 남길 호출 정보와 계측 값"""
+    request_data = {'session_parameters': session_params, **request_extra}
+    response_data = {'metrics': metrics.as_dict()} if metrics is not None else {}
+    return request_data, response_data
+
+def _save_itinerary_turn(session, llm_answer, llm_places, interaction=None):
+    """
+    start2 일정 생성 결과(봇 메시지 + place 컴포넌트)를 저장하고 응답 데이터를 만듭니다. (chat_turns.save_assistant_turn)
+    동기 뷰에서는 그대로, 비동기 뷰에서는 sync_to_async 로 감싸서 호출합니다.
+    interaction: (request, response) - 봇 메시지의 ChatInteraction 으로 함께 저장 (계측 값 포함)
+    """
+    bot_message, _ = chat_turns.save_assistant_turn(session, llm_answer,
+                                                    components=chat_turns.place_components(llm_places),
+                                                    interaction=interaction)
+    return {
+        "session": ChatSessionSerializer(session).data,
+        "messages": [ChatMessageSerializer(bot_message).data],
+        "places": list(llm_places),                              # 저장한 컴포넌트를 다시 조회하지 않음
+    }
+
 class ChatSessionStartAPIView2(APIView):
     '''
         permission_classes = [permissions.IsAuthenticated]  # 인증된 요청만 허용
@@ -272,40 +356,22 @@ class ChatSessionStartAPIView2(APIView):
         session_params = request.data.get("session_parameters")
         session = ChatSession.objects.get(id=session_pk)
 
-        llm_answer, llm_places = get_result(session_parameters = session_params)
+        fresh = _wants_fresh(request.data.get('fresh', request.query_params.get('fresh')))
+        metrics = GraphMetrics(endpoint='start2')
+        runner = ItineraryRunner(session.id, session_params,
+                                 run_id=request.data.get('run_id', request.query_params.get('run_id')))
+        try:
+            llm_answer, llm_places = get_result(session_parameters = session_params, fresh=fresh,
+                                                session_id=session.id, metrics=metrics, runner=runner)
+        except ItineraryRunFailed as exc:
+            return Response(_run_failed_payload(exc), status=status.HTTP_503_SERVICE_UNAVAILABLE)
         # full_text = ''.join(d.get('payload',{}).get('content','') for d in deltas if d.get('type') == 'text')               
         # 5) 봇 메시지 저장 및 델타 처리
-        with transaction.atomic():
-            bot_message = ChatMessage.objects.create(
-                chatsession=session,
-                order=1,
-                sender='assistant',
-                content=llm_answer
-            )
-            # 델타별 기록 헬퍼 호출
-            # _save_and_parse_deltas(bot_message, deltas)
-            for idx, place in enumerate(llm_places):
-                ChatComponent.objects.create(
-                    chatmessage=bot_message,
-                    component_type='place',  # 컴포넌트 유형을 명시적으로 기록
-                    payload=place,           # JSONField에 dict 형태로 저장
-                    order=idx                # 순서 지정
-            )
-                
-            components_qs = ChatComponent.objects.filter(
-                chatmessage=bot_message, component_type="place"
-            ).order_by("order")
-
-            places = [comp.payload for comp in components_qs]
-
-        return Response(
-            {
-                "session": ChatSessionSerializer(session).data,
-                "messages": [ChatMessageSerializer(bot_message).data],
-                "places": places,
-            },
-            status=status.HTTP_201_CREATED,
-        )
+        data = _save_itinerary_turn(session, llm_answer, llm_places,
+                                    interaction=_interaction_payload(session_params, metrics, fresh=fresh,
+                                                                     run_id=runner.run_id))
+        data["run_id"] = runner.run_id
+        return Response(data, status=status.HTTP_201_CREATED)
 
         # # 6) 직렬화 및 델타 응답 조립) 응답
         # return Response({
@@ -314,6 +380,197 @@ class ChatSessionStartAPIView2(APIView):
         # }, status=status.HTTP_201_CREATED)
 
 
+@csrf_exempt
+@require_POST
+async def chat_session_start2_async(request, user_pk, session_pk):
+    """
+    POST /api/v1/users/<user_pk>/chat-sessions/start2-async/<session_pk>/
+    ChatSessionStartAPIView2 와 같은 요청/응답 형식의 비동기 버전.
+    그래프는 ainvoke 로 실행하고 ORM 작업은 sync_to_async 로 감싸서
+    LLM 대기 동안 워커 스레드를 점유하지 않습니다. (ASGI 서버에서 사용)
+    """
+    try:
+        body = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "JSON 본문이 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+    session_params = body.get("session_parameters")
+
+    try:
+        session = await ChatSession.objects.aget(id=session_pk)
+    except ChatSession.DoesNotExist:
+        return JsonResponse({"detail": "세션을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+    fresh = _wants_fresh(body.get("fresh", request.GET.get("fresh")))
+    metrics = GraphMetrics(endpoint='start2-async')
+    runner = ItineraryRunner(session.id, session_params, run_id=body.get("run_id", request.GET.get("run_id")))
+    try:
+        llm_answer, llm_places = await aget_result(session_parameters=session_params, fresh=fresh,
+                                                   session_id=session.id, metrics=metrics, runner=runner)
+    except ItineraryRunFailed as exc:
+        return JsonResponse(_run_failed_payload(exc), status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            json_dumps_params={'ensure_ascii': False})
+    data = await sync_to_async(_save_itinerary_turn)(
+        session, llm_answer, llm_places,
+        interaction=_interaction_payload(session_params, metrics, fresh=fresh, run_id=runner.run_id))
+    data["run_id"] = runner.run_id
+    return JsonResponse(data, status=status.HTTP_201_CREATED, json_dumps_params={'ensure_ascii': False})
+
+
+@csrf_exempt
+@require_POST
+async def chat_session_start2_stream(request, user_pk, session_pk):
+    """
+    POST /api/v1/users/<user_pk>/chat-sessions/start2/<session_pk>/stream/
+    start2 의 스트리밍(text/event-stream) 버전.
+
+    event: progress  → {"node", "stage"}  후보 조회/장소 선택/웹 검색 완료
+    event: token     → {"text"}           answer 마크다운 조각
+    event: reset     → {"node"}           answer 노드 재시도 - 지금까지 받은 token 을 버림
+    event: done      → start2 와 같은 {"session", "messages", "places", "run_id"} (저장 완료 후)
+    event: error     → {"detail"} 또는 {"detail", "run_id", "failed_node", "retryable"}
+                       (본문에 run_id 를 넣어 다시 요청하면 실패한 단계부터 재개)
+    """
+    try:
+        body = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "JSON 본문이 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+    session_params = body.get("session_parameters")
+    fresh = _wants_fresh(body.get("fresh", request.GET.get("fresh")))
+    run_id = body.get("run_id", request.GET.get("run_id"))
+
+    try:
+        session = await ChatSession.objects.aget(id=session_pk)
+    except ChatSession.DoesNotExist:
+        return JsonResponse({"detail": "세션을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+    async def events():
+        metrics = GraphMetrics(endpoint='start2-stream')
+        runner = ItineraryRunner(session.id, session_params, run_id=run_id)
+        try:
+            async for event, data in astream_result(session_params, fresh=fresh, session_id=session.id,
+                                                    metrics=metrics, runner=runner):
+                if event == "result":
+                    saved = await sync_to_async(_save_itinerary_turn)(
+                        session, data["answer"], data["places"],
+                        interaction=_interaction_payload(session_params, metrics, fresh=fresh,
+                                                         run_id=runner.run_id))
+                    saved["run_id"] = runner.run_id
+                    yield sse_event("done", saved)
+                else:
+                    yield sse_event(event, data)
+        except ItineraryRunFailed as exc:
+            yield sse_event("error", _run_failed_payload(exc))
+        except Exception as exc:                                 # 스트림 도중 실패는 error 이벤트로 전달
+            logger.exception("itinerary stream failed (session=%s)", session_pk)
+            yield sse_event("error", {"detail": str(exc)})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"                         # nginx 버퍼링 비활성화
+    return response
+
+
+class ItineraryJobCreateAPIView(APIView):
+    """
+    POST /api/v1/users/<user_pk>/chat-sessions/start2/<session_pk>/jobs/
+    start2 의 작업 큐 버전. 일정 생성을 큐에 넣고 바로 202 로 응답합니다. (api/services/itinerary_jobs.py)
+    본문: {"session_parameters": {...}, "fresh": false}  (session_parameters 가 없으면 세션에 저장된 값)
+    응답: 상태 조회와 같은 본문 + status_url / events_url / deduplicated
+          같은 조건의 작업이 이미 대기/실행 중이면 그 작업을 돌려줌 (deduplicated=true)
+    """
+    def post(self, request, user_pk, session_pk):
+        session = get_object_or_404(ChatSession, id=session_pk, user_id=user_pk)
+        session_params = request.data.get('session_parameters') or session.parameters
+        fresh = _wants_fresh(request.data.get('fresh', request.query_params.get('fresh')))
+        try:
+            job, created = itinerary_jobs.enqueue(session, session_params, fresh=fresh)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        status_url = f"/api/v1/users/{user_pk}/itinerary-jobs/{job.job_id}/"
+        data = {
+            **itinerary_jobs.status_payload(job),
+            "status_url": status_url,
+            "events_url": status_url + "events/",
+            "deduplicated": not created,
+        }
+        response = Response(data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = status_url
+        return response
+
+
+class ItineraryJobStatusAPIView(APIView):
+    """
+    GET /api/v1/users/<user_pk>/itinerary-jobs/<job_id>/
+    status: queued(queue_position, available_at) → running → succeeded(result = start2 응답 본문) / failed(error)
+    끝나지 않았으면 Retry-After 로 다음 조회 간격(초)을 알려 줌
+    """
+    def get(self, request, user_pk, job_id):
+        job = get_object_or_404(ItineraryJob, job_id=job_id, chatsession__user_id=user_pk)
+        response = Response(itinerary_jobs.status_payload(job))
+        if job.status in itinerary_jobs.ACTIVE_STATUSES:
+            response['Retry-After'] = str(max(1, round(getattr(settings, 'ITINERARY_JOB_POLL_SECONDS', 2))))  # 정수 초
+        return response
+
+
+async def itinerary_job_events(request, user_pk, job_id):
+    """
+    GET /api/v1/users/<user_pk>/itinerary-jobs/<job_id>/events/
+    작업 상태 변화를 SSE 로 보냅니다. (서버가 ITINERARY_JOB_POLL_SECONDS 마다 DB 를 확인)
+
+    event: status  → 상태 조회와 같은 본문 (바뀔 때만)
+    event: done    → succeeded 본문 (result 포함)
+    event: error   → failed 본문 (error 포함)
+    event: timeout → ITINERARY_JOB_EVENTS_TIMEOUT 초 안에 끝나지 않음 - 다시 구독하거나 상태 조회
+    """
+    if request.method != 'GET':
+        return JsonResponse({"detail": "GET 만 허용됩니다."}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def load():
+        job = ItineraryJob.objects.filter(job_id=job_id, chatsession__user_id=user_pk).first()
+        return itinerary_jobs.status_payload(job) if job is not None else None
+
+    first = await sync_to_async(load)()
+    if first is None:
+        return JsonResponse({"detail": "작업을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+    interval = getattr(settings, 'ITINERARY_JOB_POLL_SECONDS', 2)
+    timeout = getattr(settings, 'ITINERARY_JOB_EVENTS_TIMEOUT', 300)
+
+    async def events():
+        payload, last, waited = first, None, 0.0
+        while True:
+            if payload['status'] == 'succeeded':
+                yield sse_event("done", payload)
+                return
+            if payload['status'] == 'failed':
+                yield sse_event("error", payload)
+                return
+            if payload != last:
+                yield sse_event("status", payload)
+                last = payload
+            if waited >= timeout:
+                yield sse_event("timeout", {"job_id": payload['job_id'], "status": payload['status']})
+                return
+            await asyncio.sleep(interval)
+            waited += interval
+            payload = await sync_to_async(load)()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"                         # nginx 버퍼링 비활성화
+    return response
+
+
+class ItineraryJobStatsAPIView(APIView):
+    """GET /api/v1/itinerary-jobs/stats/?window=60 - 대기열 길이와 최근 작업 지연 시간 (itinerary_jobs.stats)"""
+    def get(self, request):
+        try:
+            window = max(1, int(request.query_params.get('window', 60)))
+        except ValueError:
+            return Response({"detail": "window 는 분 단위 정수입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(itinerary_jobs.stats(window_minutes=window))
+
+
 class ChatSessionMessageAPIView(APIView):
 
     '''
@@ -328,22 +585,56 @@ class ChatSessionMessageAPIView(APIView):
         # 2) 사용자 메시지 저장
         user_msg = request.data.get('message')
         with transaction.atomic():
-            count = ChatMessage.objects.filter(chatsession=session).count()
-            user_message = ChatMessage.objects.create(chatsession=session, order=count, sender='user', content=user_msg)
+            order = chat_turns.reserve_orders(session.id, count=2)     # 사용자 메시지 + 봇 응답 (동시 요청과 겹치지 않음)
+            user_message = ChatMessage.objects.create(chatsession=session, order=order, sender='user', content=user_msg)
 
         # 3) 델타 생성 및 조합
-        deltas = DummyLLMService().generate_bot_response(session_id=session.id, messages=[{'sender':'user','content':user_msg}], **session.parameters)
+        deltas = llm_registry.get_service(DummyLLMService).generate_bot_response(session_id=session.id, messages=[{'sender':'user','content':user_msg}], **session.parameters)
         full_text = ''.join(d.get('payload',{}).get('content','') for d in deltas if d.get('type')=='text')
 
         # 4) 봇 메시지 저장 및 델타 처리
-        with transaction.atomic():
-            bot_message = ChatMessage.objects.create(chatsession=session, order=user_message.order+1, sender='assistant', content=full_text)
-            _save_and_parse_deltas(bot_message, deltas)
+        bot_message, _ = chat_turns.save_assistant_turn(session, full_text,
+                                                        components=chat_turns.delta_components(deltas),
+                                                        interaction=chat_turns.delta_interaction(deltas),
+                                                        order=user_message.order+1)
 
         # 5) 응답
         return Response({'messages': [ChatMessageSerializer(user_message).data, ChatMessageSerializer(bot_message).data], 'deltas': deltas}, status=status.HTTP_200_OK)
     
 
+class ChatSessionTranscriptAPIView(APIView):
+    """
+    GET /api/v1/users/<user_pk>/chat-sessions/<session_id>/transcript/
+    지난 여행을 다시 열 때 세션 + order 순 메시지 + 메시지별 컴포넌트를 한 번에 돌려줍니다.
+    (메시지 목록 + 메시지마다 components 라우트를 부르는 N+1 요청 대신)
+
+    쿼리 4번 고정: 세션, 마지막 메시지 id, 메시지, 컴포넌트(prefetch)
+    ETag = 세션 updated_at + 마지막 메시지 id. If-None-Match 가 같으면 쿼리 2번 후 304
+    (새 턴은 메시지/컴포넌트를 한 트랜잭션에 저장하므로 마지막 메시지 id 가 바뀜.
+     컴포넌트 CRUD 라우트로 기존 컴포넌트만 고친 경우는 ETag 에 반영되지 않음)
+    """
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request, user_pk, session_id):
+        session = get_object_or_404(ChatSession, id=session_id, user_id=user_pk)
+        last_message_id = ChatMessage.objects.filter(chatsession_id=session.id).aggregate(last=Max('id'))['last']
+        etag = f'"{session.id}-{session.updated_at.timestamp():.6f}-{last_message_id or 0}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        messages = (ChatMessage.objects.filter(chatsession_id=session.id).order_by('order')
+                    .prefetch_related(Prefetch('components', queryset=ChatComponent.objects.order_by('order'))))
+        response = Response({
+            'session': ChatSessionSerializer(session).data,
+            'messages': ChatMessageHistorySerializer(messages, many=True, context={'include': ('components',)}).data,
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'          # 매번 ETag 로 재검증
+        return response
+
+
 class MapView(APIView):
     def get(self, request):
         if(request):
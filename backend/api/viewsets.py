@@ -1,9 +1,16 @@
 # api/viewsets.py
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, mixins            # what: ViewSet·Mixin 임포트 why: CRUD 재사용성 확보
-from .models import ChatMessage                        # what: ChatMessage 모델 임포트 why: 데이터 저장·조회
+from .models import ChatComponent, ChatMessage         # what: 채팅 모델 임포트 why: 데이터 저장·조회
 from .serializers import ChatMessageSerializer         # what: Serializer 임포트 why: JSON 변환 일관성 유지
+from .serializers import ChatMessageHistorySerializer  # what: 목록용 Serializer why: ?include= 관계 포함
 from .services.llm_service import BaseLLMService, DummyLLMService  # what: LLM 서비스 인터페이스 및 구현 임포트 why: 의존성 분리
+from .services import llm_registry                     # what: 공유 LLM 서비스 등록소 why: 요청(ViewSet 인스턴스)마다 새로 만들지 않음
+from .services.chat_turns import reserve_orders         # what: 세션별 메시지 순번 예약 why: count() 없이 겹치지 않는 order
+from .pagination import MessageCursorPagination, SessionCursorPagination  # what: 커서 페이지 why: 긴 기록도 페이지 비용 일정
+
+MESSAGE_INCLUDES = ('components', 'interaction')       # what: ?include= 로 함께 받을 수 있는 관계
 
 class ChatMessageViewSet(
     mixins.CreateModelMixin,  # Enable POST create
@@ -12,23 +19,45 @@ class ChatMessageViewSet(
     viewsets.GenericViewSet   # Core ViewSet class
 ):
     serializer_class = ChatMessageSerializer  # Serializer for input/output
+    pagination_class = MessageCursorPagination  # order 기준 커서 페이지
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Inject LLM service dependency
-        self.llm_service = DummyLLMService()
+        self.llm_service = llm_registry.get_service(DummyLLMService)
+
+    def _includes(self):
+        # ?include=components,interaction → 목록 응답에 관계 포함 (알 수 없는 값은 무시)
+        raw = self.request.query_params.get('include', '') if self.request else ''
+        return tuple(name for name in MESSAGE_INCLUDES if name in {v.strip() for v in raw.split(',')})
 
     def get_queryset(self):
         user_pk    = self.kwargs['user_pk']
         session_pk = self.kwargs['session_pk']
-        return ChatMessage.objects.filter(
+        queryset = ChatMessage.objects.filter(
             chatsession__user_id=user_pk,
             chatsession_id=session_pk
         ).order_by('order')
+        include = self._includes()
+        if 'components' in include:            # 페이지 전체의 컴포넌트를 쿼리 한 번으로
+            queryset = queryset.prefetch_related(
+                Prefetch('components', queryset=ChatComponent.objects.order_by('order')))
+        if 'interaction' in include:           # 1:1 이므로 JOIN 으로 함께 읽음
+            queryset = queryset.select_related('interaction')
+        return queryset
+
+    def get_serializer_class(self):
+        return ChatMessageHistorySerializer if self.action == 'list' else ChatMessageSerializer
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'include': self._includes()}
 
     def perform_create(self, serializer):
         # Save new user message with FK to parent session
-        instance = serializer.save(chatsession_id=self.kwargs['session_pk'])
+        # order 는 클라이언트 값 대신 세션 시퀀스에서 예약 (사용자 메시지면 봇 응답 자리까지 2개)
+        is_user = serializer.validated_data.get('sender', 'user') == 'user'
+        order = reserve_orders(self.kwargs['session_pk'], count=2 if is_user else 1)
+        instance = serializer.save(chatsession_id=self.kwargs['session_pk'], order=order)
         if instance.sender == 'user':
             # Generate assistant reply only for user messages
             reply_text = self.llm_service.generate_response(instance)
@@ -47,12 +76,13 @@ from .serializers import ChatSessionSerializer                        # ChatSess
 class ChatSessionViewSet(viewsets.ModelViewSet):                      # ModelViewSet 상속: CRUD 기능 일괄 제공
     queryset = ChatSession.objects.all()                              # 기본 쿼리셋: 전체 세션(필터링은 get_queryset에서)
     serializer_class = ChatSessionSerializer                          # 직렬화기 연결
+    pagination_class = SessionCursorPagination                        # 최신순 (created_at, id) 커서 페이지
     # permission_classes = [permissions.IsAuthenticated]                # 로그인한 사용자만 접근 허용
 
     def get_queryset(self):                                           # 쿼리셋 커스터마이징
         user_pk = self.kwargs['user_pk']
         # user__pk 대신 user_id=user_pk 도 가능
-        return ChatSession.objects.filter(user_id=user_pk).order_by('-created_at')
+        return ChatSession.objects.filter(user_id=user_pk).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):                             # 데이터 저장 직전 추가 처리
         # 세션 생성 시 user 필드를 현재 로그인 사용자로 지정
@@ -82,7 +112,7 @@ class ChatComponentViewSet(viewsets.ModelViewSet):                       # ChatC
             chatmessage__chatsession__user_id=user_pk,
             chatmessage__chatsession_id=session_pk,
             chatmessage_id=message_pk
-        )
+        ).order_by('order')
     def perform_create(self, serializer):
         # FK 연결
         message = get_object_or_404(
@@ -90,6 +90,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# QUERY_COUNT_HEADERS=True 면 응답마다 X-DB-Queries / X-DB-Time-Ms 헤더를 붙임 (부하 테스트 집계용, api/middleware.py)
+QUERY_COUNT_HEADERS = os.environ.get("QUERY_COUNT_HEADERS", "False") == "True"
+if QUERY_COUNT_HEADERS:
+    MIDDLEWARE.append('api.middleware.QueryCountMiddleware')
+
 # CORS 설정
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_CREDENTIALS = True
@@ -203,6 +208,82 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 캐시
+# - default:   프로세스 메모리 (CACHE_URL 등으로 Redis/Memcached 로 바꿀 때는 BACKEND/LOCATION 만 교체)
+# - itinerary: 일정 결과 캐시. 같은 서버의 워커들이 공유하도록 파일 기반 캐시 사용
+# - catalog:   일정/후보 캐시의 세대 토큰. 무효화 커맨드가 실행 중인 워커에도 반영되도록 파일 기반
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "itinerary": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("ITINERARY_CACHE_DIR", str(BASE_DIR / ".cache" / "itinerary")),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # 웹 검색 결과는 일정 캐시와 따로 둠 (같은 디렉터리면 MAX_ENTRIES 초과 시 무작위 삭제가 일정 캐시 항목/통계 키를 지움)
+    "web_search": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("WEB_SEARCH_CACHE_DIR", str(BASE_DIR / ".cache" / "web_search")),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # 캐시 세대 토큰(일정/후보 캐시 무효화)만 두는 작은 캐시 - 항목이 몇 개뿐이라 MAX_ENTRIES 정리로 지워지지 않음
+    # 파일 기반이라 같은 서버의 모든 워커/관리 커맨드가 같은 값을 봄
+    "catalog": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_DIR", str(BASE_DIR / ".cache" / "catalog")),
+    },
+}
+
+# 일정 결과 캐시 - api/services/itinerary_cache.py
+ITINERARY_CACHE_ENABLED = os.environ.get("ITINERARY_CACHE_ENABLED", "True") == "True"
+ITINERARY_CACHE_ALIAS   = "itinerary"
+ITINERARY_CACHE_TTL     = int(os.environ.get("ITINERARY_CACHE_TTL", 60 * 60 * 6))
+ITINERARY_CACHE_GENERATION_ALIAS = "catalog"      # 세대 토큰 (결과 캐시의 항목 정리로 지워지지 않도록 분리)
+
+# 일정 생성 그래프 체크포인터 - api/services/checkpointing.py
+# 세션별 thread 를 메모리에 보관하되 개수/유휴 시간/메모리 상한을 넘으면 오래된 세션부터 정리
+# GRAPH_CHECKPOINT_DB_STORE=True 면 세션별 마지막 상태를 DB(api_graphcheckpoint)에도 저장해 재시작 후 복원
+GRAPH_CHECKPOINT_MAX_THREADS = int(os.environ.get("GRAPH_CHECKPOINT_MAX_THREADS", 500))
+GRAPH_CHECKPOINT_TTL         = int(os.environ.get("GRAPH_CHECKPOINT_TTL", 60 * 60))
+GRAPH_CHECKPOINT_MAX_BYTES   = int(os.environ.get("GRAPH_CHECKPOINT_MAX_BYTES", 64 * 1024 * 1024))
+GRAPH_CHECKPOINT_DB_STORE    = os.environ.get("GRAPH_CHECKPOINT_DB_STORE", "False") == "True"
+
+# 실패한 일정 생성 run 재개 - api/services/itinerary_runs.py
+# 같은 run_id 로 다시 요청하면 실패 직전 체크포인트에서 이어서 실행 (run 하나당 최대 재개 횟수)
+ITINERARY_RUN_MAX_RESUMES = int(os.environ.get("ITINERARY_RUN_MAX_RESUMES", 3))
+
+# 일정 생성 작업 큐 - api/services/itinerary_jobs.py, 워커: manage.py run_itinerary_worker
+ITINERARY_JOB_MAX_ATTEMPTS        = int(os.environ.get("ITINERARY_JOB_MAX_ATTEMPTS", 3))         # 작업당 최대 실행 횟수
+ITINERARY_JOB_BACKOFF_SECONDS     = float(os.environ.get("ITINERARY_JOB_BACKOFF_SECONDS", 5))    # 재시도 대기 (2배씩 증가)
+ITINERARY_JOB_BACKOFF_MAX_SECONDS = float(os.environ.get("ITINERARY_JOB_BACKOFF_MAX_SECONDS", 300))
+ITINERARY_JOB_LEASE_SECONDS       = int(os.environ.get("ITINERARY_JOB_LEASE_SECONDS", 600))      # 실행 중 1/3 마다 갱신, 갱신이 끊기고 이만큼 지나면 다시 큐에
+ITINERARY_JOB_MAX_RUNNING         = int(os.environ.get("ITINERARY_JOB_MAX_RUNNING", 0))          # 전체 동시 실행 상한 (0 이면 없음, 있으면 claim 이 차례로 실행)
+ITINERARY_JOB_WORKER_CONCURRENCY  = int(os.environ.get("ITINERARY_JOB_WORKER_CONCURRENCY", 2))   # 워커 프로세스당 스레드
+ITINERARY_JOB_POLL_SECONDS        = float(os.environ.get("ITINERARY_JOB_POLL_SECONDS", 2))       # 워커/SSE 의 DB 확인 간격
+ITINERARY_JOB_EVENTS_TIMEOUT      = int(os.environ.get("ITINERARY_JOB_EVENTS_TIMEOUT", 300))     # SSE 구독 최대 시간(초)
+
+# search_web 노드의 웹 검색 - api/services/web_search.py
+WEB_SEARCH_MAX_WORKERS = int(os.environ.get("WEB_SEARCH_MAX_WORKERS", 8))       # 동시 검색 수
+WEB_SEARCH_DEADLINE    = float(os.environ.get("WEB_SEARCH_DEADLINE", 8.0))      # 노드 전체 마감 시간(초)
+WEB_SEARCH_REQUEST_TIMEOUT = float(os.environ.get("WEB_SEARCH_REQUEST_TIMEOUT", 6.0))  # 검색 한 건의 HTTP 타임아웃(초)
+WEB_SEARCH_CACHE_ALIAS = os.environ.get("WEB_SEARCH_CACHE_ALIAS", "web_search") # 비우면 캐시 사용 안 함
+WEB_SEARCH_CACHE_TTL   = int(os.environ.get("WEB_SEARCH_CACHE_TTL", 60 * 60 * 24))
+
+# 후보 조회(fetch_db_*) 캐시 - api/services/candidate_cache.py
+# CANDIDATE_CACHE_ALIAS 에 CACHES 별칭(예: "default" 가 Redis/Memcached 일 때)을 주면
+# 워커 간 공유 캐시를 2차로 사용합니다. 비워 두면 프로세스 메모리 캐시만 사용
+# 세대 토큰은 2차 캐시 여부와 관계없이 CANDIDATE_CACHE_GENERATION_ALIAS 에 두어 무효화가 모든 워커에 바로 반영됨
+CANDIDATE_CACHE_ALIAS       = os.environ.get("CANDIDATE_CACHE_ALIAS") or None
+CANDIDATE_CACHE_GENERATION_ALIAS = "catalog"
+CANDIDATE_CACHE_LOCAL_TTL   = int(os.environ.get("CANDIDATE_CACHE_LOCAL_TTL", 300))
+CANDIDATE_CACHE_SHARED_TTL  = int(os.environ.get("CANDIDATE_CACHE_SHARED_TTL", 60 * 60 * 24))
+CANDIDATE_CACHE_MAX_ENTRIES = int(os.environ.get("CANDIDATE_CACHE_MAX_ENTRIES", 256))
+
+# 공유 LLM 클라이언트 - api/services/llm_registry.py
+# 모델 이름별 기본 옵션 (ChatGoogleGenerativeAI / GoogleGenerativeAI 생성 인자). 예: {"gemini-2.0-flash": {"timeout": 60}}
+LLM_CLIENTS = {}
+
 LOGGING = {
   'version': 1,
   'disable_existing_loggers': False,
@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# TEAMDB_FAKE_BACKENDS=1 이면 Gemini/Tavily/MySQL 대신 로컬 대역으로 동작 (부하 테스트용, api/services/fakes.py)
+if os.environ.get('TEAMDB_FAKE_BACKENDS') == '1':
+    from api.services.fakes import install_from_env
+    install_from_env()
+
+# ITINERARY_GRAPH_WARMUP=1 이면 워커 기동 시 LangGraph 일정 생성 그래프를 미리 초기화
+# (기본값은 첫 요청 시 지연 초기화 → manage.py 명령과 워커 기동이 빨라짐)
+if os.environ.get('ITINERARY_GRAPH_WARMUP') == '1':
+    from api.services.teamdb_langgraph_v5 import warm_up
+    warm_up()